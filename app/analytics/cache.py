@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+def profile_key(user_id: int) -> tuple:
+    return ('profile', user_id)
+
+
+def group_key(group_id: int) -> tuple:
+    return ('group', group_id)
+
+
+class AnalyticsCache:
+    """
+    Кеш данных аналитики в памяти: профили студентов и группы.
+    Записи старше TTL секунд считаются отсутствующими. Общий для фоновой
+    загрузки и страниц, доступ потокобезопасный.
+    """
+    TTL = 60 * 60
+
+    _shared: Optional['AnalyticsCache'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = self.TTL if ttl is None else ttl
+        self._entries: Dict[Hashable, Tuple[object, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'AnalyticsCache':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def put(self, key: Hashable, value: object) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Возраст записи в секундах, None - записи нет или она устарела"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[1]
+        return age if age <= self.ttl else None
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def iter_profiles(api, cache: AnalyticsCache, user_ids: List[int],
+                  max_workers: Optional[int] = None) -> Iterator[Tuple[int, object]]:
+    """
+    Профили студентов (position, profile): свежие из кеша сразу, остальные
+    загружаются параллельно через api.iter_student_profiles и кешируются
+    """
+    missing = []
+    for position, user_id in enumerate(user_ids):
+        profile = cache.get(profile_key(user_id))
+        if profile is None:
+            missing.append(position)
+        else:
+            yield position, profile
+    for index, profile in api.iter_student_profiles([user_ids[position] for position in missing], max_workers):
+        if profile is not None:
+            cache.put(profile_key(user_ids[missing[index]]), profile)
+        yield missing[index], profile
@@ -0,0 +1,175 @@
+import asyncio
+import statistics
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.analytics.cache import AnalyticsCache, iter_profiles
+from app.api.gushub_api import StudentProfile
+from app.api.gushub_async_api import AsyncGushubAPI
+
+# Перцентили распределения прогресса
+PERCENTILES = (10, 25, 50, 75, 90)
+# Пороги группы риска
+AT_RISK_PROGRESS = 30.0
+AT_RISK_GRADE = 3.0
+GRADE_VALUES = ('2', '3', '4', '5')
+
+
+def percentiles(values: Sequence[float], points: Sequence[int] = PERCENTILES) -> Dict[int, Optional[float]]:
+    """Перцентили с линейной интерполяцией (как numpy.percentile по умолчанию)"""
+    if not values:
+        return {point: None for point in points}
+    if len(values) == 1:
+        return {point: round(values[0], 1) for point in points}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {point: round(cuts[point - 1], 1) for point in points}
+
+
+def _mean(values: Sequence[float]) -> Optional[float]:
+    return round(statistics.fmean(values), 2) if values else None
+
+
+def _median(values: Sequence[float]) -> Optional[float]:
+    return round(statistics.median(values), 2) if values else None
+
+
+class CourseCohort:
+    """Распределение прогресса студентов по одному курсу"""
+    def __init__(self, course_id: int, title: str, progress: array):
+        self.course_id = course_id
+        self.title = title
+        self.students = len(progress)
+        self.mean = _mean(progress)
+        self.percentiles = percentiles(sorted(progress))
+        self.completed = sum(1 for value in progress if value >= 100)
+
+
+class CohortStats:
+    """
+    Сводные показатели группы студентов.
+
+    Показатели студентов собираются в плотные массивы array('d') и
+    считаются модулем statistics, без промежуточных объектов на студента.
+    """
+    def __init__(self, students: Iterable[Tuple[object, Optional[StudentProfile]]]):
+        progress = array('d')
+        time_spent = array('d')
+        averages = array('d')
+        self.grade_counts = {value: 0 for value in GRADE_VALUES}
+        self.at_risk: List[Tuple[object, str]] = []
+        self.missing = 0
+        courses: Dict[int, Tuple[str, array]] = {}
+
+        for user, profile in students:
+            if profile is None:
+                self.missing += 1
+                continue
+            stats, grades = profile.statistics, profile.grades
+            student_progress = stats.completedTasks / stats.totalTasks * 100 if stats.totalTasks else 0.0
+            progress.append(student_progress)
+            time_spent.append(stats.totalTimeSpent or 0)
+            # Средний балл может не прийти даже при выставленных оценках
+            has_average = bool(grades.totalGrades) and grades.averageGrade is not None
+            if has_average:
+                averages.append(grades.averageGrade)
+            for value, count in (grades.gradesByValue or {}).items():
+                if value in self.grade_counts:
+                    self.grade_counts[value] += count
+            for course in stats.courseProgress:
+                courses.setdefault(course.courseId, (course.courseTitle, array('d')))[1].append(course.progressPercentage or 0)
+
+            reasons = []
+            if stats.totalTasks and student_progress < AT_RISK_PROGRESS:
+                reasons.append(f"прогресс {student_progress:.0f}%")
+            if has_average and grades.averageGrade < AT_RISK_GRADE:
+                reasons.append(f"средний балл {grades.averageGrade:.1f}")
+            if stats.totalTasks and not stats.totalTimeSpent:
+                reasons.append("нет активности")
+            if reasons:
+                self.at_risk.append((user, ", ".join(reasons)))
+
+        self.students = len(progress)
+        ordered = sorted(progress)
+        self.progress_mean = _mean(progress)
+        self.progress_percentiles = percentiles(ordered)
+        self.time_mean = _mean(time_spent)
+        self.time_median = _median(time_spent)
+        self.grade_mean = _mean(averages)
+        # Гистограмма прогресса по интервалам в 10%: 0-9, 10-19, ..., 90-100
+        self.progress_histogram = [0] * 10
+        for value in progress:
+            self.progress_histogram[min(int(value // 10), 9)] += 1
+        self.courses = [CourseCohort(course_id, title, values)
+                        for course_id, (title, values) in sorted(courses.items(), key=lambda item: item[1][0] or '')]
+
+    def summary_rows(self) -> List[Tuple[str, object]]:
+        """Показатели в виде пар (название, значение) для отображения и экспорта"""
+        rows: List[Tuple[str, object]] = [
+            ("Студентов со статистикой", self.students),
+            ("Без статистики", self.missing),
+            ("Средний прогресс, %", self.progress_mean),
+        ]
+        rows += [(f"Прогресс, {point}-й перцентиль, %", value) for point, value in self.progress_percentiles.items()]
+        rows += [
+            ("Среднее время, мин", self.time_mean),
+            ("Медиана времени, мин", self.time_median),
+            ("Средний балл", "нет оценок" if self.grade_mean is None else self.grade_mean),
+        ]
+        rows += [(f"Оценок «{value}»", count) for value, count in self.grade_counts.items()]
+        rows += [(f"Прогресс {index * 10}-{index * 10 + 9 if index < 9 else 100}%", count)
+                 for index, count in enumerate(self.progress_histogram)]
+        rows.append(("В группе риска", len(self.at_risk)))
+        return rows
+
+    def course_rows(self) -> List[list]:
+        """Строки таблицы распределения прогресса по курсам"""
+        return [
+            [course.title, course.students, course.completed, course.mean,
+             *(course.percentiles[point] for point in PERCENTILES)]
+            for course in self.courses
+        ]
+
+
+COURSE_COLUMNS = ["Курс", "Студентов", "Завершили", "Средний прогресс, %",
+                  *(f"P{point}, %" for point in PERCENTILES)]
+
+
+def load_group_cohort(api, group_id: int, cache: Optional[AnalyticsCache] = None, max_workers: Optional[int] = None):
+    """
+    Показатели группы для фоновой задачи: выдаёт прогресс загрузки профилей
+    (загружено, всего), последним элементом - CohortStats
+    """
+    group = api.get_group(group_id)
+    yield from _load_cohort(api, [member.user for member in group.members], cache, max_workers)
+
+
+def load_groups_cohort(api, group_ids: Optional[List[int]] = None, cache: Optional[AnalyticsCache] = None,
+                       max_workers: Optional[int] = None):
+    """
+    Показатели по участникам нескольких групп (по умолчанию всех): студент из
+    нескольких групп учитывается один раз, распределения по курсам собираются
+    по всем студентам курса. Выдаёт то же, что load_group_cohort
+    """
+    if group_ids is None:
+        group_ids = [group.id for group in api.get_groups()]
+    users = {}
+    for group in asyncio.run(_load_groups(api, group_ids, max_workers)):
+        for member in group.members:
+            users.setdefault(member.user.id, member.user)
+    yield from _load_cohort(api, list(users.values()), cache, max_workers)
+
+
+async def _load_groups(api, group_ids: List[int], max_workers: Optional[int]) -> list:
+    """Параллельная загрузка групп с участниками через асинхронный клиент"""
+    async with AsyncGushubAPI(api, max_workers) as async_api:
+        return await async_api.get_groups_details(group_ids)
+
+
+def _load_cohort(api, users: list, cache: Optional[AnalyticsCache], max_workers: Optional[int]):
+    cache = cache or AnalyticsCache.shared()
+    yield 0, len(users)
+    profiles: List[Optional[StudentProfile]] = [None] * len(users)
+    for done, (position, profile) in enumerate(iter_profiles(api, cache, [user.id for user in users], max_workers), start=1):
+        profiles[position] = profile
+        yield done, len(users)
+    yield CohortStats(zip(users, profiles))
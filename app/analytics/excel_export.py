@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+
+# Именованные стили отчётов
+TITLE_STYLE = 'report_title'
+SECTION_STYLE = 'report_section'
+HEADER_STYLE = 'report_header'
+CELL_STYLE = 'report_cell'
+
+MIN_COLUMN_WIDTH = 8
+MAX_COLUMN_WIDTH = 60
+
+
+def _named_styles() -> List[NamedStyle]:
+    side = Side(style='thin')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    alignment = Alignment(horizontal='left', vertical='center')
+    return [
+        NamedStyle(TITLE_STYLE, font=Font(bold=True, size=14), alignment=alignment),
+        NamedStyle(SECTION_STYLE, font=Font(bold=True), border=border, alignment=alignment),
+        NamedStyle(HEADER_STYLE, font=Font(bold=True), border=border, alignment=alignment),
+        NamedStyle(CELL_STYLE, border=border, alignment=alignment),
+    ]
+
+
+class ExcelSheetWriter:
+    """
+    Лист книги в режиме только для записи: строки сразу уходят во
+    временный файл, в памяти остаются только первые SAMPLE_ROWS строк.
+
+    Ширина колонок в этом режиме записывается до первой строки, поэтому
+    она считается по буферу первых строк, который сбрасывается в файл при
+    его заполнении или при сохранении книги.
+    """
+    SAMPLE_ROWS = 1000
+
+    def __init__(self, worksheet, sample_rows: Optional[int] = None):
+        self.worksheet = worksheet
+        self.sample_rows = self.SAMPLE_ROWS if sample_rows is None else sample_rows
+        self.widths: Dict[int, int] = {}
+        self._buffer: List[list] = []
+        self._flushed = False
+        self._cells: Dict[str, List[WriteOnlyCell]] = {}
+        self.freeze_panes: Optional[str] = None
+
+    def _styled(self, values: Sequence[object], style: str) -> List[WriteOnlyCell]:
+        """
+        Ячейки со стилем. Записанная ячейка сразу сериализуется, поэтому
+        ячейки переиспользуются, а стиль назначается один раз на колонку.
+        """
+        cells = self._cells.setdefault(style, [])
+        while len(cells) < len(values):
+            cell = WriteOnlyCell(self.worksheet)
+            cell.style = style
+            cells.append(cell)
+        row = cells[:len(values)]
+        for cell, value in zip(row, values):
+            cell.value = value
+        return row
+
+    def append(self, values: Sequence[object], style: Optional[str] = None) -> None:
+        """Строка листа; без стиля записываются просто значения (самый быстрый путь)"""
+        if not self._flushed:
+            # Заголовок листа шире колонок и на их ширину не влияет
+            for index, value in enumerate(values if style != TITLE_STYLE else ()):
+                if value is not None:
+                    self.widths[index] = max(self.widths.get(index, 0), len(str(value)))
+            self._buffer.append([list(values), style])
+            if len(self._buffer) >= self.sample_rows:
+                self.flush()
+            return
+        self._write(values, style)
+
+    def _write(self, values: Sequence[object], style: Optional[str]) -> None:
+        self.worksheet.append(self._styled(values, style) if style else values)
+
+    def flush(self) -> None:
+        """Запись ширины колонок и накопленных строк"""
+        if self._flushed:
+            return
+        self._flushed = True
+        for index, width in self.widths.items():
+            width = min(max(width + 2, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH)
+            self.worksheet.column_dimensions[get_column_letter(index + 1)].width = width
+        if self.freeze_panes:
+            self.worksheet.freeze_panes = self.freeze_panes
+        for values, style in self._buffer:
+            self._write(values, style)
+        self._buffer = []
+
+    # Типовые строки отчёта
+    def title(self, text: str) -> None:
+        self.append([text], TITLE_STYLE)
+
+    def blank(self) -> None:
+        self.append([])
+
+    def section(self, text: str, columns: int = 2) -> None:
+        """Заголовок раздела на ширину columns колонок (без объединения ячеек)"""
+        self.append([text] + [None] * (columns - 1), SECTION_STYLE)
+
+    def header(self, columns: Sequence[str]) -> None:
+        self.append(columns, HEADER_STYLE)
+
+    def field(self, label: str, value: object) -> None:
+        self.append([label, value], CELL_STYLE)
+
+    def rows(self, rows: Iterable[Sequence[object]], style: Optional[str] = None) -> None:
+        for values in rows:
+            self.append(values, style)
+
+
+class ExcelExport:
+    """
+    Экспорт в Excel в потоковом режиме openpyxl (write_only):
+    память не растёт с числом строк, стили регистрируются один раз.
+    """
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        for style in _named_styles():
+            self.workbook.add_named_style(style)
+        self.sheets: List[ExcelSheetWriter] = []
+
+    def add_sheet(self, title: str, sample_rows: Optional[int] = None) -> ExcelSheetWriter:
+        sheet = ExcelSheetWriter(self.workbook.create_sheet(title), sample_rows)
+        self.sheets.append(sheet)
+        return sheet
+
+    def save(self, file_path: str) -> None:
+        for sheet in self.sheets:
+            sheet.flush()
+        self.workbook.save(file_path)
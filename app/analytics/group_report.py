@@ -0,0 +1,187 @@
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from app.analytics.excel_export import ExcelExport
+from app.analytics.cache import AnalyticsCache, iter_profiles
+from app.analytics.cohort import COURSE_COLUMNS, CohortStats
+from app.analytics.snapshots import HISTORY_DAYS, history_since, record_snapshots
+from app.analytics.tabular import ExcelTableWriter, Table, writer_for
+from app.api.gushub_api import GushubAPI, GroupDetailResponse, StudentProfile
+from app.database.database import Database
+
+
+# Колонки листа со статистикой студентов
+STUDENT_COLUMNS = [
+    "Имя", "Логин", "Email", "Всего курсов", "Завершено курсов",
+    "Всего заданий", "Выполнено заданий", "Прогресс, %", "Время, мин",
+    "Всего оценок", "Средняя оценка", "Оценок 5", "Оценок 4", "Оценок 3", "Оценок 2",
+    "Статус",
+]
+# Типы колонок для форматов со схемой (Parquet): доли и средние - дробные
+STUDENT_COLUMN_TYPES = {
+    "Имя": str, "Логин": str, "Email": str, "Всего курсов": int, "Завершено курсов": int,
+    "Всего заданий": int, "Выполнено заданий": int, "Прогресс, %": float, "Время, мин": float,
+    "Всего оценок": int, "Средняя оценка": float, "Оценок 5": int, "Оценок 4": int, "Оценок 3": int, "Оценок 2": int,
+    "Статус": str,
+}
+STATUS_LOADED = "Загружено"
+STATUS_FAILED = "Не удалось загрузить статистику"
+
+
+def _value(value):
+    return value if value not in (None, '', 'None') else 'Не задано'
+
+
+def student_row(member, profile: Optional[StudentProfile]) -> list:
+    """Строка отчёта по участнику группы"""
+    user = member.user
+    row = [_value(user.firstName), _value(user.username)]
+    if profile is None:
+        # Колонки данных остаются пустыми, чтобы в них не было текста ошибки
+        return row + [None] * (len(STUDENT_COLUMNS) - 3) + [STATUS_FAILED]
+
+    stats, grades = profile.statistics, profile.grades
+    progress = None
+    if stats.totalTasks:
+        progress = round(stats.completedTasks / stats.totalTasks * 100, 1)
+    by_value = grades.gradesByValue or {}
+    return row + [
+        _value(profile.user.email),
+        stats.totalCourses, stats.completedCourses,
+        stats.totalTasks, stats.completedTasks, progress,
+        stats.totalTimeSpent,
+        grades.totalGrades, None if grades.averageGrade is None else round(grades.averageGrade, 2),
+        by_value.get('5', 0), by_value.get('4', 0), by_value.get('3', 0), by_value.get('2', 0),
+        STATUS_LOADED,
+    ]
+
+
+def students_table(members, profiles: List[Optional[StudentProfile]]) -> Table:
+    """Статистика участников в табличном виде для любого формата экспорта"""
+    return Table(STUDENT_COLUMNS, (student_row(member, profile) for member, profile in zip(members, profiles)),
+                 "Студенты", STUDENT_COLUMN_TYPES)
+
+
+def _average(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def summary_rows(group: GroupDetailResponse, profiles: List[Optional[StudentProfile]]) -> List[Tuple[str, object]]:
+    """Сводные показатели группы по загруженным профилям"""
+    loaded = [profile for profile in profiles if profile is not None]
+    graded = [profile.grades.averageGrade for profile in loaded
+              if profile.grades.totalGrades and profile.grades.averageGrade is not None]
+    progress = [
+        profile.statistics.completedTasks / profile.statistics.totalTasks * 100
+        for profile in loaded if profile.statistics.totalTasks
+    ]
+    return [
+        ("Группа", _value(group.name)),
+        ("Описание", _value(group.description)),
+        ("Количество участников", len(group.members)),
+        ("Статистика загружена", len(loaded)),
+        ("Не удалось загрузить", len(profiles) - len(loaded)),
+        ("Количество курсов", len(group.courses)),
+        ("Средний прогресс, %", _average(progress)),
+        ("Средняя оценка", _average(graded)),
+        ("Всего оценок", sum(profile.grades.totalGrades for profile in loaded)),
+        ("Суммарное время, мин", sum(profile.statistics.totalTimeSpent or 0 for profile in loaded)),
+    ]
+
+
+def write_cohort_sheet(export: ExcelExport, cohort: CohortStats) -> None:
+    """Лист с распределениями по группе, курсами и группой риска"""
+    sheet = export.add_sheet("Показатели группы")
+    sheet.section("Распределения")
+    for label, value in cohort.summary_rows():
+        sheet.field(label, value)
+    sheet.blank()
+
+    sheet.section("Прогресс по курсам", len(COURSE_COLUMNS))
+    sheet.header(COURSE_COLUMNS)
+    sheet.rows(cohort.course_rows())
+    sheet.blank()
+
+    sheet.section("Группа риска", 3)
+    sheet.header(["Имя", "Логин", "Причина"])
+    sheet.rows([_value(user.firstName), _value(user.username), reason] for user, reason in cohort.at_risk)
+
+
+def write_history_sheet(export: ExcelExport, members, snapshots: List[dict]) -> None:
+    """Лист с изменением показателей участников за семестр по снимкам статистики"""
+    by_user = {}
+    for snapshot in snapshots:
+        by_user.setdefault(snapshot['user_id'], []).append(snapshot)
+    sheet = export.add_sheet("История")
+    columns = ["Имя", "Логин", "Снимков", "Первый снимок", "Выполнено заданий (было)",
+               "Выполнено заданий (стало)", "Прирост заданий", "Средняя оценка (было)", "Средняя оценка (стало)"]
+    sheet.section(f"Изменения за {HISTORY_DAYS} дн.", len(columns))
+    sheet.header(columns)
+    rows = []
+    for member in members:
+        history = by_user.get(member.user.id)
+        if not history:
+            rows.append([_value(member.user.firstName), _value(member.user.username), 0] + [None] * (len(columns) - 3))
+            continue
+        first, last = history[0], history[-1]
+        rows.append([
+            _value(member.user.firstName), _value(member.user.username), len(history),
+            datetime.fromtimestamp(first['taken_at']).strftime('%d.%m.%Y'),
+            first['completed_tasks'], last['completed_tasks'],
+            (last['completed_tasks'] or 0) - (first['completed_tasks'] or 0),
+            first['average_grade'], last['average_grade'],
+        ])
+    sheet.rows(rows)
+
+
+def build_group_report(api: GushubAPI, group_id: int, file_path: str,
+                       max_workers: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Отчёт по группе. В Excel - сводный лист, лист со статистикой каждого
+    участника, показатели группы и история по снимкам статистики, в CSV и
+    Parquet - только таблица участников.
+
+    Профили участников загружаются параллельно. Генератор выдаёт прогресс
+    (загружено, всего) и сохраняет файл после загрузки всех профилей;
+    если генератор закрыть раньше, файл не создаётся.
+    """
+    writer = writer_for(file_path)
+    group = api.get_group(group_id)
+    members = group.members
+    total = len(members)
+    yield 0, total
+
+    profiles: List[Optional[StudentProfile]] = [None] * total
+    done = 0
+    cache = AnalyticsCache.shared()
+    for position, profile in iter_profiles(api, cache, [member.user.id for member in members], max_workers):
+        profiles[position] = profile
+        done += 1
+        yield done, total
+
+    # Загруженные профили заодно пополняют историю статистики
+    try:
+        record_snapshots(zip((member.user.id for member in members), profiles))
+    except Exception as e:
+        print(f"Ошибка при сохранении снимков статистики: {str(e)}")
+
+    table = students_table(members, profiles)
+    if not isinstance(writer, ExcelTableWriter):
+        writer.write(table, file_path)
+        return
+
+    export = ExcelExport()
+    summary = export.add_sheet("Сводка")
+    summary.title(f"Отчёт по группе: {_value(group.name)}")
+    summary.blank()
+    for label, value in summary_rows(group, profiles):
+        summary.field(label, value)
+    writer.write_sheet(export, table)
+    write_cohort_sheet(export, CohortStats(zip((member.user for member in members), profiles)))
+    db = Database()
+    try:
+        snapshots = db.get_snapshots_in_range(history_since(), user_ids=[member.user.id for member in members])
+    finally:
+        db.close()
+    write_history_sheet(export, members, snapshots)
+    export.save(file_path)
@@ -0,0 +1,51 @@
+import time
+from typing import Iterable, Optional, Tuple
+
+from app.api.gushub_api import StudentProfile
+from app.database.database import Database
+
+# Период истории по умолчанию - примерно семестр
+HISTORY_DAYS = 180
+
+
+def snapshot_values(profile: StudentProfile) -> dict:
+    """Показатели профиля студента для снимка статистики"""
+    stats, grades = profile.statistics, profile.grades
+    by_value = grades.gradesByValue or {}
+    return {
+        'total_courses': stats.totalCourses,
+        'completed_courses': stats.completedCourses,
+        'total_tasks': stats.totalTasks,
+        'completed_tasks': stats.completedTasks,
+        'total_time_spent': stats.totalTimeSpent,
+        'total_grades': grades.totalGrades,
+        'average_grade': round(grades.averageGrade, 2) if grades.averageGrade is not None else None,
+        'grades_2': by_value.get('2', 0),
+        'grades_3': by_value.get('3', 0),
+        'grades_4': by_value.get('4', 0),
+        'grades_5': by_value.get('5', 0),
+    }
+
+
+def record_snapshots(profiles: Iterable[Tuple[int, Optional[StudentProfile]]], db: Optional[Database] = None) -> int:
+    """
+    Сохранение снимков для пар (id студента, профиль) одной транзакцией;
+    пропущенные профили и неизменившиеся показатели не записываются. Без db
+    открывается своё соединение - так функцию можно вызывать из фонового
+    потока. Возвращает число добавленных снимков.
+    """
+    snapshots = [(user_id, snapshot_values(profile)) for user_id, profile in profiles if profile is not None]
+    if not snapshots:
+        return 0
+    own_db = db is None
+    db = db or Database()
+    try:
+        return db.add_student_snapshots(snapshots)
+    finally:
+        if own_db:
+            db.close()
+
+
+def history_since(days: int = HISTORY_DAYS) -> int:
+    """Начало периода истории в секундах Unix"""
+    return int(time.time()) - days * 24 * 60 * 60
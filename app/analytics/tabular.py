@@ -0,0 +1,164 @@
+import csv
+import os
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.analytics.excel_export import ExcelExport, ExcelSheetWriter
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet необязателен: без pyarrow формат просто недоступен
+    pyarrow = None
+
+
+class Table:
+    """
+    Табличные данные для экспорта: заголовки колонок и строки.
+    Строки могут быть генератором - писатели проходят их один раз.
+    types - типы колонок (int, float, str, bool) для форматов со схемой;
+    типы остальных колонок определяются по данным.
+    """
+    def __init__(self, columns: Sequence[str], rows: Iterable[Sequence[object]], title: str = "Данные",
+                 types: Optional[Dict[str, type]] = None):
+        self.columns = list(columns)
+        self.rows = rows
+        self.title = title
+        self.types = dict(types or {})
+
+
+class TableWriter(ABC):
+    """Формат экспорта таблицы"""
+    name = ''
+    extension = ''
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    @property
+    def file_filter(self) -> str:
+        """Фильтр для QFileDialog"""
+        return f"{self.name} (*{self.extension})"
+
+    @abstractmethod
+    def write(self, table: Table, file_path: str) -> None:
+        """Сохранение таблицы в файл"""
+
+
+class ExcelTableWriter(TableWriter):
+    name = 'Excel'
+    extension = '.xlsx'
+
+    def write_sheet(self, export: ExcelExport, table: Table) -> ExcelSheetWriter:
+        """Таблица отдельным листом в уже создаваемой книге"""
+        sheet = export.add_sheet(table.title)
+        sheet.freeze_panes = 'A2'
+        sheet.header(table.columns)
+        sheet.rows(table.rows)
+        return sheet
+
+    def write(self, table: Table, file_path: str) -> None:
+        export = ExcelExport()
+        self.write_sheet(export, table)
+        export.save(file_path)
+
+
+class CsvTableWriter(TableWriter):
+    """CSV в UTF-8 с BOM: так его корректно открывает и Excel, и pandas"""
+    name = 'CSV'
+    extension = '.csv'
+
+    def write(self, table: Table, file_path: str) -> None:
+        with open(file_path, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(table.columns)
+            writer.writerows(table.rows)
+
+
+class ParquetTableWriter(TableWriter):
+    """
+    Колоночный формат Parquet (нужен pyarrow). Строки пишутся пакетами
+    по BATCH_SIZE. Схема берётся из типов таблицы, а для колонок без типа
+    определяется по первому пакету; целые при этом расширяются до float64,
+    иначе дробное значение в следующем пакете не уложилось бы в схему.
+    """
+    name = 'Parquet'
+    extension = '.parquet'
+    BATCH_SIZE = 10000
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return pyarrow is not None
+
+    @staticmethod
+    def _declared_type(python_type: type):
+        return {
+            int: pyarrow.int64(), float: pyarrow.float64(), str: pyarrow.string(), bool: pyarrow.bool_(),
+        }[python_type]
+
+    def _schema(self, table: Table, batch: List[Sequence[object]]):
+        fields = []
+        for index, column in enumerate(table.columns):
+            if column in table.types:
+                fields.append(pyarrow.field(column, self._declared_type(table.types[column])))
+                continue
+            values = [row[index] for row in batch if row[index] is not None]
+            # Колонки без значений и со смешанными типами сохраняются строками
+            try:
+                data_type = pyarrow.array(values).type if values else pyarrow.string()
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+                data_type = pyarrow.string()
+            if pyarrow.types.is_integer(data_type):
+                data_type = pyarrow.float64()
+            fields.append(pyarrow.field(column, data_type))
+        return pyarrow.schema(fields)
+
+    def _record_batch(self, schema, batch: List[Sequence[object]]):
+        arrays = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in batch]
+            if pyarrow.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(pyarrow.array(values, type=field.type))
+        return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def write(self, table: Table, file_path: str) -> None:
+        if not self.is_available():
+            raise RuntimeError("Для экспорта в Parquet установите пакет pyarrow")
+        rows = iter(table.rows)
+        batch = list(islice(rows, self.BATCH_SIZE))
+        schema = self._schema(table, batch)
+        with pyarrow.parquet.ParquetWriter(file_path, schema) as writer:
+            while batch:
+                writer.write_batch(self._record_batch(schema, batch))
+                batch = list(islice(rows, self.BATCH_SIZE))
+
+
+WRITERS: List[TableWriter] = [ExcelTableWriter(), CsvTableWriter(), ParquetTableWriter()]
+
+
+def available_writers() -> List[TableWriter]:
+    return [writer for writer in WRITERS if writer.is_available()]
+
+
+def file_filters() -> str:
+    """Фильтры QFileDialog для всех доступных форматов"""
+    return ';;'.join(writer.file_filter for writer in available_writers())
+
+
+def writer_for(file_path: str, file_filter: Optional[str] = None) -> TableWriter:
+    """Формат по расширению файла, а без него - по выбранному в диалоге фильтру"""
+    extension = os.path.splitext(file_path)[1].lower()
+    writers: Dict[str, TableWriter] = {writer.extension: writer for writer in available_writers()}
+    if extension in writers:
+        return writers[extension]
+    for writer in writers.values():
+        if writer.file_filter == file_filter:
+            return writer
+    raise ValueError(f"Неподдерживаемый формат файла: {extension or file_path}")
+
+
+def write_table(table: Table, file_path: str, file_filter: Optional[str] = None) -> None:
+    writer_for(file_path, file_filter).write(table, file_path)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+from typing import Optional, Tuple
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PyQt6.QtGui import QImage, QImageReader
+
+from app.database.database import Database
+
+# Размер обложки курса: больше изображение не показывается на gushub.ru
+COVER_WIDTH = 1280
+COVER_HEIGHT = 720
+JPEG_QUALITY = 85
+# Файл не больше обложки и меньше этого размера не сжимается повторно, байты
+KEEP_ORIGINAL_SIZE = 256 * 1024
+
+MIME_TYPES = {'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp', 'gif': 'image/gif'}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CoverImage:
+    """Подготовленная к загрузке обложка: данные файла, его имя и тип"""
+    def __init__(self, filename: str, data: bytes, mime_type: str):
+        self.filename = filename
+        self.data = data
+        self.mime_type = mime_type
+
+
+def prepare_cover(path: str, width: int = COVER_WIDTH, height: int = COVER_HEIGHT) -> CoverImage:
+    """
+    Уменьшение изображения до размера обложки и повторное сжатие:
+    изображения с прозрачностью сохраняются в PNG, остальные в JPEG.
+    Небольшой файл, который уже не больше обложки, отправляется как есть.
+    Работает без окон, поэтому подходит для фоновых задач.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)  # Поворот фотографий по EXIF
+    source_format = bytes(reader.format()).decode().lower()
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Не удалось прочитать изображение {os.path.basename(path)}: {reader.errorString()}")
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    if image.width() > width or image.height() > height:
+        image = image.scaled(QSize(width, height), Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    elif source_format in MIME_TYPES and os.path.getsize(path) <= KEEP_ORIGINAL_SIZE:
+        with open(path, 'rb') as file:
+            return CoverImage(os.path.basename(path), file.read(), MIME_TYPES[source_format])
+
+    if image.hasAlphaChannel():
+        target_format, quality = 'png', -1
+    else:
+        target_format, quality = 'jpeg', JPEG_QUALITY
+        image = image.convertToFormat(QImage.Format.Format_RGB32)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if not image.save(buffer, target_format.upper(), quality):
+        raise ValueError(f"Не удалось сжать изображение {os.path.basename(path)}")
+    buffer.close()
+    extension = 'jpg' if target_format == 'jpeg' else target_format
+    return CoverImage(f"{name}.{extension}", bytes(data), MIME_TYPES[target_format])
+
+
+class UploadedImages:
+    """
+    Адреса загруженных в Gushub изображений по хешу исходного файла: та же
+    обложка для другого курса (или при повторе задачи) не загружается и не
+    сжимается повторно. Одно соединение с базой используется из разных
+    потоков под блокировкой.
+    """
+    _shared: Optional['UploadedImages'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "database.db"):
+        self.db = Database(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'UploadedImages':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, account: str, sha256: str) -> Optional[str]:
+        try:
+            with self._lock:
+                return self.db.get_uploaded_image(account, sha256)
+        except Exception as e:
+            print(f"Ошибка при чтении загруженных изображений: {str(e)}")
+            return None
+
+    def store(self, account: str, sha256: str, url: str) -> None:
+        try:
+            with self._lock:
+                self.db.save_uploaded_image(account, sha256, url)
+        except Exception as e:
+            print(f"Ошибка при сохранении загруженного изображения: {str(e)}")
+
+    def forget(self, account: str, url: str) -> None:
+        try:
+            with self._lock:
+                self.db.delete_uploaded_image(account, url)
+        except Exception as e:
+            print(f"Ошибка при удалении загруженного изображения: {str(e)}")
+
+
+def upload_cover(gushub_api, path: str, uploaded: Optional[UploadedImages] = None) -> Tuple[str, bool]:
+    """
+    Загрузка обложки курса в Gushub, возвращает её адрес и признак новой
+    загрузки (False - взято уже загруженное изображение)
+    """
+    uploaded = uploaded or UploadedImages.shared()
+    sha256 = file_sha256(path)
+    url = uploaded.get(gushub_api.account, sha256)
+    if url:
+        return url, False
+    cover = prepare_cover(path)
+    url = gushub_api.upload_photo(cover.filename, cover.data, cover.mime_type)['url']
+    uploaded.store(gushub_api.account, sha256, url)
+    return url, True
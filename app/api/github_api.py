@@ -1,16 +1,120 @@
-from github import Github, GithubException, Repository
+from github import Github, GithubException, GithubRetry, InputGitTreeElement, Repository
+import base64
+import os
 import re
+import requests
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
 from transliterate import translit
 
+from app.api.resilience import RetryPolicy, CircuitBreaker, RETRYABLE_STATUSES, is_transport_error
+from app.api.github_scheduler import GitHubRateLimitScheduler
+
+
+def is_github_failure(exc: BaseException) -> bool:
+    """Ошибка, говорящая о недоступности GitHub, а не о неверном запросе"""
+    if isinstance(exc, GithubException):
+        return exc.status >= 500
+    return is_transport_error(exc)
+
+
+# GitHub не принимает файлы больше 100 МБ
+MAX_FILE_SIZE = 100 * 1024 * 1024
+# Файлы больше этого размера выкладываются потоком, без чтения целиком
+STREAM_THRESHOLD = 1024 * 1024
+# Размер читаемой части файла, кратен 3, чтобы части base64 склеивались без заполнения
+STREAM_CHUNK = 3 * 256 * 1024
+
+
+def check_file_size(path: str) -> int:
+    """Размер файла; ValueError, если GitHub его не примет"""
+    size = os.path.getsize(path)
+    if size > MAX_FILE_SIZE:
+        raise ValueError(
+            f"Файл {os.path.basename(path)} занимает {size / 1024 / 1024:.1f} МБ, "
+            f"GitHub принимает файлы до {MAX_FILE_SIZE // 1024 // 1024} МБ"
+        )
+    return size
+
+
+class LocalFile:
+    """Файл на диске для commit_files: содержимое передаётся потоком"""
+    def __init__(self, path: str):
+        self.path = path
+
+
+class Base64BlobBody:
+    """
+    Тело запроса создания blob из файла: JSON с содержимым в base64,
+    которое кодируется по частям при отправке. Длина известна заранее,
+    поэтому запрос уходит с Content-Length, а в памяти одна часть файла
+    """
+    PREFIX = b'{"encoding": "base64", "content": "'
+    SUFFIX = b'"}'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+
+    def __len__(self) -> int:
+        return len(self.PREFIX) + (self.size + 2) // 3 * 4 + len(self.SUFFIX)
+
+    def __iter__(self):
+        yield self.PREFIX
+        with open(self.path, 'rb') as file:
+            for chunk in iter(lambda: file.read(STREAM_CHUNK), b''):
+                yield base64.b64encode(chunk)
+        yield self.SUFFIX
+
 
 class GitHubAPI:
     def __init__(self, token: str):
-        self.github = Github(token)
+        policy = RetryPolicy.from_settings()
+        self.timeout = policy.timeout
+        # GithubRetry учитывает Retry-After и заголовки лимитов GitHub
+        retry = GithubRetry(
+            total=policy.max_retries,
+            status_forcelist=sorted(RETRYABLE_STATUSES),
+            backoff_factor=policy.backoff_base,
+            backoff_max=policy.backoff_max,
+            backoff_jitter=policy.backoff_base,
+        )
+        # PyGithub принимает один целочисленный таймаут на подключение и чтение.
+        # Темп изменяющих запросов задаёт общий планировщик, а не PyGithub
+        self.github = Github(token, timeout=int(policy.read_timeout), retry=retry,
+                             seconds_between_writes=None)
+        # Сессия для запросов в обход PyGithub (потоковая загрузка файлов) с теми же повторами
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(max_retries=retry))
+        self.session.headers.update({
+            'Authorization': f"token {token}",
+            'Accept': 'application/vnd.github+json',
+        })
+        self.breaker = CircuitBreaker.get('GitHub', is_github_failure)
+        self.scheduler = GitHubRateLimitScheduler.shared()
         try:
-            self.user = self.github.get_user()
+            with self._read():
+                self.user = self.github.get_user()
         except GithubException as e:
             raise ValueError("Ошибка авторизации в GitHub API: " + str(e))
 
+    @contextmanager
+    def _read(self):
+        """Читающий запрос: ожидание лимита и предохранитель"""
+        with self.scheduler.read(self.github.requester), self.breaker:
+            yield
+
+    @contextmanager
+    def _write(self):
+        """Изменяющий запрос: очередь и темп планировщика, предохранитель"""
+        with self.scheduler.mutation(self.github.requester), self.breaker:
+            yield
+
+    def get_contents(self, repo: Repository.Repository, path: str):
+        """Получение файла или содержимого директории репозитория"""
+        with self._read():
+            return repo.get_contents(path)
+
     def _make_valid_repo_name(self, name: str) -> str:
         name = translit(name, 'ru', reversed=True)
         name = name.lower().replace(" ", "-")
@@ -21,13 +125,15 @@ class GitHubAPI:
     def create_course(self, course_title: str, course_description: str) -> Repository.Repository:
         repo_name = self._make_valid_repo_name(course_title)
         try:
-            repo = self.user.create_repo(
-                name=repo_name,
-                description=course_description,
-                private=False
-            )
+            with self._write():
+                repo = self.user.create_repo(
+                    name=repo_name,
+                    description=course_description,
+                    private=False
+                )
             readme_content = f"# {course_title}\n\n{course_description}"
-            repo.create_file("README.md", "Initial commit: course README", readme_content, branch="main")
+            with self._write():
+                repo.create_file("README.md", "Initial commit: course README", readme_content, branch="main")
             return repo
         except GithubException as e:
             raise RuntimeError("Ошибка при создании курса: " + str(e))
@@ -35,15 +141,18 @@ class GitHubAPI:
     def get_course(self, course_title: str) -> Repository.Repository:
         repo_name = self._make_valid_repo_name(course_title)
         try:
-            repo = self.user.get_repo(repo_name)
+            with self._read():
+                repo = self.user.get_repo(repo_name)
             return repo
         except GithubException as e:
             raise RuntimeError("Ошибка при получении курса: " + str(e))
         
     def delete_course(self, repo_name: str):
         try:
-            repo = self.user.get_repo(repo_name)
-            repo.delete()
+            with self._read():
+                repo = self.user.get_repo(repo_name)
+            with self._write():
+                repo.delete()
         except GithubException as e:
             raise RuntimeError("Ошибка при удалении курса: " + str(e))
         
@@ -52,52 +161,46 @@ class GitHubAPI:
         try:
             path = f"{module_name}/README.md"
             content = f"# {module_name}\n\n{module_description}"
-            repo.create_file(path, f"Create module {module_name}", content, branch="main")
+            with self._write():
+                repo.create_file(path, f"Create module {module_name}", content, branch="main")
             return module_name
         except GithubException as e:
             raise RuntimeError("Ошибка при создании модуля: " + str(e))
         
     def delete_module(self, repo, module_name: str) -> None:
-        """Удаляет модуль из репозитория"""
+        """Удаляет модуль из репозитория вместе с вложенными папками (например, assets)"""
         try:
-            # Получаем содержимое директории модуля
-            contents = repo.get_contents(module_name)
-            
-            # Если это список файлов, удаляем каждый файл
-            if isinstance(contents, list):
-                for content in contents:
-                    repo.delete_file(
-                        path=content.path,
-                        message=f"Удаление файла {content.path} из модуля {module_name}",
-                        sha=content.sha
-                    )
-            # Если это один файл, удаляем его
-            else:
-                repo.delete_file(
-                    path=contents.path,
-                    message=f"Удаление модуля {module_name}",
-                    sha=contents.sha
-                )
+            with self._read():
+                ref = repo.get_git_ref("heads/main")
+                tree = repo.get_git_tree(repo.get_git_commit(ref.object.sha).tree.sha, recursive=True)
+            paths = [element.path for element in tree.tree
+                     if element.type == "blob" and element.path.startswith(f"{module_name}/")]
+            if not paths:
+                raise GithubException(404, {"message": f"Модуль {module_name} не найден"}, None)
+            self.delete_files(repo, paths, f"Удаление модуля {module_name}")
             
         except Exception as e:
             raise Exception(f"Ошибка при удалении модуля: {str(e)}")
 
     # Уроки
-    def create_lesson(self, repo: Repository.Repository, module_name: str, lesson_title: str, file_path: str) -> str:
-        """Создание урока в репозитории"""
+    def create_lesson(self, repo: Repository.Repository, module_name: str, lesson_title: str, file_path: str,
+                      content: str | None = None) -> str:
+        """Создание урока в репозитории (content - уже подготовленный текст файла)"""
         try:
             # Читаем содержимое файла
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
             # Создаем файл урока
             path = f"{module_name}/{lesson_title}.md"
-            repo.create_file(
-                path,
-                f"Add lesson {lesson_title}",
-                content,
-                branch="main"
-            )
+            with self._write():
+                repo.create_file(
+                    path,
+                    f"Add lesson {lesson_title}",
+                    content,
+                    branch="main"
+                )
             return path
             
         except Exception as e:
@@ -105,13 +208,15 @@ class GitHubAPI:
         
     def update_lesson(self, repo: Repository.Repository, path: str, new_content: str, commit_message: str, sha: str):
         try:
-            repo.update_file(path, commit_message, new_content, sha, branch="main")
+            with self._write():
+                repo.update_file(path, commit_message, new_content, sha, branch="main")
         except GithubException as e:
             raise RuntimeError("Ошибка при обновлении урока: " + str(e))
         
     def delete_lesson(self, repo: Repository.Repository, path: str, sha: str, message: str = "Delete file or folder"):
         try:
-            repo.delete_file(path, message, sha, branch="main")
+            with self._write():
+                repo.delete_file(path, message, sha, branch="main")
         except GithubException as e:
             raise RuntimeError("Ошибка при удалении урока: " + str(e))
         
@@ -120,19 +225,104 @@ class GitHubAPI:
                     commit_message: str) -> str:
         try:
             path = f"{module_path}/{filename}.md"
-            repo.create_file(path, commit_message, content, branch="main")
+            with self._write():
+                repo.create_file(path, commit_message, content, branch="main")
             return path
         except GithubException as e:
             raise RuntimeError("Ошибка при создании задания: " + str(e))
         
     def update_task(self, repo: Repository.Repository, path: str, new_content: str, commit_message: str, sha: str):
         try:
-            repo.update_file(path, commit_message, new_content, sha, branch="main")
+            with self._write():
+                repo.update_file(path, commit_message, new_content, sha, branch="main")
         except GithubException as e:
             raise RuntimeError("Ошибка при обновлении задания: " + str(e))
         
     def delete_task(self, repo: Repository.Repository, path: str, sha: str, message: str = "Delete file or folder"):
         try:
-            repo.delete_file(path, message, sha, branch="main")
+            with self._write():
+                repo.delete_file(path, message, sha, branch="main")
         except GithubException as e:
             raise RuntimeError("Ошибка при удалении задания: " + str(e))
+
+    def commit_files(self, repo: Repository.Repository, files: dict[str, str | bytes], message: str) -> None:
+        """
+        Создание или замена нескольких файлов одним коммитом через Git Data
+        API (например, урок вместе с его изображениями). Текст передаётся в
+        дереве коммита, двоичные файлы - отдельными blob в base64, файлы
+        LocalFile - потоком с диска
+        """
+        for data in files.values():
+            if isinstance(data, LocalFile):
+                check_file_size(data.path)
+        try:
+            with self._read():
+                ref = repo.get_git_ref("heads/main")
+                head = repo.get_git_commit(ref.object.sha)
+            elements = []
+            for path, data in files.items():
+                if isinstance(data, str):
+                    elements.append(InputGitTreeElement(path, "100644", "blob", content=data))
+                    continue
+                if isinstance(data, LocalFile):
+                    sha = self.create_blob_from_file(repo, data.path)
+                else:
+                    with self._write():
+                        sha = repo.create_git_blob(base64.b64encode(data).decode("ascii"), "base64").sha
+                elements.append(InputGitTreeElement(path, "100644", "blob", sha=sha))
+            with self._write():
+                new_tree = repo.create_git_tree(elements, base_tree=head.tree)
+            with self._write():
+                commit = repo.create_git_commit(message, new_tree, [head])
+            with self._write():
+                ref.edit(commit.sha)
+        except GithubException as e:
+            raise RuntimeError("Ошибка при сохранении файлов: " + str(e))
+
+    def create_blob_from_file(self, repo: Repository.Repository, file_path: str) -> str:
+        """
+        Создание blob из файла без чтения его в память целиком (PyGithub
+        принимает только готовую строку), возвращает sha blob
+        """
+        check_file_size(file_path)
+        try:
+            with self._write():
+                response = self.session.post(
+                    f"{repo.url}/git/blobs",
+                    data=Base64BlobBody(file_path),
+                    headers={'Content-Type': 'application/json'},
+                    timeout=self.timeout,
+                )
+            # Ответ прошёл мимо PyGithub: остаток лимита берётся из его заголовков
+            self.scheduler.observe_headers(response.headers)
+            response.raise_for_status()
+            return response.json()['sha']
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError("Ошибка при загрузке файла: " + str(e))
+
+    def delete_files(self, repo: Repository.Repository, paths: list[str], message: str) -> list[str]:
+        """
+        Удаление нескольких файлов одним коммитом через Git Data API вместо
+        отдельного коммита на каждый файл. Отсутствующие файлы пропускаются,
+        возвращаются удалённые пути
+        """
+        try:
+            with self._read():
+                ref = repo.get_git_ref("heads/main")
+                head = repo.get_git_commit(ref.object.sha)
+                tree = repo.get_git_tree(head.tree.sha, recursive=True)
+            existing = {element.path for element in tree.tree if element.type == "blob"}
+            removed = [path for path in dict.fromkeys(paths) if path in existing]
+            if not removed:
+                return []
+            # Элемент дерева без sha удаляет файл
+            elements = [InputGitTreeElement(path, "100644", "blob", sha=None) for path in removed]
+            with self._write():
+                new_tree = repo.create_git_tree(elements, base_tree=head.tree)
+            with self._write():
+                commit = repo.create_git_commit(message, new_tree, [head])
+            with self._write():
+                ref.edit(commit.sha)
+            return removed
+        except GithubException as e:
+            raise RuntimeError("Ошибка при удалении файлов: " + str(e))
@@ -0,0 +1,149 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional
+
+
+class RateLimitExhausted(RuntimeError):
+    """Лимит запросов GitHub исчерпан, а ждать его сброса слишком долго"""
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        retry_time = datetime.fromtimestamp(reset_at).strftime('%H:%M')
+        super().__init__(f"Лимит запросов GitHub исчерпан, повторите после {retry_time}")
+
+
+class GitHubRateLimitScheduler:
+    """
+    Планировщик запросов к GitHub с учётом лимитов.
+
+    Изменяющие запросы (создание, обновление и удаление файлов) выполняются
+    по очереди и не чаще одного в MUTATION_INTERVAL секунд, как рекомендует
+    GitHub для обхода вторичных лимитов. Остаток и время сброса основного
+    лимита берутся из заголовков X-RateLimit-* последних ответов; когда
+    остаток опускается до LOW_BUDGET, запросы ждут сброса лимита - не дольше
+    MAX_BUDGET_WAIT секунд и никогда в главном потоке (интерфейс не должен
+    зависать), иначе выбрасывается RateLimitExhausted со временем сброса.
+    Подписчики получают ожидаемое время ожидания в секундах.
+    """
+    MUTATION_INTERVAL = 1.0
+    LOW_BUDGET = 50
+    MAX_BUDGET_WAIT = 60.0
+
+    _shared: Optional['GitHubRateLimitScheduler'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._queue_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._last_mutation = 0.0
+        self._pending = 0
+        self.remaining = -1
+        self.limit = -1
+        self.reset_at = 0.0
+        self._listeners: List[Callable[[float], None]] = []
+
+    @classmethod
+    def shared(cls) -> 'GitHubRateLimitScheduler':
+        """Единый планировщик: лимиты общие для всех клиентов с одним токеном"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def add_listener(self, callback: Callable[[float], None]) -> None:
+        """Подписка на ожидаемое время ожидания (0 - очередь пуста)"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[float], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, wait: float) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(wait)
+            except Exception as e:
+                print(f"Ошибка в обработчике лимитов GitHub: {str(e)}")
+
+    def observe(self, requester) -> None:
+        """Обновление остатка лимита по последнему ответу PyGithub"""
+        remaining, limit = requester.rate_limiting
+        if limit < 0:
+            return
+        with self._state_lock:
+            self.remaining = remaining
+            self.limit = limit
+            self.reset_at = float(requester.rate_limiting_resettime)
+
+    def observe_headers(self, headers) -> None:
+        """Обновление остатка лимита по заголовкам X-RateLimit-* ответа, полученного без PyGithub"""
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+            limit = int(headers['X-RateLimit-Limit'])
+            reset_at = float(headers['X-RateLimit-Reset'])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._state_lock:
+            self.remaining = remaining
+            self.limit = limit
+            self.reset_at = reset_at
+
+    def _budget_wait(self) -> float:
+        """Время до сброса лимита, если остаток исчерпан"""
+        if 0 <= self.remaining <= self.LOW_BUDGET:
+            return max(self.reset_at - time.time(), 0.0)
+        return 0.0
+
+    def _check_budget(self) -> float:
+        """Время ожидания сброса лимита; RateLimitExhausted, если ждать нельзя"""
+        wait = self._budget_wait()
+        max_wait = 0.0 if threading.current_thread() is threading.main_thread() else self.MAX_BUDGET_WAIT
+        if wait > max_wait:
+            raise RateLimitExhausted(self.reset_at)
+        return wait
+
+    def _pacing_wait(self) -> float:
+        """Время до следующего разрешённого изменяющего запроса"""
+        return max(self._last_mutation + self.MUTATION_INTERVAL - time.monotonic(), 0.0)
+
+    def estimated_wait(self, mutations: int = 1) -> float:
+        """Ожидаемое время до выполнения ещё mutations изменяющих запросов"""
+        with self._state_lock:
+            queued = self._pending + mutations - 1
+        return self._budget_wait() + self._pacing_wait() + queued * self.MUTATION_INTERVAL
+
+    @contextmanager
+    def read(self, requester):
+        """Контекст читающего запроса: ждёт только при исчерпанном лимите"""
+        wait = self._check_budget()
+        if wait > 0:
+            self._notify(wait)
+            time.sleep(wait)
+        try:
+            yield
+        finally:
+            self.observe(requester)
+
+    @contextmanager
+    def mutation(self, requester):
+        """Контекст изменяющего запроса: очередь, темп и ожидание лимита"""
+        with self._state_lock:
+            self._pending += 1
+        try:
+            with self._queue_lock:
+                wait = self._check_budget() + self._pacing_wait()
+                if wait > 0:
+                    self._notify(self.estimated_wait(mutations=0))
+                    time.sleep(wait)
+                try:
+                    yield
+                finally:
+                    self._last_mutation = time.monotonic()
+                    self.observe(requester)
+        finally:
+            with self._state_lock:
+                self._pending -= 1
+                idle = self._pending == 0
+            if idle:
+                self._notify(0.0)
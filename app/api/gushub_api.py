@@ -1,19 +1,60 @@
 import requests
-from typing import Dict, Optional, List
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, List, Iterable, Iterator, Tuple
 from datetime import datetime
 from app.settings import AppSettings
+from app.api.token_manager import TokenManager
+from app.api.resilience import RetryPolicy, CircuitBreaker, request_with_retry
+from app.api.offline_cache import OfflineCache, is_service_unavailable
+import mimetypes
 import os
+import urllib.parse
+import threading
 
 
+# -- Dates --
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Разбор даты в формате ISO 8601 из ответа API"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+class LazyDatetime:
+    """
+    Дескриптор даты: хранит исходную строку из ответа API и разбирает её
+    только при первом обращении, после чего кеширует результат
+    """
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if isinstance(value, str):
+            value = parse_datetime(value)
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
 # -- Courses --
 class CourseData:
+    __slots__ = ('title', 'description', 'image')
+
     def __init__(self, title: str, description: str, image: str):
         self.title = title
         self.description = description
         self.image = image
     
 class CourseResponse:
-    def __init__(self, id: int, title: str, description: str, image: str, createdAt: datetime, updatedAt: datetime, modules: list):
+    __slots__ = ('id', 'title', 'description', 'image', '_createdAt', '_updatedAt', 'modules')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
+    def __init__(self, id: int, title: str, description: str, image: str, createdAt: datetime | str, updatedAt: datetime | str, modules: list):
         self.id = id
         self.title = title
         self.description = description
@@ -24,12 +65,18 @@ class CourseResponse:
 
 # -- Modules -- 
 class ModuleData:
+    __slots__ = ('title', 'description')
+
     def __init__(self, title: str, description: str):
         self.title = title
         self.description = description
 
 class ModuleResponse:
-    def __init__(self, id: int, title: str, description: str, order: int, courseId: int, createdAt: datetime, updatedAt: datetime, lessons: list):
+    __slots__ = ('id', 'title', 'description', 'order', 'courseId', '_createdAt', '_updatedAt', 'lessons')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
+    def __init__(self, id: int, title: str, description: str, order: int, courseId: int, createdAt: datetime | str, updatedAt: datetime | str, lessons: list):
         self.id = id
         self.title = title
         self.description = description
@@ -41,12 +88,18 @@ class ModuleResponse:
 
 # -- Lessons --
 class LessonData:
+    __slots__ = ('title', 'urlMD')
+
     def __init__(self, title: str, urlMD: str):
         self.title = title
         self.urlMD = urlMD
 
 class LessonResponse:
-    def __init__(self, id: int, title: str, moduleId: int, urlMD: str, order: int, createdAt: datetime, updatedAt: datetime, steps: list):
+    __slots__ = ('id', 'title', 'moduleId', 'urlMD', 'order', '_createdAt', '_updatedAt', 'steps')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
+    def __init__(self, id: int, title: str, moduleId: int, urlMD: str, order: int, createdAt: datetime | str, updatedAt: datetime | str, steps: list):
         self.id = id
         self.title = title
         self.moduleId = moduleId
@@ -58,13 +111,19 @@ class LessonResponse:
 
 # -- Steps --
 class StepData:
+    __slots__ = ('title', 'type', 'urlMD')
+
     def __init__(self, title: str, urlMD: str, type: str = "ASSIGNMENT"):
         self.title = title
         self.type = type
         self.urlMD = urlMD
 
 class StepResponse:
-    def __init__(self, id: int, title: str, type: str, urlMD: str, createdAt: datetime, updatedAt: datetime, lessonId: int, order: int):
+    __slots__ = ('id', 'title', 'type', 'urlMD', '_createdAt', '_updatedAt', 'lessonId', 'order')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
+    def __init__(self, id: int, title: str, type: str, urlMD: str, createdAt: datetime | str, updatedAt: datetime | str, lessonId: int, order: int):
         self.id = id
         self.title = title
         self.type = type
@@ -77,18 +136,26 @@ class StepResponse:
 # -- Statistics --
 # -- Groups --
 class GroupData:
+    __slots__ = ('name', 'description')
+
     def __init__(self, name: str, description: str = ""):
         self.name = name
         self.description = description
 
 class GroupCount:
+    __slots__ = ('members', 'courses')
+
     def __init__(self, members: int, courses: int):
         self.members = members
         self.courses = courses
 
 class GroupResponse:
+    __slots__ = ('id', 'name', 'description', 'inviteCode', '_createdAt', '_updatedAt', '_count')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
     def __init__(self, id: int, name: str, description: str, inviteCode: str, 
-                 createdAt: datetime, updatedAt: datetime, _count: GroupCount):
+                 createdAt: datetime | str, updatedAt: datetime | str, _count: GroupCount):
         self.id = id
         self.name = name
         self.description = description
@@ -97,7 +164,24 @@ class GroupResponse:
         self.updatedAt = updatedAt
         self._count = _count
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GroupResponse':
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            description=data['description'],
+            inviteCode=data['inviteCode'],
+            createdAt=data['createdAt'],
+            updatedAt=data['updatedAt'],
+            _count=GroupCount(
+                members=data['_count']['members'],
+                courses=data['_count']['courses']
+            )
+        )
+
 class GroupMemberUser:
+    __slots__ = ('id', 'username', 'firstName', 'lastName', 'middleName', 'avatar')
+
     def __init__(self, id: int, username: str, firstName: str, lastName: str, middleName: str, avatar: Optional[str]):
         self.id = id
         self.username = username
@@ -106,16 +190,44 @@ class GroupMemberUser:
         self.middleName = middleName
         self.avatar = avatar
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GroupMemberUser':
+        return cls(
+            id=data['id'],
+            username=data['username'],
+            firstName=data['firstName'],
+            lastName=data['lastName'],
+            middleName=data['middleName'],
+            avatar=data.get('avatar')
+        )
+
 class GroupMember:
-    def __init__(self, id: int, userId: int, groupId: int, joinedAt: datetime, user: GroupMemberUser):
+    __slots__ = ('id', 'userId', 'groupId', '_joinedAt', 'user')
+    joinedAt = LazyDatetime()
+
+    def __init__(self, id: int, userId: int, groupId: int, joinedAt: datetime | str, user: GroupMemberUser):
         self.id = id
         self.userId = userId
         self.groupId = groupId
         self.joinedAt = joinedAt
         self.user = user
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GroupMember':
+        return cls(
+            id=data['id'],
+            userId=data['userId'],
+            groupId=data['groupId'],
+            joinedAt=data['joinedAt'],
+            user=GroupMemberUser.from_dict(data['user'])
+        )
+
 class GroupDetailResponse:
-    def __init__(self, id: int, name: str, description: str, inviteCode: str, createdAt: datetime, updatedAt: datetime, members: list, courses: list):
+    __slots__ = ('id', 'name', 'description', 'inviteCode', '_createdAt', '_updatedAt', 'members', 'courses')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
+    def __init__(self, id: int, name: str, description: str, inviteCode: str, createdAt: datetime | str, updatedAt: datetime | str, members: list, courses: list):
         self.id = id
         self.name = name
         self.description = description
@@ -125,8 +237,24 @@ class GroupDetailResponse:
         self.members = members  # List[GroupMember]
         self.courses = courses  # List[CourseResponse] or just list
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GroupDetailResponse':
+        # courses можно обработать аналогично, если потребуется подробная структура
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            description=data['description'],
+            inviteCode=data['inviteCode'],
+            createdAt=data['createdAt'],
+            updatedAt=data['updatedAt'],
+            members=[GroupMember.from_dict(m) for m in data.get('members', [])],
+            courses=data.get('courses', [])
+        )
+
 # -- Users --
 class UserData:
+    __slots__ = ('username', 'firstName', 'lastName', 'middleName')
+
     def __init__(self, username: str, firstName: str = "", lastName: str = "", middleName: str = ""):
         self.username = username
         self.firstName = firstName
@@ -135,13 +263,18 @@ class UserData:
 
 class UserResponse:
     """Структура ответа для пользователя"""
+    __slots__ = ('id', 'username', 'firstName', 'lastName', 'email', 'role',
+                 'isBlocked', 'blockReason', '_createdAt', '_updatedAt')
+    createdAt = LazyDatetime()
+    updatedAt = LazyDatetime()
+
     def __init__(self, id: int, username: str, firstName: str, lastName: str,
                 isBlocked: bool = False,
                 role: Optional[str] = None,
                 email: Optional[str] = None,
                 blockReason: Optional[str] = None,
-                createdAt: Optional[datetime] = None,
-                updatedAt: Optional[datetime] = None):
+                createdAt: Optional[datetime | str] = None,
+                updatedAt: Optional[datetime | str] = None):
         self.id = id
         self.username = username
         self.firstName = firstName
@@ -153,8 +286,25 @@ class UserResponse:
         self.createdAt = createdAt
         self.updatedAt = updatedAt
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'UserResponse':
+        return cls(
+            id=data.get("id"),
+            username=data.get("username"),
+            firstName=data.get("firstName"),
+            lastName=data.get("lastName"),
+            email=data.get("email", None),
+            role=data.get("role", None),
+            isBlocked=data.get("isBlocked", False),
+            blockReason=data.get("blockReason", None),
+            createdAt=data.get("createdAt"),
+            updatedAt=data.get("updatedAt")
+        )
+
 # -- Statistics --
 class CourseProgress:
+    __slots__ = ('courseId', 'courseTitle', 'totalTasks', 'completedTasks', 'progressPercentage')
+
     def __init__(self, courseId: int, courseTitle: str, totalTasks: int, 
                  completedTasks: int, progressPercentage: int):
         self.courseId = courseId
@@ -164,6 +314,9 @@ class CourseProgress:
         self.progressPercentage = progressPercentage
 
 class UserStatistics:
+    __slots__ = ('courseProgress', 'totalCourses', 'completedCourses', 'totalTasks',
+                 'completedTasks', 'totalTimeSpent')
+
     def __init__(self, courseProgress: List[CourseProgress], totalCourses: int,
                  completedCourses: int, totalTasks: int, completedTasks: int,
                  totalTimeSpent: int):
@@ -174,8 +327,32 @@ class UserStatistics:
         self.completedTasks = completedTasks
         self.totalTimeSpent = totalTimeSpent
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'UserStatistics':
+        # Преобразуем прогресс по курсам
+        course_progress = [
+            CourseProgress(
+                courseId=progress['courseId'],
+                courseTitle=progress['courseTitle'],
+                totalTasks=progress['totalTasks'],
+                completedTasks=progress['completedTasks'],
+                progressPercentage=progress['progressPercentage']
+            )
+            for progress in data.get('courseProgress', [])
+        ]
+        return cls(
+            courseProgress=course_progress,
+            totalCourses=data.get('totalCourses', 0),
+            completedCourses=data.get('completedCourses', 0),
+            totalTasks=data.get('totalTasks', 0),
+            completedTasks=data.get('completedTasks', 0),
+            totalTimeSpent=data.get('totalTimeSpent', 0)
+        )
+
 # -- Grade Statistics --
 class GradeLesson:
+    __slots__ = ('id', 'title', 'moduleTitle', 'courseTitle')
+
     def __init__(self, id: int, title: str, moduleTitle: str, courseTitle: str):
         self.id = id
         self.title = title
@@ -183,13 +360,18 @@ class GradeLesson:
         self.courseTitle = courseTitle
 
 class GradeUser:
+    __slots__ = ('id', 'username', 'fullName')
+
     def __init__(self, id: int, username: str, fullName: str):
         self.id = id
         self.username = username
         self.fullName = fullName
 
 class RecentGrade:
-    def __init__(self, id: int, value: int, feedback: str, createdAt: datetime,
+    __slots__ = ('id', 'value', 'feedback', '_createdAt', 'lesson', 'user')
+    createdAt = LazyDatetime()
+
+    def __init__(self, id: int, value: int, feedback: str, createdAt: datetime | str,
                  lesson: GradeLesson, user: GradeUser):
         self.id = id
         self.value = value
@@ -198,9 +380,32 @@ class RecentGrade:
         self.lesson = lesson
         self.user = user
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RecentGrade':
+        return cls(
+            id=data['id'],
+            value=data['value'],
+            feedback=data['feedback'],
+            createdAt=data['createdAt'],
+            lesson=GradeLesson(
+                id=data['lesson']['id'],
+                title=data['lesson']['title'],
+                moduleTitle=data['lesson']['moduleTitle'],
+                courseTitle=data['lesson']['courseTitle']
+            ),
+            user=GradeUser(
+                id=data['user']['id'],
+                username=data['user']['username'],
+                fullName=data['user']['fullName']
+            )
+        )
+
 class BestGradedLesson:
+    __slots__ = ('lessonId', 'lessonTitle', 'courseId', 'courseTitle', 'moduleName', 'grade', '_gradedAt')
+    gradedAt = LazyDatetime()
+
     def __init__(self, lessonId: int, lessonTitle: str, courseId: int, courseTitle: str,
-                 moduleName: str, grade: int, gradedAt: datetime):
+                 moduleName: str, grade: int, gradedAt: datetime | str):
         self.lessonId = lessonId
         self.lessonTitle = lessonTitle
         self.courseId = courseId
@@ -209,7 +414,21 @@ class BestGradedLesson:
         self.grade = grade
         self.gradedAt = gradedAt
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BestGradedLesson':
+        return cls(
+            lessonId=data['lessonId'],
+            lessonTitle=data['lessonTitle'],
+            courseId=data['courseId'],
+            courseTitle=data['courseTitle'],
+            moduleName=data['moduleName'],
+            grade=data['grade'],
+            gradedAt=data['gradedAt']
+        )
+
 class UserGradesStatistics:
+    __slots__ = ('totalGrades', 'gradesByValue', 'bestGradedLesson', 'averageGrade', 'recentGrades')
+
     def __init__(self, totalGrades: int, gradesByValue: Dict[str, int],
                  bestGradedLesson: Optional[BestGradedLesson], averageGrade: float,
                  recentGrades: List[RecentGrade]):
@@ -219,45 +438,133 @@ class UserGradesStatistics:
         self.averageGrade = averageGrade
         self.recentGrades = recentGrades
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'UserGradesStatistics':
+        best_lesson = None
+        if data.get('bestGradedLesson'):
+            best_lesson = BestGradedLesson.from_dict(data['bestGradedLesson'])
+        return cls(
+            totalGrades=data.get('totalGrades', 0),
+            gradesByValue=data.get('gradesByValue', {"2": 0, "3": 0, "4": 0, "5": 0}),
+            bestGradedLesson=best_lesson,
+            averageGrade=data.get('averageGrade', 0.0),
+            recentGrades=[RecentGrade.from_dict(grade) for grade in data.get('recentGrades', [])]
+        )
+
+# -- Student Profile --
+class StudentProfile:
+    """Данные пользователя, его статистика и статистика оценок одним объектом"""
+    __slots__ = ('user', 'statistics', 'grades')
+
+    def __init__(self, user: UserResponse, statistics: UserStatistics, grades: UserGradesStatistics):
+        self.user = user
+        self.statistics = statistics
+        self.grades = grades
+
 # API Client
 class GushubAPI:
     BASE_URL = "https://gushub.ru"
+    # Максимум одновременных запросов (и соединений в пуле сессии)
+    MAX_WORKERS = 8
+    # Уровни дерева курсов: ключ вложенного списка в ответе /api/courses
+    COURSE_LEVELS = ('courses', 'modules', 'lessons', 'steps')
     
     def __init__(self):
         self.session = requests.Session()
-        self.user_id = None
-        self.access_token = None
-        self.refresh_token = None
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.retry_policy = RetryPolicy.from_settings()
+        self.breaker = CircuitBreaker.get('Gushub')
+        # Токены общие для всех экземпляров клиента
+        self.tokens = TokenManager.shared()
+        self._token_generation = None
         
-        # Автоматическая авторизация при создании объекта
+        # Автоматическая авторизация при создании объекта (если ещё не выполнена)
         settings = AppSettings()
         username = settings.get_gushub_login()
         password = settings.get_gushub_password()
+
+        # Сохранённые ответы на случай недоступности сервиса
+        offline_enabled, _ = settings.get_offline_cache_settings()
+        self.offline_cache = OfflineCache.shared() if offline_enabled else None
+        self.account = username or ''
+        self._stale_since: Optional[int] = None
+        self._stale_lock = threading.Lock()
         
-        if username and password:
+        if username and password and not self.tokens.is_authorized:
             try:
                 self.login(username, password)
             except Exception as e:
                 print(f"Ошибка авторизации в Gushub: {str(e)}")
+
+    @property
+    def user_id(self) -> Optional[int]:
+        return self.tokens.user_id
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.tokens.access_token
+
+    @property
+    def refresh_token(self) -> Optional[str]:
+        return self.tokens.refresh_token
+
+    def _authorize(self) -> int:
+        """Обновляет токен при скором истечении и переносит актуальные токены в куки сессии"""
+        generation = self.tokens.generation
+        if self.tokens.is_authorized and self.tokens.needs_refresh():
+            # Токен ещё действует до REFRESH_MARGIN: при сбое обновления запрос
+            # уходит с текущим, а истечение обработает повтор после ответа 401
+            try:
+                self.tokens.refresh(self, generation)
+            except Exception as e:
+                print(f"Ошибка при заблаговременном обновлении токена Gushub: {str(e)}")
+        
+        generation = self.tokens.generation
+        if self._token_generation != generation:
+            self.session.cookies.clear()
+            if self.tokens.is_authorized:
+                self.session.cookies.set('user_id', str(self.tokens.user_id), domain='gushub.ru', path='/')
+                self.session.cookies.set('access_token', self.tokens.access_token, domain='gushub.ru', path='/')
+                self.session.cookies.set('refresh_token', self.tokens.refresh_token, domain='gushub.ru', path='/')
+            self._token_generation = generation
+        return generation
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-        """Make authenticated request to the API"""
+    def _send(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Send request with timeouts, retries and circuit breaker"""
+        url = f"{self.BASE_URL}{endpoint}"
+        return request_with_retry(self.session, method, url, endpoint, self.retry_policy, self.breaker, **kwargs)
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, authorize: bool = True) -> Dict:
+        """Make authenticated request to the API (GET falls back to the offline cache)"""
+        try:
+            response = self._request_json(method, endpoint, data, authorize)
+        except Exception as e:
+            if method != 'GET' or self.offline_cache is None or not is_service_unavailable(e):
+                raise
+            cached = self.offline_cache.load(self.account, endpoint)
+            if cached is None:
+                raise
+            response, fetched_at = cached
+            self._mark_stale(fetched_at)
+            return response
+        if method == 'GET' and self.offline_cache is not None:
+            self.offline_cache.store(self.account, endpoint, response)
+        return response
+
+    def _request_json(self, method: str, endpoint: str, data: Optional[Dict], authorize: bool) -> Dict:
         url = f"{self.BASE_URL}{endpoint}"
         
         try:
-            response = self.session.request(method, url, json=data)
+            generation = self._authorize() if authorize else None
+            response = self._send(method, endpoint, json=data)
             
-            # Если получили 401, пробуем переавторизоваться
-            if response.status_code == 401:
-                settings = AppSettings()
-                username = settings.get_gushub_login()
-                password = settings.get_gushub_password()
-                
-                if username and password:
-                    # Пробуем переавторизоваться
-                    self.login(username, password)
+            # Если получили 401, обновляем токен (один раз на все параллельные запросы)
+            if response.status_code == 401 and authorize:
+                if self.tokens.refresh(self, generation):
+                    self._authorize()
                     # Повторяем запрос с новыми куками
-                    response = self.session.request(method, url, json=data)
+                    response = self._send(method, endpoint, json=data)
             
             response.raise_for_status()
             return response.json()
@@ -265,55 +572,63 @@ class GushubAPI:
         except requests.exceptions.RequestException as e:
             print(f"Ошибка при выполнении запроса к {url}: {str(e)}")
             raise
+
+    def _mark_stale(self, fetched_at: int) -> None:
+        with self._stale_lock:
+            if self._stale_since is None or fetched_at < self._stale_since:
+                self._stale_since = fetched_at
+
+    def take_stale_since(self) -> Optional[int]:
+        """
+        Время получения самого старого сохранённого ответа, отданного вместо
+        недоступного сервиса с прошлого вызова (None - все данные свежие)
+        """
+        with self._stale_lock:
+            stale_since, self._stale_since = self._stale_since, None
+        return stale_since
     
     def login(self, username: str, password: str) -> Dict:
         """Login and store authentication data"""
-        response = self._make_request('POST', '/api/auth/login', {'username': username, 'password': password})
-        
-        # Store authentication data
-        self.user_id = response['user']['id']
-        self.access_token = response['accessToken']
-        self.refresh_token = response['refreshToken']
-        
-        # Set cookies
-        self.session.cookies.set('user_id', str(self.user_id), domain='gushub.ru', path='/')
-        self.session.cookies.set('access_token', self.access_token, domain='gushub.ru', path='/')
-        self.session.cookies.set('refresh_token', self.refresh_token, domain='gushub.ru', path='/')
-        
+        response = self.tokens.login(self, username, password)
+        self._authorize()
         return response
     
     def logout(self) -> Dict:
         """Logout and clear authentication data"""
         response = self._make_request('POST', '/api/auth/logout')
         
-        # Clear authentication data
-        self.user_id = None
-        self.access_token = None
-        self.refresh_token = None
-        
-        # Clear cookies
+        # Clear authentication data and cookies
+        self.tokens.clear()
         self.session.cookies.clear()
         
         return response
     
     # Upload photo
-    def upload_photo(self, photo_path: str) -> Dict:
-        """Upload photo"""
-        url = f"{self.BASE_URL}/api/uploads"
-        with open(photo_path, 'rb') as photo_file:
-            files = {
-                'file': (
-                    os.path.basename(photo_path),
-                    photo_file,
-                    'image/jpeg'
-                )
-            }
-            headers = {
-                'Accept': 'application/json'
-            }
-            response = self.session.post(url, files=files, headers=headers)
-            response.raise_for_status()
-            return response.json()
+    def upload_photo(self, photo_path: str, content: Optional[bytes] = None, mime_type: Optional[str] = None) -> Dict:
+        """Upload photo (content - already prepared file data, photo_path gives its name)"""
+        # Читаем файл целиком, чтобы при повторе запроса тело отправилось заново
+        if content is None:
+            with open(photo_path, 'rb') as photo_file:
+                content = photo_file.read()
+        files = {
+            'file': (
+                os.path.basename(photo_path),
+                content,
+                mime_type or mimetypes.guess_type(photo_path)[0] or 'image/jpeg'
+            )
+        }
+        headers = {
+            'Accept': 'application/json'
+        }
+        self._authorize()
+        response = self._send('POST', '/api/uploads', files=files, headers=headers)
+        response.raise_for_status()
+        return response.json()
+    
+    def delete_photo(self, url: str) -> Dict:
+        """Delete uploaded photo by the url returned from upload_photo"""
+        filename = urllib.parse.quote(os.path.basename(urllib.parse.urlparse(url).path))
+        return self._make_request('DELETE', f'/api/uploads/{filename}')
     
     # -- Courses --
     def create_course(self, course_data: Dict) -> Dict:
@@ -327,6 +642,28 @@ class GushubAPI:
     def get_courses(self) -> Dict:
         """Get all courses"""
         return self._make_request('GET', '/api/courses')
+
+    def find_course_item(self, level: str, title: str, parent_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Поиск уже созданного курса, модуля, урока или шага (level: courses,
+        modules, lessons, steps) по названию у родителя parent_id в дереве
+        /api/courses. Запрос идёт мимо офлайн-кэша: по устаревшему списку
+        повтор создания мог бы сделать дубликат
+        """
+        response = self._request_json('GET', '/api/courses', None, True)
+        if isinstance(response, dict):
+            items = response.get('data', response.get('items', []))
+        else:
+            items = response
+        depth = self.COURSE_LEVELS.index(level)
+        for position in range(1, depth + 1):
+            if position == depth:
+                items = [item for item in items if item.get('id') == parent_id]
+            items = [child for item in items for child in item.get(self.COURSE_LEVELS[position]) or []]
+        for item in items:
+            if item.get('title') == title:
+                return item
+        return None
     
     # -- Modules --
     def create_module(self, course_id: int, module_data: Dict) -> Dict:
@@ -354,172 +691,159 @@ class GushubAPI:
     def delete_step(self, step_id: int) -> Dict:
         """Delete step"""
         return self._make_request('DELETE', f'/api/courses/steps/{step_id}')
+
+    def iter_delete_steps(self, step_ids: Iterable[int],
+                          max_workers: Optional[int] = None) -> Iterator[Tuple[int, Optional[Exception]]]:
+        """
+        Delete many steps concurrently, yielding (step_id, error) as soon as
+        each request is done; error is None on success.
+        Closing the generator cancels requests that have not started yet.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers or self.MAX_WORKERS)
+        try:
+            futures = {executor.submit(self.delete_step, step_id): step_id for step_id in step_ids}
+            for future in as_completed(futures):
+                yield futures[future], future.exception()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     # -- Statistics --
     # -- Users --
+    @staticmethod
+    def _has_next_page(response: Dict, page: int, received: int) -> Optional[bool]:
+        """Есть ли следующая страница по метаданным ответа (None - метаданных нет)"""
+        for meta in (response, response.get('meta'), response.get('pagination')):
+            if not isinstance(meta, dict):
+                continue
+            for key in ('hasMore', 'hasNext', 'hasNextPage'):
+                if key in meta:
+                    return bool(meta[key])
+            if 'next' in meta:
+                return bool(meta['next'])
+            for key in ('totalPages', 'pages', 'pageCount'):
+                if isinstance(meta.get(key), int):
+                    return page < meta[key]
+            if isinstance(meta.get('total'), int):
+                return received < meta['total']
+        return None
+
+    def _iter_pages(self, endpoint: str, page_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Постраничная загрузка списка (page/limit), по одной странице за раз.
+        Конец списка определяется по метаданным ответа, а без них - по пустой
+        странице: сервер может отдавать меньше записей, чем запрошено в limit
+        """
+        page_size = page_size or AppSettings().get_page_size()
+        page = 1
+        received = 0
+        previous_first = None
+        while True:
+            response = self._make_request('GET', f'{endpoint}?page={page}&limit={page_size}')
+            if isinstance(response, dict):
+                items = response.get('data', response.get('items', []))
+            else:
+                items = response
+            
+            # Сервер без пагинации отдаёт весь список на каждый запрос
+            first = items[0].get('id') if items else None
+            if page > 1 and first is not None and first == previous_first:
+                break
+            if not items:
+                break
+            yield items
+            received += len(items)
+            has_next = self._has_next_page(response, page, received) if isinstance(response, dict) else None
+            if has_next is False:
+                break
+            previous_first = first
+            page += 1
+
+    def iter_user_pages(self, page_size: Optional[int] = None) -> Iterator[List[UserResponse]]:
+        """Постраничное получение пользователей"""
+        for items in self._iter_pages('/api/users', page_size):
+            yield [UserResponse.from_dict(user_data) for user_data in items]
+
     def get_users(self) -> List[UserResponse]:
         """Получение списка пользователей"""
-        response = self._make_request("GET", "/api/users")
-        users = []
-        for user_data in response:
-            user = UserResponse(
-                id=user_data.get("id"),
-                username=user_data.get("username"),
-                firstName=user_data.get("firstName"),
-                lastName=user_data.get("lastName"),
-                email=user_data.get("email", None),
-                role=user_data.get("role", None),
-                isBlocked=user_data.get("isBlocked", False),
-                blockReason=user_data.get("blockReason", None),
-                createdAt=datetime.fromisoformat(user_data.get("createdAt").replace("Z", "+00:00")) if user_data.get("createdAt") else None,
-                updatedAt=datetime.fromisoformat(user_data.get("updatedAt").replace("Z", "+00:00")) if user_data.get("updatedAt") else None
-            )
-            users.append(user)
-        return users
+        return [user for page in self.iter_user_pages() for user in page]
     
     def get_user(self, user_id: int) -> UserResponse:
         """Get user by id"""
         response = self._make_request('GET', f'/api/users/{user_id}')
-        return UserResponse(
-            id=response['id'],
-            username=response['username'],
-            firstName=response['firstName'],
-            lastName=response['lastName'],
-            email=response.get('email', None),
-            role=response.get('role', None),
-            isBlocked=response['isBlocked'],
-            blockReason=response['blockReason'],
-            createdAt=datetime.fromisoformat(response['createdAt'].replace('Z', '+00:00')),
-            updatedAt=datetime.fromisoformat(response['updatedAt'].replace('Z', '+00:00')),
-        )
+        return UserResponse.from_dict(response)
     
     def get_user_statistics(self, user_id: int) -> UserStatistics:
         """Get user statistics"""
         response = self._make_request('GET', f'/api/courses/users/{user_id}/statistics')
-        
-        # Преобразуем прогресс по курсам
-        course_progress = [
-            CourseProgress(
-                courseId=progress['courseId'],
-                courseTitle=progress['courseTitle'],
-                totalTasks=progress['totalTasks'],
-                completedTasks=progress['completedTasks'],
-                progressPercentage=progress['progressPercentage']
-            )
-            for progress in response.get('courseProgress', [])
-        ]
-        
-        # Создаем объект статистики
-        return UserStatistics(
-            courseProgress=course_progress,
-            totalCourses=response.get('totalCourses', 0),
-            completedCourses=response.get('completedCourses', 0),
-            totalTasks=response.get('totalTasks', 0),
-            completedTasks=response.get('completedTasks', 0),
-            totalTimeSpent=response.get('totalTimeSpent', 0)
-        )
+        return UserStatistics.from_dict(response)
 
     def get_user_grades_statistics(self, user_id: int) -> UserGradesStatistics:
         """Get user grades statistics"""
         response = self._make_request('GET', f'/api/courses/users/{user_id}/grades/statistics')
-        
-        # Преобразуем лучший урок, если он есть
-        best_lesson = None
-        if response.get('bestGradedLesson'):
-            best_lesson = BestGradedLesson(
-                lessonId=response['bestGradedLesson']['lessonId'],
-                lessonTitle=response['bestGradedLesson']['lessonTitle'],
-                courseId=response['bestGradedLesson']['courseId'],
-                courseTitle=response['bestGradedLesson']['courseTitle'],
-                moduleName=response['bestGradedLesson']['moduleName'],
-                grade=response['bestGradedLesson']['grade'],
-                gradedAt=datetime.fromisoformat(response['bestGradedLesson']['gradedAt'].replace('Z', '+00:00'))
-            )
-        
-        # Преобразуем последние оценки
-        recent_grades = []
-        for grade in response.get('recentGrades', []):
-            lesson = GradeLesson(
-                id=grade['lesson']['id'],
-                title=grade['lesson']['title'],
-                moduleTitle=grade['lesson']['moduleTitle'],
-                courseTitle=grade['lesson']['courseTitle']
-            )
-            
-            user = GradeUser(
-                id=grade['user']['id'],
-                username=grade['user']['username'],
-                fullName=grade['user']['fullName']
-            )
-            
-            recent_grades.append(RecentGrade(
-                id=grade['id'],
-                value=grade['value'],
-                feedback=grade['feedback'],
-                createdAt=datetime.fromisoformat(grade['createdAt'].replace('Z', '+00:00')),
-                lesson=lesson,
-                user=user
-            ))
-        
-        # Создаем объект статистики
-        return UserGradesStatistics(
-            totalGrades=response.get('totalGrades', 0),
-            gradesByValue=response.get('gradesByValue', {"2": 0, "3": 0, "4": 0, "5": 0}),
-            bestGradedLesson=best_lesson,
-            averageGrade=response.get('averageGrade', 0.0),
-            recentGrades=recent_grades
+        return UserGradesStatistics.from_dict(response)
+    
+    def get_student_profile(self, user_id: int) -> StudentProfile:
+        """Get user, statistics and grades statistics concurrently"""
+        return self.get_student_profiles([user_id])[0]
+
+    def get_student_profiles(self, user_ids: Iterable[int], max_workers: Optional[int] = None) -> List[StudentProfile]:
+        """Get profiles for many users, keeping the order of user_ids"""
+        with ThreadPoolExecutor(max_workers=max_workers or self.MAX_WORKERS) as executor:
+            futures = [
+                (
+                    executor.submit(self.get_user, user_id),
+                    executor.submit(self.get_user_statistics, user_id),
+                    executor.submit(self.get_user_grades_statistics, user_id),
+                )
+                for user_id in user_ids
+            ]
+            return [
+                StudentProfile(user.result(), statistics.result(), grades.result())
+                for user, statistics, grades in futures
+            ]
+
+    def _fetch_student_profile(self, user_id: int) -> StudentProfile:
+        return StudentProfile(
+            self.get_user(user_id),
+            self.get_user_statistics(user_id),
+            self.get_user_grades_statistics(user_id),
         )
+
+    def iter_student_profiles(self, user_ids: Iterable[int],
+                              max_workers: Optional[int] = None) -> Iterator[Tuple[int, Optional[StudentProfile]]]:
+        """
+        Get profiles for many users concurrently, yielding (position, profile)
+        as soon as each one is ready. Profile is None if it could not be loaded.
+        Closing the generator cancels requests that have not started yet.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers or self.MAX_WORKERS)
+        try:
+            futures = {
+                executor.submit(self._fetch_student_profile, user_id): position
+                for position, user_id in enumerate(user_ids)
+            }
+            for future in as_completed(futures):
+                try:
+                    profile = future.result()
+                except Exception as e:
+                    print(f"Не удалось загрузить профиль студента: {str(e)}")
+                    profile = None
+                yield futures[future], profile
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     # -- Groups --
+    def iter_group_pages(self, page_size: Optional[int] = None) -> Iterator[List[GroupResponse]]:
+        """Get groups page by page"""
+        for items in self._iter_pages('/api/groups', page_size):
+            yield [GroupResponse.from_dict(group) for group in items]
+
     def get_groups(self) -> List[GroupResponse]:
         """Get all groups"""
-        response = self._make_request('GET', '/api/groups')
-        return [
-            GroupResponse(
-                id=group['id'],
-                name=group['name'],
-                description=group['description'],
-                inviteCode=group['inviteCode'],
-                createdAt=datetime.fromisoformat(group['createdAt'].replace('Z', '+00:00')),
-                updatedAt=datetime.fromisoformat(group['updatedAt'].replace('Z', '+00:00')),
-                _count=GroupCount(
-                    members=group['_count']['members'],
-                    courses=group['_count']['courses']
-                )
-            )
-            for group in response
-        ]
+        return [group for page in self.iter_group_pages() for group in page]
     
     def get_group(self, group_id: int) -> GroupDetailResponse:
         """Get group by id with members and courses"""
         response = self._make_request('GET', f'/api/groups/{group_id}')
-        members = [
-            GroupMember(
-                id=m['id'],
-                userId=m['userId'],
-                groupId=m['groupId'],
-                joinedAt=datetime.fromisoformat(m['joinedAt'].replace('Z', '+00:00')),
-                user=GroupMemberUser(
-                    id=m['user']['id'],
-                    username=m['user']['username'],
-                    firstName=m['user']['firstName'],
-                    lastName=m['user']['lastName'],
-                    middleName=m['user']['middleName'],
-                    avatar=m['user'].get('avatar')
-                )
-            )
-            for m in response.get('members', [])
-        ]
-        # courses можно обработать аналогично, если потребуется подробная структура
-        return GroupDetailResponse(
-            id=response['id'],
-            name=response['name'],
-            description=response['description'],
-            inviteCode=response['inviteCode'],
-            createdAt=datetime.fromisoformat(response['createdAt'].replace('Z', '+00:00')),
-            updatedAt=datetime.fromisoformat(response['updatedAt'].replace('Z', '+00:00')),
-            members=members,
-            courses=response.get('courses', [])
-        )
-
+        return GroupDetailResponse.from_dict(response)
 
@@ -0,0 +1,51 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from app.api.gushub_api import GushubAPI, GroupDetailResponse
+
+
+class AsyncGushubAPI:
+    """
+    Асинхронный клиент Gushub поверх синхронного GushubAPI.
+
+    Любой метод GushubAPI доступен как корутина с теми же аргументами и
+    моделями ответа: вызов выполняется в пуле потоков через тот же путь
+    запроса (авторизация, повторы, circuit breaker, офлайн-кэш) и общую
+    сессию, поэтому два клиента не расходятся. Одновременных запросов не
+    больше, чем соединений в пуле сессии (GushubAPI.MAX_WORKERS).
+    Клиент можно использовать из любого цикла событий, например в рабочем потоке:
+
+        async with AsyncGushubAPI(api) as async_api:
+            groups = await async_api.get_groups_details(group_ids)
+    """
+    def __init__(self, api: Optional[GushubAPI] = None, max_concurrency: Optional[int] = None):
+        self.api = api or GushubAPI()
+        self.max_concurrency = min(max_concurrency or self.api.MAX_WORKERS, self.api.MAX_WORKERS)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="gushub-async")
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.api, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+        return call
+
+    def close(self) -> None:
+        """Остановка пула потоков"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> 'AsyncGushubAPI':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def get_groups_details(self, group_ids: Iterable[int]) -> List[GroupDetailResponse]:
+        """Группы с участниками и курсами в порядке group_ids"""
+        return list(await asyncio.gather(*(self.get_group(group_id) for group_id in group_ids)))
@@ -0,0 +1,70 @@
+import os
+import re
+import urllib.parse
+from typing import Callable, Dict, Optional
+
+from app.api.cover_images import file_sha256
+
+# Папка модуля в репозитории, куда выкладываются файлы уроков и задач
+ASSETS_DIR = 'assets'
+
+# Ссылка или изображение Markdown: [текст](путь "заголовок"), ![alt](<путь>)
+MARKDOWN_LINK = re.compile(r'''(!?\[[^\]]*\]\(\s*<?)([^)\s>]+)(>?(?:\s+(?:"[^"]*"|'[^']*'))?\s*\))''')
+# Изображение в HTML-разметке внутри Markdown
+HTML_IMAGE = re.compile(r'''(<img\b[^>]*?\bsrc\s*=\s*["'])([^"']+)(["'])''', re.IGNORECASE)
+
+
+def local_asset_path(target: str, base_dir: str) -> Optional[str]:
+    """Путь к локальному файлу, на который ссылается Markdown, или None для внешних ссылок"""
+    if re.match(r'^[a-z][a-z0-9+.-]*:', target, re.IGNORECASE) or target.startswith(('#', '/')):
+        return None
+    relative = urllib.parse.unquote(target.split('#', 1)[0].split('?', 1)[0])
+    if not relative:
+        return None
+    path = os.path.normpath(os.path.join(base_dir, relative))
+    # Ссылки на другие уроки не выкладываются как файлы
+    if not os.path.isfile(path) or os.path.splitext(path)[1].lower() == '.md':
+        return None
+    return path
+
+
+class AssetBundler:
+    """
+    Сбор локальных файлов, на которые ссылается Markdown (изображения,
+    вложения), и замена ссылок на адреса url_for(путь в репозитории).
+    Файлы называются по хешу содержимого: одинаковые файлы разных уроков
+    выкладываются один раз, а изменённый файл получает новый адрес.
+    После rewrite() в assets - путь в репозитории -> локальный путь,
+    в hashes - путь в репозитории -> SHA-256 содержимого.
+    """
+    def __init__(self, base_dir: str, assets_dir: str, url_for: Callable[[str], str]):
+        self.base_dir = base_dir
+        self.assets_dir = assets_dir
+        self.url_for = url_for
+        self.assets: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+        self._paths: Dict[str, str] = {}  # Локальный путь -> путь в репозитории
+
+    def _replace(self, match: re.Match) -> str:
+        path = local_asset_path(match.group(2), self.base_dir)
+        if path is None:
+            return match.group(0)
+        if path not in self._paths:
+            digest = file_sha256(path)
+            repo_path = f"{self.assets_dir}/{digest[:16]}{os.path.splitext(path)[1].lower()}"
+            self._paths[path] = repo_path
+            self.assets[repo_path] = path
+            self.hashes[repo_path] = digest
+        url = urllib.parse.quote(self.url_for(self._paths[path]), safe=':/')
+        return match.group(1) + url + match.group(3)
+
+    def rewrite(self, markdown: str) -> str:
+        """Markdown (весь текст или его часть по строкам) с заменёнными ссылками"""
+        markdown = MARKDOWN_LINK.sub(self._replace, markdown)
+        return HTML_IMAGE.sub(self._replace, markdown)
+
+    def rewrite_file(self, source: str, target) -> None:
+        """Построчная замена ссылок из файла source в открытый файл target, без чтения целиком"""
+        with open(source, 'r', encoding='utf-8') as file:
+            for line in file:
+                target.write(self.rewrite(line))
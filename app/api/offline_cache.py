@@ -0,0 +1,118 @@
+import atexit
+import json
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from app.api.resilience import CircuitOpenError, is_transport_error
+from app.database.database import Database
+from app.settings import AppSettings
+
+
+def is_service_unavailable(exc: BaseException) -> bool:
+    """Сервис недоступен: нет соединения, таймаут, разомкнут предохранитель или ошибка 5xx"""
+    if isinstance(exc, CircuitOpenError) or is_transport_error(exc):
+        return True
+    response = getattr(exc, 'response', None)
+    return isinstance(exc, requests.exceptions.HTTPError) and response is not None and response.status_code >= 500
+
+
+class OfflineCache:
+    """
+    Последние ответы API на GET-запросы в локальной базе.
+
+    Если сервис недоступен, клиент отдаёт сохранённый ответ вместо ошибки.
+    Сохраняются только списки и статистика, которые показываются без сети
+    (ENDPOINTS). Ответы хранятся отдельно для каждой учётной записи; записи
+    старше max_age_days не отдаются и удаляются при открытии кеша.
+
+    Запросы не ждут записи в базу: ответы копятся в памяти, а отдельный
+    поток сохраняет накопленное одной транзакцией (весь параллельный обход
+    групп или профилей - за несколько коммитов вместо одного на запрос).
+    """
+    # Префиксы эндпоинтов, ответы которых нужны для работы без сети
+    ENDPOINTS = ('/api/users', '/api/groups', '/api/courses/users/')
+    # Сколько ждать следующих ответов перед записью, секунды
+    FLUSH_DELAY = 0.5
+
+    _shared: Optional['OfflineCache'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "database.db", max_age_days: int = 30):
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.db = Database(db_path, check_same_thread=False)
+        self._lock = threading.Lock()  # Соединение с базой
+        self._pending: Dict[Tuple[str, str], Tuple[str, int]] = {}  # Ещё не записанные ответы
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        try:
+            self.db.delete_api_responses(int(time.time()) - self.max_age)
+        except Exception as e:
+            print(f"Ошибка при очистке сохранённых ответов API: {str(e)}")
+        threading.Thread(target=self._write_loop, name="offline-cache", daemon=True).start()
+        atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls) -> 'OfflineCache':
+        with cls._shared_lock:
+            if cls._shared is None:
+                _, max_age_days = AppSettings().get_offline_cache_settings()
+                cls._shared = cls(max_age_days=max_age_days)
+            return cls._shared
+
+    def cacheable(self, endpoint: str) -> bool:
+        return endpoint.startswith(self.ENDPOINTS)
+
+    def store(self, account: str, endpoint: str, data: object) -> None:
+        if not self.cacheable(endpoint):
+            return
+        try:
+            body = json.dumps(data, ensure_ascii=False)
+        except Exception as e:
+            print(f"Ошибка при сохранении ответа API: {str(e)}")
+            return
+        with self._pending_lock:
+            self._pending[(account, endpoint)] = (body, int(time.time()))
+        self._wake.set()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.FLUSH_DELAY)
+            self.flush()
+
+    def flush(self) -> None:
+        """Запись накопленных ответов одной транзакцией"""
+        # Соединение занято до конца записи: load() не пропустит забранные ответы
+        try:
+            with self._lock:
+                with self._pending_lock:
+                    pending, self._pending = self._pending, {}
+                    self._wake.clear()
+                if pending:
+                    self.db.save_api_responses([(account, endpoint, body, fetched_at)
+                                                for (account, endpoint), (body, fetched_at) in pending.items()])
+        except Exception as e:
+            print(f"Ошибка при сохранении ответов API: {str(e)}")
+
+    def load(self, account: str, endpoint: str) -> Optional[Tuple[object, int]]:
+        """Сохранённый ответ и время его получения (секунды Unix) или None"""
+        if not self.cacheable(endpoint):
+            return None
+        try:
+            with self._pending_lock:
+                row = self._pending.get((account, endpoint))
+            if row is None:
+                with self._lock:
+                    row = self.db.get_api_response(account, endpoint)
+        except Exception as e:
+            print(f"Ошибка при чтении сохранённого ответа API: {str(e)}")
+            return None
+        if row is None:
+            return None
+        body, fetched_at = row
+        if time.time() - fetched_at > self.max_age:
+            return None
+        return json.loads(body), fetched_at
@@ -0,0 +1,213 @@
+import math
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from app.settings import AppSettings
+
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Методы, повтор которых не создаёт дубликатов на сервере
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class CircuitOpenError(RuntimeError):
+    """Сервис признан недоступным, запрос не выполнялся"""
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Сервис {name} временно недоступен, повторите попытку через {math.ceil(retry_in)} с")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class RetryPolicy:
+    """Таймауты и параметры повторов запросов"""
+    # Таймауты (подключение, чтение) для отдельных эндпоинтов по префиксу пути
+    ENDPOINT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+        '/api/uploads': (5.0, 120.0),
+    }
+    # Дольше ждать по Retry-After не имеет смысла - интерфейс ждёт ответа
+    MAX_RETRY_AFTER = 60.0
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 endpoint_timeouts: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.endpoint_timeouts = dict(self.ENDPOINT_TIMEOUTS if endpoint_timeouts is None else endpoint_timeouts)
+
+    @classmethod
+    def from_settings(cls, settings: Optional[AppSettings] = None) -> 'RetryPolicy':
+        settings = settings or AppSettings()
+        connect_timeout, read_timeout = settings.get_request_timeouts()
+        max_retries, backoff_base, backoff_max = settings.get_retry_settings()
+        return cls(connect_timeout, read_timeout, max_retries, backoff_base, backoff_max)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+    def timeout_for(self, endpoint: str) -> Tuple[float, float]:
+        """Таймауты для конкретного эндпоинта"""
+        for prefix, timeout in self.endpoint_timeouts.items():
+            if endpoint.startswith(prefix):
+                return timeout
+        return self.timeout
+
+    def backoff(self, attempt: int) -> float:
+        """Экспоненциальная задержка с полным джиттером"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для внешнего сервиса: после failure_threshold сбоев подряд
+    запросы сразу завершаются CircuitOpenError, пока не пройдёт reset_timeout.
+    Затем пропускается один пробный запрос, результат которого замыкает
+    или снова размыкает цепь.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    _registry: Dict[str, 'CircuitBreaker'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 is_failure: Optional[Callable[[BaseException], bool]] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or is_transport_error
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str, is_failure: Optional[Callable[[BaseException], bool]] = None) -> 'CircuitBreaker':
+        """Общий предохранитель сервиса с параметрами из настроек"""
+        with cls._registry_lock:
+            if name not in cls._registry:
+                threshold, reset_timeout = AppSettings().get_circuit_breaker_settings()
+                cls._registry[name] = cls(name, threshold, reset_timeout, is_failure)
+            return cls._registry[name]
+
+    def before_call(self) -> None:
+        """Проверка перед запросом, выбрасывает CircuitOpenError при разомкнутой цепи"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(self.name, max(remaining, 0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def __enter__(self) -> 'CircuitBreaker':
+        self.before_call()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None and self.is_failure(exc):
+            self.record_failure()
+        else:
+            self.record_success()
+        return False
+
+
+def is_transport_error(exc: BaseException) -> bool:
+    """Сбой соединения или таймаут - признак недоступности сервиса"""
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def is_connect_failure(exc: BaseException) -> bool:
+    """Соединение не установлено (отказ, DNS, таймаут подключения): запрос точно не дошёл до сервера"""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.exceptions.ConnectionError) or not exc.args:
+        return False
+    reason = getattr(exc.args[0], 'reason', exc.args[0])  # MaxRetryError оборачивает причину
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Задержка из Retry-After или из X-RateLimit-Reset при исчерпанном лимите"""
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+        try:
+            return max(float(headers['X-RateLimit-Reset']) - time.time(), 0.0)
+        except ValueError:
+            pass
+    return None
+
+
+def request_with_retry(session: requests.Session, method: str, url: str, endpoint: str,
+                       policy: RetryPolicy, breaker: CircuitBreaker, **kwargs) -> requests.Response:
+    """
+    Выполнение запроса с таймаутами, повторами и предохранителем.
+    Неидемпотентные запросы повторяются, только если сервер их точно не
+    обработал: не удалось подключиться или ответ 429. В главном потоке
+    запрос не повторяется: паузы между попытками заморозили бы интерфейс,
+    а длинные операции выполняются в фоновых потоках.
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    max_retries = 0 if threading.current_thread() is threading.main_thread() else policy.max_retries
+    attempt = 0
+    while True:
+        breaker.before_call()
+        delay = None
+        try:
+            response = session.request(method, url, timeout=policy.timeout_for(endpoint), **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            breaker.record_failure()
+            if not (idempotent or is_connect_failure(e)) or attempt >= max_retries:
+                raise
+        else:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            retryable = response.status_code in RETRYABLE_STATUSES and (idempotent or response.status_code == 429)
+            if not retryable or attempt >= max_retries:
+                return response
+            delay = retry_after_seconds(response.headers)
+            if delay is not None and delay > policy.MAX_RETRY_AFTER:
+                return response
+
+        time.sleep(policy.backoff(attempt) if delay is None else delay)
+        attempt += 1
@@ -0,0 +1,125 @@
+import base64
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from app.settings import AppSettings
+
+
+def token_expiry(token: Optional[str]) -> Optional[float]:
+    """Время истечения JWT (поле exp) без проверки подписи"""
+    if not token:
+        return None
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class TokenManager:
+    """
+    Общее для всех клиентов Gushub хранилище токенов.
+
+    Обновляет access token через refresh token заранее, до истечения срока,
+    а параллельные запросы на обновление схлопывает в один: поток, который
+    дождался блокировки, видит новое поколение токенов и повторно не обновляет.
+    Полный вход по сохранённым логину и паролю выполняется, только если
+    refresh token больше не принимается сервером.
+    """
+    LOGIN_ENDPOINT = '/api/auth/login'
+    REFRESH_ENDPOINT = '/api/auth/refresh'
+    # За сколько секунд до истечения обновлять токен
+    REFRESH_MARGIN = 60
+
+    _shared: Optional['TokenManager'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.user_id: Optional[int] = None
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+        # Увеличивается при каждой смене токенов
+        self.generation = 0
+
+    @classmethod
+    def shared(cls) -> 'TokenManager':
+        """Единый экземпляр на всё приложение"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def is_authorized(self) -> bool:
+        return self.access_token is not None
+
+    def set_tokens(self, response: Dict) -> None:
+        """Сохранение токенов из ответа login/refresh"""
+        if response.get('user'):
+            self.user_id = response['user']['id']
+        self.access_token = response['accessToken']
+        self.refresh_token = response.get('refreshToken', self.refresh_token)
+        if response.get('expiresIn'):
+            self.expires_at = time.time() + float(response['expiresIn'])
+        else:
+            self.expires_at = token_expiry(self.access_token)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Сброс токенов"""
+        with self._lock:
+            self.user_id = None
+            self.access_token = None
+            self.refresh_token = None
+            self.expires_at = None
+            self.generation += 1
+
+    def needs_refresh(self) -> bool:
+        """Истекает ли access token в ближайшее время"""
+        return self.expires_at is not None and time.time() >= self.expires_at - self.REFRESH_MARGIN
+
+    def login(self, client, username: str, password: str) -> Dict:
+        """Полный вход по логину и паролю"""
+        with self._lock:
+            response = client._make_request('POST', self.LOGIN_ENDPOINT,
+                                            {'username': username, 'password': password},
+                                            authorize=False)
+            self.set_tokens(response)
+            return response
+
+    def refresh(self, client, seen_generation: int) -> bool:
+        """
+        Обновление токенов. seen_generation - поколение токенов, с которым
+        клиент выполнял запрос; если оно уже сменилось, обновление не нужно.
+        """
+        with self._lock:
+            if self.generation != seen_generation:
+                return self.is_authorized
+
+            if self.refresh_token:
+                try:
+                    response = client._make_request('POST', self.REFRESH_ENDPOINT,
+                                                    {'refreshToken': self.refresh_token},
+                                                    authorize=False)
+                    self.set_tokens(response)
+                    return True
+                except (requests.exceptions.RequestException, KeyError) as e:
+                    print(f"Не удалось обновить токен Gushub: {str(e)}")
+
+            # Refresh token недействителен - выполняем полный вход
+            username, password = AppSettings().get_gushub_credentials()
+            if not username or not password:
+                return False
+            response = client._make_request('POST', self.LOGIN_ENDPOINT,
+                                            {'username': username, 'password': password},
+                                            authorize=False)
+            self.set_tokens(response)
+            return True
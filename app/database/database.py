@@ -1,9 +1,15 @@
 import sqlite3
+import time
 
+# Показатели студента в снимке статистики (порядок колонок таблицы)
+STUDENT_SNAPSHOT_FIELDS = (
+    'total_courses', 'completed_courses', 'total_tasks', 'completed_tasks', 'total_time_spent',
+    'total_grades', 'average_grade', 'grades_2', 'grades_3', 'grades_4', 'grades_5',
+)
 
 class Database:
-    def __init__(self, db_path: str = "database.db") -> None:
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path: str = "database.db", check_same_thread: bool = True) -> None:
+        self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
         self._create_tables()
 
     def _create_tables(self) -> None:
@@ -53,6 +59,115 @@ class Database:
                 FOREIGN KEY(lesson_id) REFERENCES lessons(id) ON DELETE CASCADE
             )
         ''')
+
+        # Снимки статистики студентов: время в секундах Unix, только показатели
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS student_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                taken_at INTEGER NOT NULL,
+                total_courses INTEGER,
+                completed_courses INTEGER,
+                total_tasks INTEGER,
+                completed_tasks INTEGER,
+                total_time_spent INTEGER,
+                total_grades INTEGER,
+                average_grade REAL,
+                grades_2 INTEGER,
+                grades_3 INTEGER,
+                grades_4 INTEGER,
+                grades_5 INTEGER
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_student_snapshots_user_time
+            ON student_snapshots (user_id, taken_at)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_student_snapshots_time
+            ON student_snapshots (taken_at)
+        ''')
+
+        # Последние ответы API Gushub на GET-запросы для работы без сети
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS api_responses (
+                account TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                fetched_at INTEGER NOT NULL,
+                PRIMARY KEY (account, endpoint)
+            )
+        ''')
+
+        # Загруженные в Gushub изображения по хешу исходного файла
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS uploaded_images (
+                account TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                url TEXT NOT NULL,
+                uploaded_at INTEGER NOT NULL,
+                PRIMARY KEY (account, sha256)
+            )
+        ''')
+
+        # Файлы уроков и задач, выложенные в репозитории курсов, с хешем содержимого
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS published_assets (
+                repo TEXT NOT NULL,
+                path TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                published_at INTEGER NOT NULL,
+                PRIMARY KEY (repo, path)
+            )
+        ''')
+
+        # Локальные файлы уроков и задач для режима отслеживания: файл -> запись
+        # в базе и хеш последней выложенной версии
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS watched_files (
+                path TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                updated_at INTEGER NOT NULL
+            )
+        ''')
+
+        # Очередь операций с курсами (outbox): задача и её шаги с результатами
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                idempotency_key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_outbox_jobs_key
+            ON outbox_jobs (idempotency_key, status)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_outbox_jobs_due
+            ON outbox_jobs (status, next_attempt_at)
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox_steps (
+                job_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                result TEXT,
+                error TEXT,
+                PRIMARY KEY (job_id, name),
+                FOREIGN KEY(job_id) REFERENCES outbox_jobs(id) ON DELETE CASCADE
+            )
+        ''')
         self.conn.commit()
 
     # --- Курсы ---
@@ -267,6 +382,296 @@ class Database:
             return [{description[0]: row[i] for i, description in enumerate(cursor.description)} for row in rows]
         return []
 
+    # --- Снимки статистики студентов ---
+    def add_student_snapshots(self, snapshots: list[tuple[int, dict[str, object]]], taken_at: int | None = None) -> int:
+        """
+        Сохранение снимков статистики студентов (id студента, показатели) одной
+        транзакцией. Снимок, показатели которого не изменились с прошлого
+        снимка студента, не добавляется. Возвращает число добавленных снимков
+        """
+        taken_at = int(time.time()) if taken_at is None else taken_at
+        cursor = self.conn.cursor()
+        rows = []
+        latest: dict[int, tuple] = {}
+        for user_id, values in snapshots:
+            row = tuple(values.get(field) for field in STUDENT_SNAPSHOT_FIELDS)
+            if user_id not in latest:
+                cursor.execute(f'''
+                    SELECT {', '.join(STUDENT_SNAPSHOT_FIELDS)} FROM student_snapshots
+                    WHERE user_id = ? ORDER BY taken_at DESC, id DESC LIMIT 1
+                ''', (user_id,))
+                latest[user_id] = cursor.fetchone()
+            if latest[user_id] == row:
+                continue
+            latest[user_id] = row
+            rows.append((user_id, taken_at, *row))
+        if rows:
+            cursor.executemany(f'''
+                INSERT INTO student_snapshots (user_id, taken_at, {', '.join(STUDENT_SNAPSHOT_FIELDS)})
+                VALUES (?, ?, {', '.join('?' * len(STUDENT_SNAPSHOT_FIELDS))})
+            ''', rows)
+            self.conn.commit()
+        return len(rows)
+
+    def get_student_snapshots(self, user_id: int, since: int | None = None, until: int | None = None) -> list[dict[str, object]]:
+        """Снимки статистики студента за период в порядке времени"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT * FROM student_snapshots
+            WHERE user_id = ? AND taken_at >= ? AND taken_at <= ?
+            ORDER BY taken_at
+        ''', (user_id, since or 0, until if until is not None else 2 ** 62))
+        rows = cursor.fetchall()
+        if rows:
+            return [{description[0]: row[i] for i, description in enumerate(cursor.description)} for row in rows]
+        return []
+
+    def get_snapshots_in_range(self, since: int, until: int | None = None, user_ids: list[int] | None = None) -> list[dict[str, object]]:
+        """Снимки всех (или перечисленных) студентов за период"""
+        query = '''
+            SELECT * FROM student_snapshots
+            WHERE taken_at >= ? AND taken_at <= ?
+        '''
+        params: list[object] = [since, until if until is not None else 2 ** 62]
+        if user_ids is not None:
+            query += f" AND user_id IN ({', '.join('?' * len(user_ids))})"
+            params.extend(user_ids)
+        cursor = self.conn.cursor()
+        cursor.execute(query + " ORDER BY user_id, taken_at", params)
+        rows = cursor.fetchall()
+        if rows:
+            return [{description[0]: row[i] for i, description in enumerate(cursor.description)} for row in rows]
+        return []
+
+    # --- Сохранённые ответы API ---
+    def save_api_responses(self, responses: list[tuple[str, str, str, int]]) -> None:
+        """Сохранение (замена) ответов API одной транзакцией: (account, endpoint, body, fetched_at)"""
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO api_responses (account, endpoint, body, fetched_at)
+            VALUES (?, ?, ?, ?)
+        ''', responses)
+        self.conn.commit()
+
+    def get_api_response(self, account: str, endpoint: str) -> tuple[str, int] | None:
+        """Сохранённый ответ API и время его получения"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT body, fetched_at FROM api_responses WHERE account = ? AND endpoint = ?
+        ''', (account, endpoint))
+        return cursor.fetchone()
+
+    def delete_api_responses(self, before: int) -> int:
+        """Удаление ответов, полученных раньше before, возвращает их число"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            DELETE FROM api_responses WHERE fetched_at < ?
+        ''', (before,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    # --- Загруженные изображения ---
+    def save_uploaded_image(self, account: str, sha256: str, url: str) -> None:
+        """Сохранение адреса изображения, загруженного учётной записью"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO uploaded_images (account, sha256, url, uploaded_at)
+            VALUES (?, ?, ?, ?)
+        ''', (account, sha256, url, int(time.time())))
+        self.conn.commit()
+
+    def get_uploaded_image(self, account: str, sha256: str) -> str | None:
+        """Адрес ранее загруженного изображения с тем же содержимым"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT url FROM uploaded_images WHERE account = ? AND sha256 = ?
+        ''', (account, sha256))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def delete_uploaded_image(self, account: str, url: str) -> None:
+        """Удаление записи об изображении, удалённом из Gushub"""
+        self.conn.execute('''
+            DELETE FROM uploaded_images WHERE account = ? AND url = ?
+        ''', (account, url))
+        self.conn.commit()
+
+    # --- Файлы уроков в репозиториях ---
+    def save_published_asset(self, repo: str, path: str, sha256: str) -> None:
+        """Сохранение хеша файла, выложенного в репозиторий курса"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO published_assets (repo, path, sha256, published_at)
+            VALUES (?, ?, ?, ?)
+        ''', (repo, path, sha256, int(time.time())))
+        self.conn.commit()
+
+    def get_published_asset(self, repo: str, path: str) -> str | None:
+        """Хеш файла, выложенного в репозиторий курса, или None"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT sha256 FROM published_assets WHERE repo = ? AND path = ?
+        ''', (repo, path))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def delete_published_assets(self, repo: str, prefix: str = '') -> None:
+        """Удаление сведений о файлах репозитория (или его папки prefix)"""
+        self.conn.execute('''
+            DELETE FROM published_assets WHERE repo = ? AND substr(path, 1, length(?)) = ?
+        ''', (repo, prefix, prefix))
+        self.conn.commit()
+
+    # --- Отслеживаемые файлы ---
+    def save_watched_file(self, path: str, kind: str, item_id: int, sha256: str) -> None:
+        """
+        Привязка локального файла к уроку или задаче (kind - 'lesson' или 'task').
+        Прежний файл урока или задачи, выложенный из другого места, больше не отслеживается
+        """
+        self.conn.execute('''
+            DELETE FROM watched_files WHERE kind = ? AND item_id = ? AND path != ?
+        ''', (kind, item_id, path))
+        self.conn.execute('''
+            INSERT OR REPLACE INTO watched_files (path, kind, item_id, sha256, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (path, kind, item_id, sha256, int(time.time())))
+        self.conn.commit()
+
+    def get_watched_files(self) -> list[dict[str, object]]:
+        """Все отслеживаемые файлы"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT * FROM watched_files ORDER BY path
+        ''')
+        rows = cursor.fetchall()
+        if rows:
+            return [{description[0]: row[i] for i, description in enumerate(cursor.description)} for row in rows]
+        return []
+
+    def delete_watched_files(self, kind: str, item_ids: list[int]) -> None:
+        """Удаление привязок файлов к удалённым урокам или задачам"""
+        self.conn.executemany('''
+            DELETE FROM watched_files WHERE kind = ? AND item_id = ?
+        ''', [(kind, item_id) for item_id in item_ids])
+        self.conn.commit()
+
+    # --- Очередь операций (outbox) ---
+    def add_outbox_job(self, kind: str, idempotency_key: str, payload: str, steps: list[str]) -> int:
+        """
+        Постановка задачи в очередь вместе с её шагами. Если ожидающая или
+        завершённая с ошибкой задача с тем же ключом уже есть, новая не
+        создаётся: существующая получает новые данные и снова ставится в
+        очередь. Отменённые шаги выполнятся заново, неудачные - с поиском уже
+        созданного объекта, а выполненные шаги, компенсация которых не
+        удалась, сохраняют результат и не повторяются. К выполняемой задаче
+        (или ожидающей повтора) новый запрос не присоединяется
+        """
+        now = int(time.time())
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id, status FROM outbox_jobs
+            WHERE idempotency_key = ? AND status != 'done'
+            ORDER BY id DESC LIMIT 1
+        ''', (idempotency_key,))
+        row = cursor.fetchone()
+        if row:
+            job_id, status = row
+            if status in ('running', 'retry'):
+                raise RuntimeError("такая же операция уже выполняется, повторите её после завершения")
+            cursor.execute('''
+                UPDATE outbox_jobs
+                SET status = 'pending', payload = ?, attempts = 0, next_attempt_at = 0, last_error = NULL,
+                    updated_at = ?
+                WHERE id = ?
+            ''', (payload, now, job_id))
+            cursor.execute('''
+                UPDATE outbox_steps
+                SET status = CASE WHEN status = 'compensated' THEN 'pending' ELSE status END,
+                    result = NULL, error = NULL
+                WHERE job_id = ? AND status IN ('failed', 'compensated')
+            ''', (job_id,))
+            self.conn.commit()
+            return job_id
+        cursor.execute('''
+            INSERT INTO outbox_jobs (kind, idempotency_key, payload, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (kind, idempotency_key, payload, now, now))
+        job_id = cursor.lastrowid
+        cursor.executemany('''
+            INSERT INTO outbox_steps (job_id, name, position) VALUES (?, ?, ?)
+        ''', [(job_id, name, position) for position, name in enumerate(steps)])
+        self.conn.commit()
+        return job_id
+
+    def get_outbox_job(self, job_id: int) -> dict[str, object] | None:
+        """Получение задачи очереди по её id"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT * FROM outbox_jobs WHERE id = ?
+        ''', (job_id,))
+        row = cursor.fetchone()
+        if row:
+            return {description[0]: row[i] for i, description in enumerate(cursor.description)}
+        return None
+
+    def get_due_outbox_jobs(self, now: int | None = None) -> list[dict[str, object]]:
+        """Задачи, готовые к выполнению, в порядке постановки в очередь"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT * FROM outbox_jobs
+            WHERE status IN ('pending', 'retry') AND next_attempt_at <= ?
+            ORDER BY id
+        ''', (int(time.time()) if now is None else now,))
+        rows = cursor.fetchall()
+        if rows:
+            return [{description[0]: row[i] for i, description in enumerate(cursor.description)} for row in rows]
+        return []
+
+    def get_next_outbox_attempt(self) -> int | None:
+        """Время ближайшего повтора отложенной задачи (секунды Unix)"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT MIN(next_attempt_at) FROM outbox_jobs WHERE status IN ('pending', 'retry')
+        ''')
+        return cursor.fetchone()[0]
+
+    def get_outbox_steps(self, job_id: int) -> list[dict[str, object]]:
+        """Шаги задачи в порядке выполнения"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT * FROM outbox_steps WHERE job_id = ? ORDER BY position
+        ''', (job_id,))
+        rows = cursor.fetchall()
+        if rows:
+            return [{description[0]: row[i] for i, description in enumerate(cursor.description)} for row in rows]
+        return []
+
+    def update_outbox_job(self, job_id: int, status: str, attempts: int | None = None,
+                          next_attempt_at: int | None = None, last_error: str | None = None) -> None:
+        """Смена состояния задачи (незаданные счётчики не меняются)"""
+        self.conn.execute('''
+            UPDATE outbox_jobs
+            SET status = ?, attempts = COALESCE(?, attempts), next_attempt_at = COALESCE(?, next_attempt_at),
+                last_error = ?, updated_at = ?
+            WHERE id = ?
+        ''', (status, attempts, next_attempt_at, last_error, int(time.time()), job_id))
+        self.conn.commit()
+
+    def update_outbox_step(self, job_id: int, name: str, status: str,
+                           result: str | None = None, error: str | None = None) -> None:
+        """Смена состояния шага и сохранение его результата"""
+        self.conn.execute('''
+            UPDATE outbox_steps SET status = ?, result = COALESCE(?, result), error = ?
+            WHERE job_id = ? AND name = ?
+        ''', (status, result, error, job_id, name))
+        self.conn.commit()
+
+    def reset_running_outbox_jobs(self) -> int:
+        """Возврат в очередь задач, прерванных закрытием или сбоем приложения"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            UPDATE outbox_jobs SET status = 'pending', next_attempt_at = 0 WHERE status = 'running'
+        ''')
+        self.conn.commit()
+        return cursor.rowcount
+
     def close(self) -> None:
         """Закрытие соединения с базой данных"""
         self.conn.close()
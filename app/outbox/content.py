@@ -0,0 +1,553 @@
+import os
+import tempfile
+import urllib.parse
+from typing import Callable, Optional
+
+from github import GithubException
+
+from app.api.cover_images import UploadedImages, file_sha256, upload_cover
+from app.api.github_api import STREAM_THRESHOLD, LocalFile, check_file_size
+from app.api.markdown_assets import ASSETS_DIR, AssetBundler
+from app.outbox.jobs import JobContext, JobDefinition, Step, is_not_found
+
+
+# -- Вспомогательные функции --
+def raw_url(context: JobContext, repo, path: str) -> str:
+    return f"https://raw.githubusercontent.com/{context.github_api.user.login}/{repo.name}/main/{path}"
+
+def encode_url(url: str) -> str:
+    return urllib.parse.quote(url, safe=':/?=&')
+
+def file_exists(context: JobContext, repo, path: str) -> bool:
+    try:
+        context.github_api.get_contents(repo, path)
+        return True
+    except GithubException as e:
+        if e.status == 404:
+            return False
+        raise
+
+def delete_file(context: JobContext, repo, path: str, delete) -> None:
+    """Удаление файла репозитория методом delete(repo, path, sha); отсутствующий файл пропускается"""
+    try:
+        contents = context.github_api.get_contents(repo, path)
+        delete(repo, path, contents.sha)
+    except Exception as e:
+        if not is_not_found(e):
+            raise
+
+def repo_name_from_path(github_path: str) -> str:
+    """Имя репозитория курса по его адресу на GitHub"""
+    return github_path.rstrip('/').split('/')[-1]
+
+def prepare_markdown(context: JobContext, repo, path: str, file_path: str, temp_dir: str) -> tuple:
+    """
+    Файл урока или задачи для выкладывания в path: локальные файлы, на
+    которые он ссылается, попадают в папку assets модуля, ссылки заменяются
+    на их адреса. Большой файл обрабатывается построчно во временный файл в
+    temp_dir и выкладывается потоком, без чтения в память целиком.
+    Возвращает текст (строку или LocalFile) и ещё не выложенные файлы:
+    путь в репозитории -> хеш содержимого и путь -> LocalFile.
+    """
+    size = check_file_size(file_path)
+    module_dir = os.path.dirname(path)
+    bundler = AssetBundler(
+        os.path.dirname(os.path.abspath(file_path)),
+        f"{module_dir}/{ASSETS_DIR}" if module_dir else ASSETS_DIR,
+        lambda asset_path: raw_url(context, repo, asset_path),
+    )
+    if size > STREAM_THRESHOLD:
+        markdown = LocalFile(os.path.join(tempfile.mkdtemp(dir=temp_dir), os.path.basename(path)))
+        with open(markdown.path, 'w', encoding='utf-8') as target:
+            bundler.rewrite_file(file_path, target)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            markdown = bundler.rewrite(f.read())
+    # Уже выложенные файлы (по хешу) пропускаются
+    new_hashes = {
+        asset_path: digest for asset_path, digest in bundler.hashes.items()
+        if context.db.get_published_asset(repo.name, asset_path) != digest
+    }
+    return markdown, new_hashes, {asset_path: LocalFile(bundler.assets[asset_path]) for asset_path in new_hashes}
+
+def publish_markdown(context: JobContext, repo, path: str, file_path: str, message: str,
+                     write: Callable[[str], object]) -> None:
+    """
+    Выкладывание файла урока или задачи вместе с новыми файлами, на которые
+    он ссылается, одним коммитом. Если новых файлов нет, текст сохраняется
+    обычным запросом write(content).
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        markdown, new_hashes, assets = prepare_markdown(context, repo, path, file_path, temp_dir)
+        if isinstance(markdown, str) and not assets:
+            write(markdown)
+            return
+        context.github_api.commit_files(repo, {path: markdown, **assets}, message)
+    for asset_path, digest in new_hashes.items():
+        context.db.save_published_asset(repo.name, asset_path, digest)
+
+def watch_file(context: JobContext, kind: str, item_id: int) -> None:
+    """Привязка выложенного файла к уроку или задаче для режима отслеживания"""
+    file_path = os.path.abspath(context.payload['file_path'])
+    try:
+        context.db.save_watched_file(file_path, kind, item_id, file_sha256(file_path))
+    except OSError as e:
+        print(f"Ошибка при привязке файла {file_path}: {str(e)}")
+
+def ignore_not_found(action, *args) -> None:
+    """Удаление во внешнем сервисе: уже удалённый объект не считается ошибкой"""
+    try:
+        action(*args)
+    except Exception as e:
+        if not is_not_found(e):
+            raise
+
+def find_site_item(context: JobContext, level: str, title: str, parent_id: Optional[int] = None) -> Optional[dict]:
+    """
+    Повтор создания на gushub.ru после потерянного ответа: объект мог быть
+    создан, поэтому сначала ищем его по названию у того же родителя
+    """
+    if not context.retrying:
+        return None
+    return context.gushub_api.find_course_item(level, title, parent_id)
+
+
+# -- Курсы --
+def create_course_repo(context: JobContext) -> dict:
+    payload = context.payload
+    repo = None
+    if context.retrying:
+        # Репозиторий мог быть создан прерванной попыткой
+        try:
+            repo = context.github_api.get_course(payload['title'])
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+    if repo is None:
+        repo = context.github_api.create_course(payload['title'], payload['description'])
+    return {'github_path': repo.html_url, 'repo_name': repo.name}
+
+def remove_course_repo(context: JobContext) -> None:
+    result = context.results['github']
+    repo_name = result.get('repo_name') or repo_name_from_path(result['github_path'])
+    ignore_not_found(context.github_api.delete_course, repo_name)
+
+def upload_course_image(context: JobContext) -> dict:
+    # Обложка уменьшается перед загрузкой, уже загруженная берётся по хешу файла
+    url, uploaded = upload_cover(context.gushub_api, context.payload['image_path'])
+    return {'url': url, 'uploaded': uploaded}
+
+def remove_course_image(context: JobContext) -> None:
+    # Изображение, взятое из уже загруженных, может быть обложкой другого курса
+    result = context.results['image']
+    if not result.get('uploaded'):
+        return
+    ignore_not_found(context.gushub_api.delete_photo, result['url'])
+    UploadedImages.shared().forget(context.gushub_api.account, result['url'])
+
+def create_gushub_course(context: JobContext) -> dict:
+    payload = context.payload
+    existing = find_site_item(context, 'courses', payload['title'])
+    if existing:
+        return {'site_id': existing['id']}
+    response = context.gushub_api.create_course({
+        'title': payload['title'],
+        'description': payload['description'],
+        'image': context.results['image']['url'],
+    })
+    return {'site_id': response['id']}
+
+def remove_gushub_course(context: JobContext) -> None:
+    ignore_not_found(context.gushub_api.delete_course, context.results['gushub']['site_id'])
+
+def add_course_row(context: JobContext) -> dict:
+    github_path = context.results['github']['github_path']
+    for course in context.db.get_courses():
+        if course['github_path'] == github_path:
+            return {'course_id': course['id']}
+    course_id = context.db.add_course(
+        github_path=github_path,
+        title=context.payload['title'],
+        description=context.payload['description'],
+        site_id=context.results['gushub']['site_id'],
+    )
+    return {'course_id': course_id}
+
+def delete_course_repo(context: JobContext) -> dict:
+    if context.payload.get('repo_name'):
+        ignore_not_found(context.github_api.delete_course, context.payload['repo_name'])
+    return {}
+
+def delete_gushub_course(context: JobContext) -> dict:
+    if context.payload.get('site_id'):
+        ignore_not_found(context.gushub_api.delete_course, context.payload['site_id'])
+    return {}
+
+def delete_course_row(context: JobContext) -> dict:
+    context.db.delete_course(context.payload['course_id'])
+    if context.payload.get('repo_name'):
+        context.db.delete_published_assets(context.payload['repo_name'])
+    return {}
+
+
+# -- Модули --
+def create_module_files(context: JobContext) -> dict:
+    payload = context.payload
+    repo = context.github_api.get_course(payload['course_title'])
+    if context.retrying and file_exists(context, repo, f"{payload['title']}/README.md"):
+        return {'github_path': payload['title']}
+    return {'github_path': context.github_api.create_module(repo, payload['title'], payload['description'])}
+
+def remove_module_files(context: JobContext) -> None:
+    repo = context.github_api.get_course(context.payload['course_title'])
+    ignore_not_found(context.github_api.delete_module, repo, context.results['github']['github_path'])
+
+def create_gushub_module(context: JobContext) -> dict:
+    payload = context.payload
+    existing = find_site_item(context, 'modules', payload['title'], payload['course_site_id'])
+    if existing:
+        return {'site_id': existing['id']}
+    response = context.gushub_api.create_module(payload['course_site_id'], {
+        'title': payload['title'],
+        'description': payload['description'],
+    })
+    return {'site_id': response['id']}
+
+def remove_gushub_module(context: JobContext) -> None:
+    ignore_not_found(context.gushub_api.delete_module, context.results['gushub']['site_id'])
+
+def add_module_row(context: JobContext) -> dict:
+    payload = context.payload
+    for module in context.db.get_modules_by_course(payload['course_id']):
+        if module['title'] == payload['title']:
+            return {'module_id': module['id']}
+    module_id = context.db.add_module(
+        payload['course_id'],
+        context.results['github']['github_path'],
+        payload['title'],
+        payload['description'],
+        site_id=context.results['gushub']['site_id'],
+    )
+    return {'module_id': module_id}
+
+def delete_module_files(context: JobContext) -> dict:
+    payload = context.payload
+    if payload.get('github_path'):
+        repo = context.github_api.get_course(payload['course_title'])
+        ignore_not_found(context.github_api.delete_module, repo, payload['title'])
+    return {}
+
+def delete_gushub_module(context: JobContext) -> dict:
+    if context.payload.get('site_id'):
+        ignore_not_found(context.gushub_api.delete_module, context.payload['site_id'])
+    return {}
+
+def delete_module_row(context: JobContext) -> dict:
+    module = context.db.get_module(context.payload['module_id'])
+    course = context.db.get_course(module['course_id']) if module else None
+    if course and course['github_path'] and module['github_path']:
+        # Папка модуля удалена вместе с выложенными файлами
+        context.db.delete_published_assets(repo_name_from_path(course['github_path']), f"{module['github_path']}/")
+    context.db.delete_module(context.payload['module_id'])
+    return {}
+
+
+# -- Уроки --
+def create_lesson_file(context: JobContext) -> dict:
+    payload = context.payload
+    repo = context.github_api.get_course(payload['course_title'])
+    path = f"{payload['module_title']}/{payload['title']}.md"
+    if not (context.retrying and file_exists(context, repo, path)):
+        publish_markdown(context, repo, path, payload['file_path'], f"Add lesson {payload['title']}",
+                         lambda content: context.github_api.create_lesson(
+                             repo, payload['module_title'], payload['title'], payload['file_path'], content=content))
+    return {'github_path': path, 'raw_url': raw_url(context, repo, path)}
+
+def remove_lesson_file(context: JobContext) -> None:
+    repo = context.github_api.get_course(context.payload['course_title'])
+    delete_file(context, repo, context.results['github']['github_path'], context.github_api.delete_lesson)
+
+def create_gushub_lesson(context: JobContext) -> dict:
+    existing = find_site_item(context, 'lessons', context.payload['title'], context.payload['module_site_id'])
+    if existing:
+        return {'site_id': existing['id']}
+    response = context.gushub_api.create_lesson(context.payload['module_site_id'], {
+        'title': context.payload['title'],
+        'urlMd': encode_url(context.results['github']['raw_url']),
+    })
+    return {'site_id': response['id']}
+
+def remove_gushub_lesson(context: JobContext) -> None:
+    ignore_not_found(context.gushub_api.delete_lesson, context.results['gushub']['site_id'])
+
+def add_lesson_row(context: JobContext) -> dict:
+    payload = context.payload
+    for lesson in context.db.get_lessons_by_module(payload['module_id']):
+        if lesson['title'] == payload['title']:
+            return {'lesson_id': lesson['id']}
+    lesson_id = context.db.add_lesson(
+        payload['module_id'],
+        context.results['github']['github_path'],
+        payload['title'],
+        context.results['github']['raw_url'],  # В базе хранится URL без кодирования
+        site_id=context.results['gushub']['site_id'],
+    )
+    watch_file(context, 'lesson', lesson_id)
+    return {'lesson_id': lesson_id}
+
+def update_lesson_file(context: JobContext) -> dict:
+    payload = context.payload
+    repo = context.github_api.get_course(payload['course_title'])
+
+    def write(content: str) -> None:
+        contents = context.github_api.get_contents(repo, payload['github_path'])
+        context.github_api.update_lesson(
+            repo=repo,
+            path=payload['github_path'],
+            new_content=content,
+            commit_message=f"Update lesson {payload['title']}",
+            sha=contents.sha,
+        )
+
+    publish_markdown(context, repo, payload['github_path'], payload['file_path'],
+                     f"Update lesson {payload['title']}", write)
+    watch_file(context, 'lesson', payload['lesson_id'])
+    return {}
+
+def delete_lesson_files(context: JobContext) -> dict:
+    """Файлы задач и урока удаляются одним коммитом"""
+    payload = context.payload
+    if payload.get('github_path'):
+        paths = payload.get('task_paths', []) + [payload['github_path']]
+        context.report_progress(0, len(paths))
+        repo = context.github_api.get_course(payload['course_title'])
+        context.github_api.delete_files(repo, paths, f"Delete lesson {payload['title']}")
+        context.report_progress(len(paths), len(paths))
+    return {}
+
+def delete_gushub_lesson(context: JobContext) -> dict:
+    """Шаги задач удаляются параллельно (не больше GushubAPI.MAX_WORKERS запросов), затем урок"""
+    payload = context.payload
+    if not payload.get('site_id'):
+        return {}
+    step_ids = payload.get('task_site_ids', [])
+    total = len(step_ids) + 1
+    context.report_progress(0, total)
+    error = None
+    for done, (_, step_error) in enumerate(context.gushub_api.iter_delete_steps(step_ids), start=1):
+        if step_error is not None and not is_not_found(step_error):
+            error = error or step_error
+        context.report_progress(done, total)
+    if error is not None:
+        raise error
+    ignore_not_found(context.gushub_api.delete_lesson, payload['site_id'])
+    context.report_progress(total, total)
+    return {}
+
+def delete_lesson_row(context: JobContext) -> dict:
+    lesson_id = context.payload['lesson_id']
+    context.db.delete_watched_files('task', [task['id'] for task in context.db.get_tasks_by_lesson(lesson_id)])
+    context.db.delete_watched_files('lesson', [lesson_id])
+    # Удаляет и все задачи урока
+    context.db.delete_lesson(lesson_id)
+    return {}
+
+
+# -- Задачи --
+def create_task_file(context: JobContext) -> dict:
+    payload = context.payload
+    repo = context.github_api.get_course(payload['course_title'])
+    path = f"{payload['module_title']}/{payload['title']}.md"
+    if not (context.retrying and file_exists(context, repo, path)):
+        publish_markdown(context, repo, path, payload['file_path'], f"Add task {payload['title']}",
+                         lambda content: context.github_api.create_task(
+                             repo=repo,
+                             module_path=payload['module_title'],
+                             filename=payload['title'],
+                             content=content,
+                             commit_message=f"Add task {payload['title']}",
+                         ))
+    return {'github_path': path, 'raw_url': raw_url(context, repo, path)}
+
+def remove_task_file(context: JobContext) -> None:
+    repo = context.github_api.get_course(context.payload['course_title'])
+    delete_file(context, repo, context.results['github']['github_path'], context.github_api.delete_task)
+
+def create_gushub_step(context: JobContext) -> dict:
+    if not context.payload.get('lesson_site_id'):
+        return {'site_id': None}
+    existing = find_site_item(context, 'steps', context.payload['title'], context.payload['lesson_site_id'])
+    if existing:
+        return {'site_id': existing['id']}
+    response = context.gushub_api.create_step(context.payload['lesson_site_id'], {
+        'title': context.payload['title'],
+        'urlMd': encode_url(context.results['github']['raw_url']),
+        'type': 'ASSIGNMENT',
+    })
+    return {'site_id': response['id']}
+
+def remove_gushub_step(context: JobContext) -> None:
+    if context.results['gushub']['site_id']:
+        ignore_not_found(context.gushub_api.delete_step, context.results['gushub']['site_id'])
+
+def add_task_row(context: JobContext) -> dict:
+    payload = context.payload
+    for task in context.db.get_tasks_by_lesson(payload['lesson_id']):
+        if task['title'] == payload['title']:
+            return {'task_id': task['id']}
+    task_id = context.db.add_task(
+        payload['lesson_id'],
+        context.results['github']['github_path'],
+        payload['title'],
+        context.results['github']['raw_url'],
+        site_id=context.results['gushub']['site_id'],
+    )
+    watch_file(context, 'task', task_id)
+    return {'task_id': task_id}
+
+def update_task_file(context: JobContext) -> dict:
+    payload = context.payload
+    repo = context.github_api.get_course(payload['course_title'])
+
+    def write(content: str) -> None:
+        contents = context.github_api.get_contents(repo, payload['github_path'])
+        context.github_api.update_task(
+            repo=repo,
+            path=payload['github_path'],
+            new_content=content,
+            commit_message=f"Update task {payload['title']}",
+            sha=contents.sha,
+        )
+
+    publish_markdown(context, repo, payload['github_path'], payload['file_path'],
+                     f"Update task {payload['title']}", write)
+    watch_file(context, 'task', payload['task_id'])
+    return {}
+
+def delete_task_file(context: JobContext) -> dict:
+    payload = context.payload
+    if payload.get('github_path'):
+        repo = context.github_api.get_course(payload['course_title'])
+        delete_file(context, repo, payload['github_path'], context.github_api.delete_task)
+    return {}
+
+def delete_gushub_step(context: JobContext) -> dict:
+    if context.payload.get('site_id'):
+        ignore_not_found(context.gushub_api.delete_step, context.payload['site_id'])
+    return {}
+
+def delete_task_row(context: JobContext) -> dict:
+    context.db.delete_watched_files('task', [context.payload['task_id']])
+    context.db.delete_task(context.payload['task_id'])
+    return {}
+
+
+# -- Изменённые файлы (режим отслеживания) --
+def publish_changed_files(context: JobContext) -> dict:
+    """
+    Выкладывание накопившихся изменений файлов уроков и задач: одним
+    коммитом на каждый репозиторий курса. Файлы, удалённые с диска,
+    пропускаются.
+    """
+    courses = {}
+    for item in context.payload['files']:
+        courses.setdefault(item['course_title'], []).append(item)
+    context.report_progress(0, len(courses))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for done, (course_title, items) in enumerate(courses.items(), start=1):
+            repo = context.github_api.get_course(course_title)
+            files, new_hashes, published = {}, {}, []
+            for item in items:
+                if not os.path.isfile(item['file_path']):
+                    continue
+                markdown, hashes, assets = prepare_markdown(context, repo, item['github_path'], item['file_path'], temp_dir)
+                files[item['github_path']] = markdown
+                files.update(assets)
+                new_hashes.update(hashes)
+                published.append(item)
+            if files:
+                titles = ", ".join(item['title'] for item in published)
+                context.github_api.commit_files(repo, files, f"Update {titles}")
+            for asset_path, digest in new_hashes.items():
+                context.db.save_published_asset(repo.name, asset_path, digest)
+            for item in published:
+                context.db.save_watched_file(item['file_path'], item['kind'], item['item_id'], item['sha256'])
+            context.report_progress(done, len(courses))
+    return {}
+
+
+# -- Виды задач --
+# Шаги создания отменяются при неудаче задачи, чтобы на GitHub и gushub.ru
+# не оставалось объектов без записи в базе. Удаление и обновление не
+# отменяются: повторная постановка доводит их до конца.
+# Шаги GitHub и gushub.ru независимы и выполняются параллельно, где gushub.ru
+# не нужен результат GitHub (ссылка на файл урока или задачи); запись в
+# базу ждёт все шаги.
+# Ключ создания - родитель и название: из названия строятся имя репозитория
+# и пути файлов, поэтому правка остальных полей после неудачи продолжает ту
+# же задачу с новыми параметрами, а не упирается в «уже существует».
+CREATE_COURSE = JobDefinition('create_course', "Создание курса «{title}»", [
+    Step('github', create_course_repo, remove_course_repo, depends_on=()),
+    Step('image', upload_course_image, remove_course_image, depends_on=()),
+    Step('gushub', create_gushub_course, remove_gushub_course, depends_on=('image',)),
+    Step('db', add_course_row),
+], key_fields=('title',))
+
+DELETE_COURSE = JobDefinition('delete_course', "Удаление курса «{title}»", [
+    Step('github', delete_course_repo, depends_on=()),
+    Step('gushub', delete_gushub_course, depends_on=()),
+    Step('db', delete_course_row),
+], key_fields=('course_id',))
+
+CREATE_MODULE = JobDefinition('create_module', "Создание модуля «{title}»", [
+    Step('github', create_module_files, remove_module_files, depends_on=()),
+    Step('gushub', create_gushub_module, remove_gushub_module, depends_on=()),
+    Step('db', add_module_row),
+], key_fields=('course_id', 'title'))
+
+DELETE_MODULE = JobDefinition('delete_module', "Удаление модуля «{title}»", [
+    Step('github', delete_module_files, depends_on=()),
+    Step('gushub', delete_gushub_module, depends_on=()),
+    Step('db', delete_module_row),
+], key_fields=('module_id',))
+
+CREATE_LESSON = JobDefinition('create_lesson', "Создание урока «{title}»", [
+    Step('github', create_lesson_file, remove_lesson_file),
+    Step('gushub', create_gushub_lesson, remove_gushub_lesson),
+    Step('db', add_lesson_row),
+], key_fields=('module_id', 'title'))
+
+UPDATE_LESSON = JobDefinition('update_lesson', "Обновление урока «{title}»", [
+    Step('github', update_lesson_file),
+], key_fields=('lesson_id', 'file_path'))
+
+DELETE_LESSON = JobDefinition('delete_lesson', "Удаление урока «{title}»", [
+    Step('github', delete_lesson_files, depends_on=()),
+    Step('gushub', delete_gushub_lesson, depends_on=()),
+    Step('db', delete_lesson_row),
+], key_fields=('lesson_id',))
+
+CREATE_TASK = JobDefinition('create_task', "Создание задачи «{title}»", [
+    Step('github', create_task_file, remove_task_file),
+    Step('gushub', create_gushub_step, remove_gushub_step),
+    Step('db', add_task_row),
+], key_fields=('lesson_id', 'title'))
+
+UPDATE_TASK = JobDefinition('update_task', "Обновление задачи «{title}»", [
+    Step('github', update_task_file),
+], key_fields=('task_id', 'file_path'))
+
+DELETE_TASK = JobDefinition('delete_task', "Удаление задачи «{title}»", [
+    Step('github', delete_task_file, depends_on=()),
+    Step('gushub', delete_gushub_step, depends_on=()),
+    Step('db', delete_task_row),
+], key_fields=('task_id',))
+
+PUBLISH_CHANGES = JobDefinition('publish_changes', "Публикация изменённых файлов ({count})", [
+    Step('github', publish_changed_files),
+], key_fields=('batch',))
+
+CONTENT_JOBS = {definition.kind: definition for definition in (
+    CREATE_COURSE, DELETE_COURSE, CREATE_MODULE, DELETE_MODULE, CREATE_LESSON,
+    UPDATE_LESSON, DELETE_LESSON, CREATE_TASK, UPDATE_TASK, DELETE_TASK, PUBLISH_CHANGES,
+)}
@@ -0,0 +1,373 @@
+import copy
+import json
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Generator, Iterator, Optional, Sequence, Tuple
+
+import requests
+from github import GithubException
+
+from app.api.github_api import GitHubAPI, is_github_failure
+from app.api.github_scheduler import RateLimitExhausted
+from app.api.gushub_api import GushubAPI
+from app.api.offline_cache import is_service_unavailable
+from app.database.database import Database
+from app.settings import AppSettings
+
+# Попыток выполнения задачи при временных сбоях, затем задача считается неудачной
+MAX_ATTEMPTS = 5
+# Задержка перед повтором (удваивается с каждой попыткой), секунды
+RETRY_DELAY = 30
+RETRY_DELAY_MAX = 15 * 60
+# Как часто передавать прогресс выполняющихся шагов, секунды
+PROGRESS_INTERVAL = 0.2
+
+
+def exception_chain(exc: Optional[BaseException]) -> Iterator[BaseException]:
+    """Исключение и все, из-за которых оно возникло (обёртки клиентов API)"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Временный сбой сети или сервиса: задачу имеет смысл повторить позже"""
+    return any(is_service_unavailable(error) or is_github_failure(error) or isinstance(error, RateLimitExhausted)
+               for error in exception_chain(exc))
+
+
+def is_not_found(exc: BaseException) -> bool:
+    """Объект не найден (404): для шага удаления это значит, что он уже выполнен"""
+    for error in exception_chain(exc):
+        if isinstance(error, GithubException) and error.status == 404:
+            return True
+        response = getattr(error, 'response', None)
+        if isinstance(error, requests.exceptions.HTTPError) and response is not None and response.status_code == 404:
+            return True
+    return False
+
+
+def retry_delay(attempts: int) -> int:
+    return min(RETRY_DELAY * 2 ** max(attempts - 1, 0), RETRY_DELAY_MAX)
+
+
+def retry_time(exc: BaseException, attempts: int) -> int:
+    """Время повтора задачи: не раньше сброса исчерпанного лимита GitHub"""
+    retry_at = int(time.time()) + retry_delay(attempts)
+    for error in exception_chain(exc):
+        if isinstance(error, RateLimitExhausted):
+            retry_at = max(retry_at, int(error.reset_at) + 1)
+    return retry_at
+
+
+class Services:
+    """
+    Соединение с базой и клиенты API для шагов задач. Клиенты создаются при
+    первом обращении: GitHubAPI при создании сразу обращается к GitHub.
+    Клиенты API доступны из параллельных шагов, соединение с базой - только
+    из потока выполнения очереди.
+    """
+    def __init__(self, db: Database, github_api: Optional[GitHubAPI] = None, gushub_api: Optional[GushubAPI] = None):
+        self.db = db
+        self._github_api = github_api
+        self._gushub_api = gushub_api
+        self._github_lock = threading.Lock()
+        self._gushub_lock = threading.Lock()
+
+    @property
+    def github_api(self) -> GitHubAPI:
+        with self._github_lock:
+            if self._github_api is None:
+                self._github_api = GitHubAPI(AppSettings().get_github_token())
+            return self._github_api
+
+    @property
+    def gushub_api(self) -> GushubAPI:
+        with self._gushub_lock:
+            if self._gushub_api is None:
+                self._gushub_api = GushubAPI()
+            return self._gushub_api
+
+
+class JobContext:
+    """Данные задачи для шага: параметры, результаты выполненных шагов и сервисы"""
+    def __init__(self, job_id: int, payload: dict, results: Dict[str, object], services: Services):
+        self.job_id = job_id
+        self.payload = payload
+        self.results = results
+        self.services = services
+        # Шаг уже начинался раньше: перед действием стоит проверить его результат
+        self.retrying = False
+        # Состояния шагов на момент загрузки задачи
+        self.states: Dict[str, str] = {}
+        self._progress: Optional[Callable[[int, int], None]] = None
+
+    def report_progress(self, done: int, total: int) -> None:
+        """Прогресс долгого шага (например, удаления многих объектов), можно вызывать из потока шага"""
+        if self._progress is not None:
+            self._progress(done, total)
+
+    @property
+    def db(self) -> Database:
+        return self.services.db
+
+    @property
+    def github_api(self) -> GitHubAPI:
+        return self.services.github_api
+
+    @property
+    def gushub_api(self) -> GushubAPI:
+        return self.services.gushub_api
+
+
+class Step:
+    """
+    Шаг задачи. run(context) выполняет одно действие во внешнем сервисе или
+    в базе и возвращает JSON-совместимый результат, который сохраняется до
+    перехода к следующему шагу: при повторе задачи выполненные шаги
+    пропускаются. Шаг должен быть идемпотентным - если приложение упало
+    между действием и сохранением результата, он выполнится ещё раз
+    (с context.retrying).
+
+    compensate(context) отменяет действие выполненного шага (например,
+    удаляет созданный репозиторий), результат шага - в context.results.
+    Шаги без компенсации при отмене задачи остаются выполненными, и их
+    результат используется при повторе.
+
+    depends_on - шаги, результат которых нужен этому шагу. По умолчанию
+    (None) шаг ждёт все предыдущие; шаги с явными зависимостями выполняются
+    параллельно с остальными, как только готовы их зависимости, в отдельных
+    потоках. Такие шаги не должны обращаться к базе: соединение с ней
+    однопоточное, поэтому шаги по умолчанию выполняются в потоке очереди.
+    """
+    def __init__(self, name: str, run: Callable[[JobContext], object],
+                 compensate: Optional[Callable[[JobContext], None]] = None,
+                 depends_on: Optional[Sequence[str]] = None):
+        self.name = name
+        self.run = run
+        self.compensate = compensate
+        self.depends_on = None if depends_on is None else tuple(depends_on)
+
+
+class JobDefinition:
+    """
+    Вид задачи: шаги и описание. Ключ идемпотентности собирается из полей
+    параметров key_fields - повторная постановка той же операции, пока она
+    не выполнена, не создаёт новую задачу.
+    """
+    def __init__(self, kind: str, title: str, steps: Sequence[Step], key_fields: Sequence[str]):
+        self.kind = kind
+        self.title = title
+        self.steps = list(steps)
+        self.key_fields = tuple(key_fields)
+        names = [step.name for step in self.steps]
+        # Зависимости каждого шага с учётом значения по умолчанию
+        self.dependencies = {
+            step.name: set(names[:position] if step.depends_on is None else step.depends_on)
+            for position, step in enumerate(self.steps)
+        }
+        for name, dependencies in self.dependencies.items():
+            if not dependencies <= set(names[:names.index(name)]):
+                raise ValueError(f"Шаг {name} задачи {kind} зависит от неизвестного или следующего шага")
+
+    def describe(self, payload: dict) -> str:
+        return self.title.format(**payload)
+
+    def idempotency_key(self, payload: dict) -> str:
+        return ':'.join([self.kind] + [str(payload.get(field)).casefold() for field in self.key_fields])
+
+
+def enqueue(db: Database, definition: JobDefinition, payload: dict) -> int:
+    """Постановка операции в очередь, возвращает id задачи"""
+    return db.add_outbox_job(definition.kind, definition.idempotency_key(payload),
+                             json.dumps(payload, ensure_ascii=False),
+                             [step.name for step in definition.steps])
+
+
+class JobEvent:
+    """Событие выполнения очереди для интерфейса"""
+    STARTED = 'started'
+    PROGRESS = 'progress'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+
+    def __init__(self, event: str, job_id: int, kind: str, description: str,
+                 results: Optional[dict] = None, error: Optional[str] = None, retry_at: Optional[int] = None,
+                 compensated: Sequence[str] = (), progress: Optional[Tuple[int, int]] = None):
+        self.event = event
+        self.job_id = job_id
+        self.kind = kind
+        self.description = description
+        self.results = results or {}
+        self.error = error
+        self.retry_at = retry_at
+        self.compensated = list(compensated)  # Шаги, действия которых отменены
+        self.progress = progress  # (выполнено, всего) по шагам, сообщающим прогресс
+
+
+class OutboxExecutor:
+    """
+    Выполнение задач очереди по порядку постановки. Состояние задач и шагов
+    хранится в базе, поэтому прерванная задача после перезапуска
+    продолжается с первого невыполненного шага. Временные сбои сети и
+    сервисов откладывают задачу с растущей задержкой. При остальных ошибках
+    (и после последней попытки) задача откатывается как сага: компенсации
+    выполненных шагов запускаются в обратном порядке, и задача переходит в
+    состояние failed до повторной постановки пользователем.
+    """
+    def __init__(self, definitions: Dict[str, JobDefinition], services: Services):
+        self.definitions = definitions
+        self.services = services
+
+    @property
+    def db(self) -> Database:
+        return self.services.db
+
+    def _context(self, job: dict) -> JobContext:
+        """Контекст задачи с результатами выполненных шагов и их состояниями"""
+        states = {step['name']: step for step in self.db.get_outbox_steps(job['id'])}
+        results: Dict[str, object] = {
+            name: json.loads(state['result'])
+            for name, state in states.items() if state['status'] == 'done' and state['result'] is not None
+        }
+        context = JobContext(job['id'], json.loads(job['payload']), results, self.services)
+        context.states = {name: state['status'] for name, state in states.items()}
+        return context
+
+    def run_job(self, job: dict, description: str = '') -> Generator[JobEvent, None, Dict[str, object]]:
+        """
+        Выполнение невыполненных шагов задачи, выдаёт события прогресса и
+        возвращает результаты всех шагов. Шаг запускается, как только
+        выполнены его зависимости; независимые шаги (например, GitHub и
+        gushub.ru) идут параллельно. После ошибки новые шаги не запускаются,
+        но уже начатые доводятся до конца, чтобы их результат был сохранён.
+        """
+        definition = self.definitions[job['kind']]
+        context = self._context(job)
+        results = context.results
+        pending = [step for step in definition.steps if context.states.get(step.name) != 'done']
+        done = {name for name, status in context.states.items() if status == 'done'}
+        running = {}
+        errors = {}
+        progress_queue = queue.Queue()
+        progress = {}
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1), thread_name_prefix="outbox-step") as executor:
+            while pending or running:
+                if not errors:
+                    for step in [step for step in pending if definition.dependencies[step.name] <= done]:
+                        pending.remove(step)
+                        running[self._start_step(executor, job, context, step, progress_queue)] = step
+                if not running:
+                    break
+                finished, _ = wait(running, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                if not progress_queue.empty():
+                    while not progress_queue.empty():
+                        name, step_done, step_total = progress_queue.get()
+                        progress[name] = (step_done, step_total)
+                    yield JobEvent(JobEvent.PROGRESS, job['id'], job['kind'], description, progress=(
+                        sum(value[0] for value in progress.values()), sum(value[1] for value in progress.values())))
+                for future in finished:
+                    step = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.db.update_outbox_step(job['id'], step.name, 'failed', error=str(e))
+                        errors[step.name] = e
+                        continue
+                    results[step.name] = result
+                    done.add(step.name)
+                    self.db.update_outbox_step(job['id'], step.name, 'done', json.dumps(result, ensure_ascii=False))
+        for step in definition.steps:
+            if step.name in errors:
+                raise errors[step.name]
+        return results
+
+    def _start_step(self, executor: ThreadPoolExecutor, job: dict, context: JobContext, step: Step,
+                    progress_queue: queue.Queue):
+        # У каждого шага свой флаг повтора: прерванный или неудачный шаг
+        # мог успеть выполнить действие в сервисе
+        step_context = copy.copy(context)
+        step_context.retrying = context.states.get(step.name) in ('running', 'failed')
+        step_context._progress = lambda done, total: progress_queue.put((step.name, done, total))
+        self.db.update_outbox_step(job['id'], step.name, 'running')
+        if step.depends_on is not None:
+            return executor.submit(step.run, step_context)
+        future = Future()
+        try:
+            future.set_result(step.run(step_context))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def compensate(self, job: dict) -> list:
+        """
+        Отмена выполненных шагов в обратном порядке, возвращает имена
+        отменённых. Шаг, компенсация которого не удалась, остаётся
+        выполненным: при повторе задачи его результат будет использован
+        вместо создания объекта заново.
+        """
+        definition = self.definitions[job['kind']]
+        context = self._context(job)
+        compensated = []
+        for step in reversed(definition.steps):
+            if step.compensate is None or context.states.get(step.name) != 'done':
+                continue
+            try:
+                step.compensate(context)
+            except Exception as e:
+                if not is_not_found(e):
+                    print(f"Ошибка при отмене шага {step.name} задачи {job['id']}: {str(e)}")
+                    continue
+            self.db.update_outbox_step(job['id'], step.name, 'compensated')
+            compensated.append(step.name)
+        return compensated
+
+    def process_due(self) -> Iterator[JobEvent]:
+        """Выполнение всех готовых задач, выдаёт события для интерфейса"""
+        while True:
+            jobs = [job for job in self.db.get_due_outbox_jobs() if job['kind'] in self.definitions]
+            if not jobs:
+                return
+            for job in jobs:
+                yield from self._process(job)
+
+    def _process(self, job: dict) -> Iterator[JobEvent]:
+        definition = self.definitions[job['kind']]
+        description = definition.describe(json.loads(job['payload']))
+        self.db.update_outbox_job(job['id'], 'running')
+        yield JobEvent(JobEvent.STARTED, job['id'], job['kind'], description)
+        try:
+            results = yield from self.run_job(job, description)
+        except Exception as e:
+            attempts = job['attempts'] + 1
+            retry_at = None
+            compensated = []
+            print(f"Ошибка при выполнении задачи «{description}»: {str(e)}")
+            if is_transient(e) and attempts < MAX_ATTEMPTS:
+                retry_at = retry_time(e, attempts)
+                self.db.update_outbox_job(job['id'], 'retry', attempts, retry_at, str(e))
+            else:
+                compensated = self.compensate(job)
+                self.db.update_outbox_job(job['id'], 'failed', attempts, last_error=str(e))
+            yield JobEvent(JobEvent.FAILED, job['id'], job['kind'], description, error=str(e),
+                           retry_at=retry_at, compensated=compensated)
+            return
+        self.db.update_outbox_job(job['id'], 'done', job['attempts'] + 1)
+        yield JobEvent(JobEvent.FINISHED, job['id'], job['kind'], description, results=results)
+
+
+def process_outbox(definitions: Dict[str, JobDefinition], github_api: Optional[GitHubAPI] = None,
+                   gushub_api: Optional[GushubAPI] = None) -> Iterator[JobEvent]:
+    """
+    Выполнение очереди для фоновой задачи. Соединение с базой открывается
+    в потоке выполнения и закрывается по завершении.
+    """
+    db = Database()
+    try:
+        yield from OutboxExecutor(definitions, Services(db, github_api, gushub_api)).process_due()
+    finally:
+        db.close()
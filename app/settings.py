@@ -73,6 +73,90 @@ class AppSettings:
     def set_gushub_token(self, token: str) -> None:
         self.settings.setValue("gushub/token", token)
 
+    # Network
+    def get_request_timeouts(self) -> tuple[float, float]:
+        """Таймауты подключения и чтения в секундах"""
+        connect = self.settings.value("network/connect_timeout", 5.0, type=float)
+        read = self.settings.value("network/read_timeout", 30.0, type=float)
+        return connect, read
+
+    def set_request_timeouts(self, connect: float, read: float) -> None:
+        self.settings.setValue("network/connect_timeout", connect)
+        self.settings.setValue("network/read_timeout", read)
+
+    def get_retry_settings(self) -> tuple[int, float, float]:
+        """Количество повторов, базовая и максимальная задержка между ними"""
+        max_retries = self.settings.value("network/max_retries", 3, type=int)
+        backoff_base = self.settings.value("network/backoff_base", 0.5, type=float)
+        backoff_max = self.settings.value("network/backoff_max", 8.0, type=float)
+        return max_retries, backoff_base, backoff_max
+
+    def set_retry_settings(self, max_retries: int, backoff_base: float, backoff_max: float) -> None:
+        self.settings.setValue("network/max_retries", max_retries)
+        self.settings.setValue("network/backoff_base", backoff_base)
+        self.settings.setValue("network/backoff_max", backoff_max)
+
+    def get_circuit_breaker_settings(self) -> tuple[int, float]:
+        """Число сбоев подряд до размыкания и время до пробного запроса"""
+        threshold = self.settings.value("network/breaker_threshold", 5, type=int)
+        reset_timeout = self.settings.value("network/breaker_reset_timeout", 30.0, type=float)
+        return threshold, reset_timeout
+
+    def set_circuit_breaker_settings(self, threshold: int, reset_timeout: float) -> None:
+        self.settings.setValue("network/breaker_threshold", threshold)
+        self.settings.setValue("network/breaker_reset_timeout", reset_timeout)
+
+    # Pagination
+    def get_page_size(self) -> int:
+        """Размер страницы при постраничной загрузке списков"""
+        return self.settings.value("network/page_size", 200, type=int)
+
+    def set_page_size(self, page_size: int) -> None:
+        self.settings.setValue("network/page_size", page_size)
+
+    # Работа без сети
+    def get_offline_cache_settings(self) -> tuple[bool, int]:
+        """Показывать ли сохранённые данные при недоступности Gushub и сколько дней их хранить"""
+        enabled = self.settings.value("network/offline_cache_enabled", True, type=bool)
+        max_age_days = self.settings.value("network/offline_cache_days", 30, type=int)
+        return enabled, max_age_days
+
+    def set_offline_cache_settings(self, enabled: bool, max_age_days: int) -> None:
+        self.settings.setValue("network/offline_cache_enabled", enabled)
+        self.settings.setValue("network/offline_cache_days", max_age_days)
+
+    # Фоновая загрузка аналитики
+    def get_prefetch_settings(self) -> tuple[bool, int, int]:
+        """Включена ли загрузка, интервал в минутах и число параллельных запросов"""
+        enabled = self.settings.value("analytics/prefetch_enabled", True, type=bool)
+        interval = self.settings.value("analytics/prefetch_interval", 15, type=int)
+        max_workers = self.settings.value("analytics/prefetch_workers", 4, type=int)
+        return enabled, interval, max_workers
+
+    def set_prefetch_settings(self, enabled: bool, interval: int, max_workers: int) -> None:
+        self.settings.setValue("analytics/prefetch_enabled", enabled)
+        self.settings.setValue("analytics/prefetch_interval", interval)
+        self.settings.setValue("analytics/prefetch_workers", max_workers)
+
+    def get_prefetch_groups(self) -> list[int]:
+        """ID групп для фоновой загрузки (пустой список - все группы)"""
+        value = self.settings.value("analytics/prefetch_groups", "", type=str)
+        return [int(group_id) for group_id in value.replace(' ', '').split(',') if group_id.isdigit()]
+
+    def set_prefetch_groups(self, group_ids: list[int]) -> None:
+        self.settings.setValue("analytics/prefetch_groups", ",".join(str(group_id) for group_id in group_ids))
+
+    # Отслеживание файлов уроков
+    def get_watch_settings(self) -> tuple[bool, int]:
+        """Выкладывать ли изменённые файлы уроков и задач автоматически и как часто, в секундах"""
+        enabled = self.settings.value("content/watch_enabled", False, type=bool)
+        interval = self.settings.value("content/watch_interval", 60, type=int)
+        return enabled, interval
+
+    def set_watch_settings(self, enabled: bool, interval: int) -> None:
+        self.settings.setValue("content/watch_enabled", enabled)
+        self.settings.setValue("content/watch_interval", interval)
+
     # Очистка (если нужно)
     def clear(self) -> None:
         self.settings.clear()
@@ -0,0 +1,190 @@
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+from app.api.cover_images import file_sha256
+from app.database.database import Database
+from app.outbox.content import PUBLISH_CHANGES
+from app.outbox.jobs import enqueue
+from app.settings import AppSettings
+
+
+class FileWatcher(QObject):
+    """
+    Режим отслеживания: автоматическое выкладывание изменённых файлов
+    уроков и задач.
+
+    Файлы, выложенные через приложение, привязаны к записям в базе
+    (watched_files). Уведомления файловой системы собираются с задержкой
+    (редактор сохраняет файл в несколько приёмов), изменение подтверждается
+    хешем содержимого, а накопленные изменения раз в интервал из настроек
+    ставятся в очередь одной задачей - одним коммитом на репозиторий курса.
+    """
+    # Задержка проверки после последнего уведомления, мс
+    DEBOUNCE_MS = 2000
+
+    job_enqueued = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db = Database()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self._files: Dict[str, dict] = {}  # Путь -> привязка с хешем выложенной версии
+        self._enqueued: Dict[str, str] = {}  # Хеши, поставленные в очередь, но ещё не выложенные
+        self._jobs: Dict[int, List[str]] = {}  # Задача очереди -> файлы, которые она выкладывает
+        self._dirty: Set[str] = set()  # Файлы с уведомлениями, ещё не проверенные
+        self._changed: Dict[str, str] = {}  # Изменённые файлы и их хеши, ждут выкладывания
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self.check_changes)
+        self._batch = QTimer(self)
+        self._batch.timeout.connect(self.publish_changes)
+
+    def start(self) -> None:
+        enabled, interval = AppSettings().get_watch_settings()
+        if not enabled:
+            return
+        self._batch.start(interval * 1000)
+        self.reload()
+
+    def stop(self) -> None:
+        self._debounce.stop()
+        self._batch.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        # После повторного запуска все файлы проверяются заново
+        self._files.clear()
+        self._dirty.clear()
+        self._changed.clear()
+
+    def restart(self) -> None:
+        """Применение изменённых настроек отслеживания"""
+        self.stop()
+        self.start()
+
+    def reload(self) -> None:
+        """Перечитывание привязок из базы (после выложенных и удалённых уроков и задач)"""
+        if not self._batch.isActive():
+            return
+        files = {row['path']: row for row in self.db.get_watched_files()}
+        # Новые файлы проверяются сразу: их могли изменить, пока приложение было закрыто
+        self._dirty.update(path for path in files if path not in self._files)
+        self._files = files
+
+        existing = [path for path in files if os.path.isfile(path)]
+        directories = {os.path.dirname(path) for path in existing}
+        stale = [path for path in self.watcher.files() if path not in files]
+        stale += [path for path in self.watcher.directories() if path not in directories]
+        if stale:
+            self.watcher.removePaths(stale)
+        new = [path for path in existing if path not in self.watcher.files()]
+        new += [path for path in directories if path not in self.watcher.directories()]
+        if new:
+            self.watcher.addPaths(new)
+        if self._dirty:
+            self._debounce.start(self.DEBOUNCE_MS)
+
+    def on_file_changed(self, path: str):
+        self._dirty.add(path)
+        self._debounce.start(self.DEBOUNCE_MS)
+
+    def on_directory_changed(self, directory: str):
+        # Многие редакторы сохраняют файл заменой, и наблюдение за ним теряется
+        self._dirty.update(path for path in self._files if os.path.dirname(path) == directory)
+        self._debounce.start(self.DEBOUNCE_MS)
+
+    def check_changes(self) -> None:
+        """Сравнение хешей файлов с уведомлениями с выложенными версиями"""
+        watched = set(self.watcher.files())
+        for path in self._dirty:
+            record = self._files.get(path)
+            if record is None or not os.path.isfile(path):
+                continue
+            if path not in watched:
+                self.watcher.addPath(path)
+            try:
+                digest = file_sha256(path)
+            except OSError as e:
+                print(f"Ошибка при чтении файла {path}: {str(e)}")
+                continue
+            if digest != record['sha256'] and digest != self._enqueued.get(path):
+                self._changed[path] = digest
+            else:
+                # Сохранение без изменений, возврат к выложенной версии или к уже поставленной в очередь
+                self._changed.pop(path, None)
+        self._dirty.clear()
+
+    def _describe(self, record: dict) -> Optional[dict]:
+        """Данные урока или задачи для выкладывания файла, None - если запись удалена"""
+        if record['kind'] == 'task':
+            item = self.db.get_task(record['item_id'])
+            lesson = self.db.get_lesson(item['lesson_id']) if item else None
+        else:
+            item = lesson = self.db.get_lesson(record['item_id'])
+        module = self.db.get_module(lesson['module_id']) if lesson else None
+        course = self.db.get_course(module['course_id']) if module else None
+        if not course or not item['github_path']:
+            return None
+        return {
+            'kind': record['kind'],
+            'item_id': record['item_id'],
+            'title': item['title'],
+            'course_title': course['title'],
+            'github_path': item['github_path'],
+            'file_path': record['path'],
+        }
+
+    def publish_changes(self) -> None:
+        """Постановка накопленных изменений в очередь одной задачей"""
+        if not self._changed:
+            return
+        files = []
+        try:
+            for path, digest in self._changed.items():
+                item = self._describe(self._files[path])
+                if item is None:
+                    self.db.delete_watched_files(self._files[path]['kind'], [self._files[path]['item_id']])
+                    continue
+                files.append(dict(item, sha256=digest))
+            self._changed.clear()
+            if not files:
+                return
+            job_id = enqueue(self.db, PUBLISH_CHANGES, {
+                'batch': time.time_ns(),
+                'count': len(files),
+                'files': files,
+            })
+        except Exception as e:
+            print(f"Ошибка при постановке изменённых файлов в очередь: {str(e)}")
+            return
+        # Выложенный хеш записывается в базу шагом задачи, до её завершения
+        # поставленная версия только не ставится в очередь повторно
+        for item in files:
+            self._enqueued[item['file_path']] = item['sha256']
+        self._jobs[job_id] = [item['file_path'] for item in files]
+        self.job_enqueued.emit(job_id)
+
+    def on_job_finished(self, job_id: int) -> None:
+        """Выполненная задача: выложенные хеши перечитываются из базы"""
+        for path in self._jobs.pop(job_id, []):
+            self._enqueued.pop(path, None)
+        self.reload()
+
+    def on_job_failed(self, job_id: int, retry_at=None) -> None:
+        """Задача не выполнена: её файлы снова проверяются и попадут в следующую задачу"""
+        if retry_at is not None:
+            # Отложенная задача ещё выполнится, её файлы остаются в очереди
+            return
+        paths = self._jobs.pop(job_id, None)
+        if not paths:
+            return
+        for path in paths:
+            self._enqueued.pop(path, None)
+        self._dirty.update(paths)
+        if self._batch.isActive():
+            self._debounce.start(self.DEBOUNCE_MS)
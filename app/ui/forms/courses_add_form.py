@@ -49,7 +49,7 @@ class CreateCourseDialog(QDialog):
             self,
             "Выберите изображение",
             "",
-            "Изображения (*.png *.jpg *.jpeg)"
+            "Изображения (*.png *.jpg *.jpeg *.webp)"
         )
         if file_path:
             self.image_path = file_path
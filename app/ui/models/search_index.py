@@ -0,0 +1,277 @@
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Set
+
+from PyQt6.QtCore import QAbstractProxyModel, QModelIndex, Qt
+from transliterate.utils import get_language_pack
+
+
+# Разделитель записей в общей строке индекса, не встречается в запросах
+SEPARATOR = '\x00'
+
+
+def _build_transliteration():
+    """
+    Таблицы транслитерации из языкового пакета transliterate.
+    Вызов translit на каждую строку индекса заметно медленнее str.translate.
+    """
+    pack = get_language_pack('ru')
+    latin, cyrillic = pack.mapping
+    to_latin, to_cyrillic = {}, {}
+    for lat, cyr in zip(latin, cyrillic):
+        if cyr.islower():
+            to_latin[cyr] = '' if lat == "'" else lat
+        if lat.islower():
+            to_cyrillic.setdefault(lat, cyr)
+    for cyr, lat in zip(*pack.reversed_specific_mapping):
+        if cyr.islower():
+            to_latin[cyr] = '' if lat == "'" else lat
+    combinations = {lat: cyr for lat, cyr in pack.pre_processor_mapping.items() if lat.islower()}
+    for lat, cyr in combinations.items():
+        to_latin[cyr] = lat
+    # Длинные сочетания заменяются первыми: sch раньше sh
+    combinations = sorted(combinations.items(), key=lambda item: len(item[0]), reverse=True)
+    return str.maketrans(to_latin), str.maketrans(to_cyrillic), combinations
+
+
+_TO_LATIN, _TO_CYRILLIC, _LATIN_COMBINATIONS = _build_transliteration()
+
+
+def normalize(text: str) -> str:
+    """Приведение к виду для поиска: нижний регистр, ё -> е"""
+    return text.casefold().replace('ё', 'е')
+
+
+def to_latin(text: str) -> str:
+    return text.translate(_TO_LATIN)
+
+
+def to_cyrillic(text: str) -> str:
+    for lat, cyr in _LATIN_COMBINATIONS:
+        text = text.replace(lat, cyr)
+    return text.translate(_TO_CYRILLIC)
+
+
+def search_key(values: Iterable[object]) -> str:
+    """Ключ поиска для строки таблицы: все значения в исходном написании, латиницей и кириллицей"""
+    text = normalize(' '.join(str(value) for value in values if value is not None))
+    return f"{text} {to_latin(text)} {to_cyrillic(text)}"
+
+
+class SearchIndex:
+    """
+    Индекс подстрочного поиска по строкам таблицы.
+
+    Ключи всех строк склеены в одну строку, поэтому поиск выполняется
+    вызовами str.find, а номер строки по смещению находится бинарным
+    поиском. Если новый запрос продолжает предыдущий, проверяются только
+    строки, подошедшие под предыдущий.
+    """
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self._text = ''
+        self._offsets: List[int] = []
+        self._dirty = False
+        self._last_query = ''
+        self._last_rows: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clear(self) -> None:
+        self.keys = []
+        self._text = ''
+        self._offsets = []
+        self._dirty = False
+        self._last_query = ''
+        self._last_rows = None
+
+    def add(self, key: str) -> None:
+        self.keys.append(key)
+        self._dirty = True
+
+    def _rebuild(self) -> None:
+        offsets = []
+        position = 0
+        for key in self.keys:
+            offsets.append(position)
+            position += len(key) + 1
+        self._offsets = offsets
+        self._text = SEPARATOR.join(self.keys)
+        self._dirty = False
+
+    def matches(self, row: int, query: str) -> bool:
+        return normalize(query.strip()) in self.keys[row]
+
+    def search(self, query: str) -> Optional[Set[int]]:
+        """Номера подходящих строк, None - подходят все"""
+        query = normalize(query.strip())
+        if not query:
+            self._last_query, self._last_rows = '', None
+            return None
+
+        if self._last_rows is not None and not self._dirty and query.startswith(self._last_query):
+            keys = self.keys
+            rows = {row for row in self._last_rows if query in keys[row]}
+        else:
+            if self._dirty:
+                self._rebuild()
+            rows = set()
+            text, offsets = self._text, self._offsets
+            position = text.find(query)
+            while position != -1:
+                row = bisect_right(offsets, position) - 1
+                rows.add(row)
+                # Повторные вхождения в ту же строку не нужны
+                if row + 1 >= len(offsets):
+                    break
+                position = text.find(query, offsets[row + 1])
+
+        self._last_query, self._last_rows = query, rows
+        return rows
+
+
+class SearchProxyModel(QAbstractProxyModel):
+    """
+    Прокси-модель с сортировкой и поиском по SearchIndex.
+
+    Отображение строк хранится списком номеров строк исходной модели и
+    пересчитывается целиком, а не через filterAcceptsRow для каждой
+    строки, как в QSortFilterProxyModel: на десятках тысяч строк это
+    на порядок быстрее. Исходная модель - ObjectTableModel.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_index = SearchIndex()
+        self._query = ''
+        self._matches: Optional[Set[int]] = None
+        self._order: List[int] = []  # Все строки исходной модели в порядке сортировки
+        self._rows: List[int] = []  # Видимые строки
+        self._positions: dict = {}
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    def setSourceModel(self, source) -> None:
+        previous = self.sourceModel()
+        if previous is not None:
+            previous.modelReset.disconnect(self._on_source_reset)
+            previous.rowsInserted.disconnect(self._on_rows_inserted)
+        self.beginResetModel()
+        super().setSourceModel(source)
+        source.modelReset.connect(self._on_source_reset)
+        source.rowsInserted.connect(self._on_rows_inserted)
+        self._reindex()
+        self.endResetModel()
+
+    # Отображение строк
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if parent.isValid() or not (0 <= row < len(self._rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        return QModelIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        source = self.sourceModel()
+        return 0 if parent.isValid() or source is None else source.columnCount()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        position = self._positions.get(source_index.row())
+        if position is None:
+            return QModelIndex()
+        return self.index(position, source_index.column())
+
+    def _apply(self) -> None:
+        if self._matches is None:
+            self._rows = list(self._order)
+        else:
+            matches = self._matches
+            self._rows = [row for row in self._order if row in matches]
+        self._positions = {row: position for position, row in enumerate(self._rows)}
+
+    def _sorted(self, rows: List[int]) -> List[int]:
+        if self._sort_column < 0:
+            return sorted(rows)
+        source = self.sourceModel()
+        getter = source.columns[self._sort_column][1]
+        objects = source.objects
+
+        def key(row):
+            value = getter(objects[row])
+            return (0, normalize(value)) if isinstance(value, str) else (1, value) if value is not None else (2, 0)
+
+        return sorted(rows, key=key, reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+
+    # Индекс
+    def _reindex(self) -> None:
+        self.search_index.clear()
+        source = self.sourceModel()
+        self._add_rows(0, source.rowCount() - 1)
+        self._order = self._sorted(list(range(source.rowCount())))
+        self._matches = self.search_index.search(self._query)
+        self._apply()
+
+    def _add_rows(self, first: int, last: int) -> None:
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            obj = source.objects[row]
+            self.search_index.add(search_key(getter(obj) for _, getter in source.columns))
+
+    def _on_source_reset(self) -> None:
+        self.beginResetModel()
+        self._reindex()
+        self.endResetModel()
+
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int) -> None:
+        self._add_rows(first, last)
+        new_rows = [row for row in range(first, last + 1)
+                    if self._matches is None or self.search_index.matches(row, self._query)]
+        if self._matches is not None:
+            self._matches.update(new_rows)
+        if self._sort_column < 0 and first == len(self._order):
+            # Строки дописаны в конец без сортировки - обычная вставка
+            self._order.extend(range(first, last + 1))
+            if new_rows:
+                start = len(self._rows)
+                self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+                self._rows.extend(new_rows)
+                self._positions.update({row: start + i for i, row in enumerate(new_rows)})
+                self.endInsertRows()
+            return
+        self.beginResetModel()
+        self._order = self._sorted(self._order + list(range(first, last + 1)))
+        self._apply()
+        self.endResetModel()
+
+    # Поиск и сортировка
+    def set_query(self, text: str) -> None:
+        """Установка строки поиска"""
+        self.beginResetModel()
+        self._query = text
+        self._matches = self.search_index.search(text)
+        self._apply()
+        self.endResetModel()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        self.beginResetModel()
+        self._sort_column, self._sort_order = column, order
+        self._order = self._sorted(self._order)
+        self._apply()
+        self.endResetModel()
+
+
+def make_search_proxy_model(source, parent=None) -> SearchProxyModel:
+    """Прокси-модель для сортировки и индексированного поиска"""
+    proxy = SearchProxyModel(parent)
+    proxy.setSourceModel(source)
+    return proxy
@@ -0,0 +1,76 @@
+from typing import Callable, List, Sequence, Tuple
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+
+# Колонка таблицы: заголовок и функция получения значения из объекта
+Column = Tuple[str, Callable[[object], object]]
+
+# Роль с идентификатором объекта строки, не зависит от сортировки и фильтрации
+ID_ROLE = Qt.ItemDataRole.UserRole
+
+
+class ObjectTableModel(QAbstractTableModel):
+    """
+    Табличная модель поверх списка объектов ответа API.
+    Значения ячеек вычисляются только для видимых строк при отрисовке,
+    отдельные элементы на каждую ячейку не создаются.
+    """
+    def __init__(self, columns: Sequence[Column], parent=None,
+                 id_getter: Callable[[object], object] = lambda obj: obj.id):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.id_getter = id_getter
+        self.objects: List[object] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.objects)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self.columns[index.column()][1](self.objects[index.row()])
+            return "" if value is None else str(value)
+        if role == ID_ROLE:
+            return self.id_getter(self.objects[index.row()])
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def set_objects(self, objects: Sequence[object]) -> None:
+        """Замена всех строк"""
+        self.beginResetModel()
+        self.objects = list(objects)
+        self.endResetModel()
+
+    def append_objects(self, objects: Sequence[object]) -> None:
+        """Добавление строк в конец (например, очередной страницы)"""
+        if not objects:
+            return
+        start = len(self.objects)
+        self.beginInsertRows(QModelIndex(), start, start + len(objects) - 1)
+        self.objects.extend(objects)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.set_objects([])
+
+    def object_at(self, row: int) -> object:
+        return self.objects[row]
+
+
+def make_proxy_model(source: ObjectTableModel, parent=None) -> QSortFilterProxyModel:
+    """Прокси-модель для сортировки и фильтрации без копирования данных"""
+    proxy = QSortFilterProxyModel(parent)
+    proxy.setSourceModel(source)
+    proxy.setSortCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    proxy.setFilterKeyColumn(-1)  # Фильтр по всем колонкам
+    return proxy
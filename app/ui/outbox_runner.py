@@ -0,0 +1,104 @@
+import time
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from app.database.database import Database
+from app.outbox.content import CONTENT_JOBS
+from app.outbox.jobs import JobDefinition, JobEvent, process_outbox
+from app.ui.workers import Worker
+
+
+class OutboxRunner(QObject):
+    """
+    Фоновое выполнение очереди операций с курсами.
+
+    Страницы ставят задачи в очередь в базе и сообщают об этом через wake():
+    очередь выполняется в пуле потоков, пока в ней есть готовые задачи.
+    Отложенные после сбоя задачи запускаются таймером ко времени повтора,
+    задачи, прерванные закрытием приложения, - при следующем запуске.
+    """
+    # Повторный запуск после сбоя самой очереди (например, базы), мс
+    ERROR_RETRY_MS = 60 * 1000
+
+    job_started = pyqtSignal(int, str)  # id задачи, описание
+    job_progress = pyqtSignal(int, str, int, int)  # id задачи, описание, выполнено, всего
+    job_finished = pyqtSignal(int, str, object)  # id задачи, вид, результаты шагов
+    # id задачи, описание, ошибка, время повтора или None, отменены ли выполненные шаги
+    job_failed = pyqtSignal(int, str, str, object, bool)
+
+    def __init__(self, definitions: Optional[Dict[str, JobDefinition]] = None, parent=None):
+        super().__init__(parent)
+        self.definitions = definitions or CONTENT_JOBS
+        self._worker: Optional[Worker] = None
+        self._wake_pending = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.wake)
+
+    def start(self) -> None:
+        db = Database()
+        try:
+            db.reset_running_outbox_jobs()
+        finally:
+            db.close()
+        self.wake()
+
+    def stop(self) -> None:
+        """Остановка после текущей задачи (её состояние сохранено в базе)"""
+        self._timer.stop()
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def wake(self) -> None:
+        """Запуск выполнения очереди (если уже выполняется - ещё один проход после него)"""
+        if self._worker:
+            self._wake_pending = True
+            return
+        self._wake_pending = False
+        self._timer.stop()
+        self._worker = Worker(process_outbox, self.definitions)
+        self._worker.background = True
+        self._worker.signals.item.connect(self.on_event)
+        self._worker.signals.finished.connect(self.on_finished)
+        self._worker.signals.error.connect(self.on_error)
+        self._worker.start()
+
+    def _schedule_next(self) -> None:
+        """Таймер до ближайшего повтора отложенной задачи"""
+        db = Database()
+        try:
+            next_attempt = db.get_next_outbox_attempt()
+        finally:
+            db.close()
+        if next_attempt is not None:
+            self._timer.start(max(int(next_attempt - time.time()), 1) * 1000)
+
+    def on_event(self, event: JobEvent):
+        if not self._worker or self.sender() is not self._worker.signals:
+            return
+        if event.event == JobEvent.STARTED:
+            self.job_started.emit(event.job_id, event.description)
+        elif event.event == JobEvent.PROGRESS:
+            self.job_progress.emit(event.job_id, event.description, *event.progress)
+        elif event.event == JobEvent.FINISHED:
+            self.job_finished.emit(event.job_id, event.kind, event.results)
+        else:
+            self.job_failed.emit(event.job_id, event.description, event.error, event.retry_at, bool(event.compensated))
+
+    def on_finished(self, _):
+        if not self._worker or self.sender() is not self._worker.signals:
+            return
+        self._worker = None
+        if self._wake_pending:
+            self.wake()
+        else:
+            self._schedule_next()
+
+    def on_error(self, message: str):
+        if not self._worker or self.sender() is not self._worker.signals:
+            return
+        print(f"Ошибка выполнения очереди операций: {message}")
+        self._worker = None
+        self._timer.start(self.ERROR_RETRY_MS)
@@ -1,12 +1,94 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QFrame,
-                            QHBoxLayout, QLineEdit, QTableWidget, QTableWidgetItem,
+                            QHBoxLayout, QLineEdit, QTableView, QAbstractItemView,
                             QStackedWidget, QHeaderView, QGridLayout, QFileDialog,
-                            QMessageBox)
-from PyQt6.QtCore import Qt, pyqtSignal
+                            QMessageBox, QProgressDialog)
+from PyQt6.QtCore import Qt, pyqtSignal, QModelIndex, QTimer
 from app.api.gushub_api import GushubAPI
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
-import openpyxl.cell.cell
+from app.ui.workers import Worker
+from app.analytics.group_report import build_group_report
+from app.ui.models.table_models import ID_ROLE, ObjectTableModel, make_proxy_model
+from app.ui.models.search_index import make_search_proxy_model
+from app.analytics.tabular import Table, file_filters, write_table, writer_for
+from app.analytics.snapshots import history_since, record_snapshots
+from app.analytics.cache import AnalyticsCache, group_key, profile_key
+from app.analytics.cohort import COURSE_COLUMNS, CohortStats, load_group_cohort, load_groups_cohort
+from app.database.database import Database
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Задержка фильтрации после последнего нажатия клавиши, мс
+SEARCH_DEBOUNCE_MS = 200
+# Колонки экспорта статистики студента и группы
+STATS_COLUMNS = ["Раздел", "Показатель", "Значение"]
+
+
+def create_search_timer(parent, callback) -> QTimer:
+    """Таймер, откладывающий поиск до паузы в наборе текста"""
+    timer = QTimer(parent)
+    timer.setSingleShot(True)
+    timer.setInterval(SEARCH_DEBOUNCE_MS)
+    timer.timeout.connect(callback)
+    return timer
+
+def ask_export_path(parent, caption: str = "Сохранить файл") -> Tuple[str, str]:
+    """Выбор файла экспорта в любом доступном формате; расширение дописывается по фильтру"""
+    file_path, file_filter = QFileDialog.getSaveFileName(parent, caption, "", file_filters())
+    if file_path:
+        extension = writer_for(file_path, file_filter).extension
+        if not file_path.lower().endswith(extension):
+            file_path += extension
+    return file_path, file_filter
+
+def create_offline_label() -> QLabel:
+    """Надпись о показе сохранённых данных (скрыта, пока Gushub доступен)"""
+    label = QLabel()
+    label.setStyleSheet("color: #b36b00; font-style: italic;")
+    label.hide()
+    return label
+
+def show_offline_state(label: QLabel, stale_since: Optional[int]):
+    """Показ времени сохранённых данных, если они отданы вместо недоступного сервиса"""
+    if stale_since is None:
+        label.hide()
+        return
+    fetched_at = datetime.fromtimestamp(stale_since).strftime('%d.%m.%Y %H:%M')
+    label.setText(f"Нет связи с gushub.ru: показаны сохранённые данные от {fetched_at}")
+    label.show()
+
+def format_cohort(cohort: CohortStats, at_risk_shown: int) -> str:
+    """Показатели группы студентов в виде HTML для карточки"""
+    def localize(value):
+        return value if value not in (None, '', 'None') else 'Не задано'
+
+    if not cohort.students:
+        return "Нет данных о прогрессе участников"
+    summary = "".join(f"<tr><td><b>{label}:</b></td><td>{localize(value)}</td></tr>"
+                      for label, value in cohort.summary_rows())
+    courses = "".join("<tr>" + "".join(f"<td>{localize(value)}</td>" for value in row) + "</tr>"
+                      for row in cohort.course_rows())
+    at_risk = ", ".join(f"{localize(user.username)} ({reason})" for user, reason in cohort.at_risk[:at_risk_shown])
+    if len(cohort.at_risk) > at_risk_shown:
+        at_risk += f" и ещё {len(cohort.at_risk) - at_risk_shown}"
+    header = "".join(f"<th align='left'>{column}</th>" for column in COURSE_COLUMNS)
+    return f"""
+        <table style='margin-top:0;'>{summary}</table>
+        <p><b>Прогресс по курсам</b></p>
+        <table style='margin-top:0;' cellspacing='6'><tr>{header}</tr>{courses}</table>
+        <p><b>Группа риска:</b> {at_risk or 'нет'}</p>
+        """
+
+def create_table_view(model) -> QTableView:
+    """Таблица со стандартными для аналитики настройками"""
+    table = QTableView()
+    table.setModel(model)
+    table.setSortingEnabled(True)
+    table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)  # Исходный порядок до клика по заголовку
+    table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    table.verticalHeader().setVisible(False)  # Скрываем боковую нумерацию
+    table.horizontalHeader().setStretchLastSection(True)  # Растягиваем последнюю колонку
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)  # Растягиваем все колонки
+    return table
 
 class StudentsListWidget(QWidget):
     """Виджет для отображения списка студентов"""
@@ -16,6 +98,7 @@ class StudentsListWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.gushub_api = GushubAPI()
+        self._worker = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -25,19 +108,21 @@ class StudentsListWidget(QWidget):
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Поиск студента...")
-        self.search_input.textChanged.connect(self.filter_students)
+        self.search_timer = create_search_timer(self, lambda: self.filter_students(self.search_input.text()))
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
+        self.offline_label = create_offline_label()
+        layout.addWidget(self.offline_label)
         
         # Добавляем таблицу студентов
-        self.table = QTableWidget()
-        self.table.setColumnCount(2)
-        self.table.setHorizontalHeaderLabels(["Имя пользователя", "Полное имя"])
-        self.table.verticalHeader().setVisible(False)  # Скрываем боковую нумерацию
-        self.table.horizontalHeader().setStretchLastSection(True)  # Растягиваем последнюю колонку
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)  # Растягиваем первую колонку
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Растягиваем вторую колонку
-        self.table.cellClicked.connect(self.on_student_selected)
+        self.model = ObjectTableModel([
+            ("Имя пользователя", lambda user: user.username),
+            ("Полное имя", lambda user: f"{user.firstName} {user.lastName}".strip() or user.username),
+        ], self)
+        self.proxy = make_search_proxy_model(self.model, self)
+        self.table = create_table_view(self.proxy)
+        self.table.clicked.connect(self.on_student_selected)
         layout.addWidget(self.table)
         
         # Добавляем кнопку возврата
@@ -46,44 +131,47 @@ class StudentsListWidget(QWidget):
         layout.addWidget(back_button)
     
     def load_data(self):
-        """Загрузка данных о студентах"""
-        try:
-            users = self.gushub_api.get_users()
-            self.table.setRowCount(len(users))
-            for i, user in enumerate(users):
-                self.table.setItem(i, 0, QTableWidgetItem(user.username))
-                self.table.setItem(i, 1, QTableWidgetItem(f"{user.firstName} {user.lastName}".strip() or user.username))
-        except Exception as e:
-            pass
+        """Загрузка данных о студентах (таблица заполняется по мере получения страниц)"""
+        if self._worker:
+            self._worker.cancel()
+        self.model.clear()
+        self.gushub_api.take_stale_since()
+        self._worker = Worker(self.gushub_api.iter_user_pages)
+        self._worker.signals.item.connect(self.append_users)
+        self._worker.signals.finished.connect(self.on_loaded)
+        self._worker.start()
+    
+    def append_users(self, users: list):
+        """Добавление очередной страницы студентов в таблицу"""
+        if self.sender() is not self._worker.signals:
+            return
+        self.model.append_objects(users)
+
+    def on_loaded(self, _):
+        if self.sender() is not self._worker.signals:
+            return
+        show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
     
     def filter_students(self, text: str):
         """Фильтрация таблицы студентов"""
-        for row in range(self.table.rowCount()):
-            show_row = False
-            for col in range(self.table.columnCount()):
-                item = self.table.item(row, col)
-                if item and text.lower() in item.text().lower():
-                    show_row = True
-                    break
-            self.table.setRowHidden(row, not show_row)
+        self.proxy.set_query(text)
     
-    def on_student_selected(self, row: int, column: int):
+    def on_student_selected(self, index: QModelIndex):
         """Обработка выбора студента"""
-        try:
-            users = self.gushub_api.get_users()
-            student_id = users[row].id
-            self.student_selected.emit(student_id)
-        except Exception as e:
-            pass
+        self.student_selected.emit(index.data(ID_ROLE))
 
 class GroupsListWidget(QWidget):
     """Виджет для отображения списка групп"""
     group_selected = pyqtSignal(int)  # Сигнал с ID выбранной группы
     back_clicked = pyqtSignal()  # Сигнал для возврата к выбору раздела
+    # Сколько студентов группы риска перечислять в сводке
+    AT_RISK_SHOWN = 20
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.gushub_api = GushubAPI()
+        self._worker = None
+        self._cohort_worker = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -93,20 +181,31 @@ class GroupsListWidget(QWidget):
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Поиск группы...")
-        self.search_input.textChanged.connect(self.filter_groups)
+        self.search_timer = create_search_timer(self, lambda: self.filter_groups(self.search_input.text()))
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
+        self.offline_label = create_offline_label()
+        layout.addWidget(self.offline_label)
         
         # Добавляем таблицу групп
-        self.table = QTableWidget()
-        self.table.setColumnCount(2)
-        self.table.setHorizontalHeaderLabels(["Название", "Описание"])
-        self.table.verticalHeader().setVisible(False)  # Скрываем боковую нумерацию
-        self.table.horizontalHeader().setStretchLastSection(True)  # Растягиваем последнюю колонку
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)  # Растягиваем первую колонку
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Растягиваем вторую колонку
-        self.table.cellClicked.connect(self.on_group_selected)
+        self.model = ObjectTableModel([
+            ("Название", lambda group: group.name),
+            ("Описание", lambda group: group.description),
+        ], self)
+        self.proxy = make_search_proxy_model(self.model, self)
+        self.table = create_table_view(self.proxy)
+        self.table.clicked.connect(self.on_group_selected)
         layout.addWidget(self.table)
+
+        # Показатели по участникам всех групп: распределения по курсам для всех студентов
+        self.cohort_label = QLabel()
+        self.cohort_label.setWordWrap(True)
+        self.cohort_label.hide()
+        layout.addWidget(self.cohort_label)
+        self.cohort_button = QPushButton("Показатели всех групп")
+        self.cohort_button.clicked.connect(self.load_cohort)
+        layout.addWidget(self.cohort_button)
         
         # Добавляем кнопку возврата
         back_button = QPushButton("← Вернуться к выбору раздела")
@@ -114,41 +213,76 @@ class GroupsListWidget(QWidget):
         layout.addWidget(back_button)
     
     def load_data(self):
-        """Загрузка данных о группах"""
-        try:
-            groups = self.gushub_api.get_groups()
-            self.table.setRowCount(len(groups))
-            for i, group in enumerate(groups):
-                self.table.setItem(i, 0, QTableWidgetItem(group.name))
-                self.table.setItem(i, 1, QTableWidgetItem(group.description))
-        except Exception as e:
-            pass
+        """Загрузка данных о группах (таблица заполняется по мере получения страниц)"""
+        if self._worker:
+            self._worker.cancel()
+        self.model.clear()
+        self.gushub_api.take_stale_since()
+        self._worker = Worker(self.gushub_api.iter_group_pages)
+        self._worker.signals.item.connect(self.append_groups)
+        self._worker.signals.finished.connect(self.on_loaded)
+        self._worker.start()
+    
+    def append_groups(self, groups: list):
+        """Добавление очередной страницы групп в таблицу"""
+        if self.sender() is not self._worker.signals:
+            return
+        self.model.append_objects(groups)
+
+    def on_loaded(self, _):
+        if self.sender() is not self._worker.signals:
+            return
+        show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
     
     def filter_groups(self, text: str):
         """Фильтрация таблицы групп"""
-        for row in range(self.table.rowCount()):
-            show_row = False
-            for col in range(self.table.columnCount()):
-                item = self.table.item(row, col)
-                if item and text.lower() in item.text().lower():
-                    show_row = True
-                    break
-            self.table.setRowHidden(row, not show_row)
+        self.proxy.set_query(text)
+
+    def load_cohort(self):
+        """Расчёт показателей по студентам всех групп (профили из кеша или загрузка в фоне)"""
+        if self._cohort_worker:
+            self._cohort_worker.cancel()
+        self.cohort_button.setEnabled(False)
+        self.cohort_label.setText("Загрузка статистики участников...")
+        self.cohort_label.show()
+        self._cohort_worker = Worker(load_groups_cohort, self.gushub_api)
+        self._cohort_worker.signals.item.connect(self.on_cohort_item)
+        self._cohort_worker.signals.error.connect(self.on_cohort_error)
+        self._cohort_worker.start()
+
+    def on_cohort_item(self, item):
+        if not self._cohort_worker or self.sender() is not self._cohort_worker.signals:
+            return
+        if isinstance(item, CohortStats):
+            self.cohort_button.setEnabled(True)
+            self.cohort_label.setText(format_cohort(item, self.AT_RISK_SHOWN))
+            show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
+        else:
+            done, total = item
+            self.cohort_label.setText(f"Загрузка статистики участников: {done} из {total}")
+
+    def on_cohort_error(self, message: str):
+        if not self._cohort_worker or self.sender() is not self._cohort_worker.signals:
+            return
+        self.cohort_button.setEnabled(True)
+        self.cohort_label.setText(f"Ошибка при расчёте показателей: {message}")
     
-    def on_group_selected(self, row: int, column: int):
+    def on_group_selected(self, index: QModelIndex):
         """Обработка выбора группы"""
-        try:
-            groups = self.gushub_api.get_groups()
-            group_id = groups[row].id
-            self.group_selected.emit(group_id)
-        except Exception as e:
-            pass
+        self.group_selected.emit(index.data(ID_ROLE))
 
 class StudentStatsWidget(QWidget):
     """Виджет для отображения статистики студента"""
+    # Сколько последних снимков показывать в истории
+    HISTORY_ROWS = 10
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.gushub_api = GushubAPI()
+        self.db = Database()
+        self.cache = AnalyticsCache.shared()
+        self.student_id = None
+        self._revalidate_worker = None
         self.setup_ui()
 
     def localize(self, value):
@@ -164,6 +298,8 @@ class StudentStatsWidget(QWidget):
         header_layout.addWidget(self.title)
         header_layout.addWidget(self.back_button)
         layout.addLayout(header_layout)
+        self.offline_label = create_offline_label()
+        layout.addWidget(self.offline_label)
         
         # Создаем сетку для карточек
         grid_layout = QGridLayout()
@@ -224,171 +360,126 @@ class StudentStatsWidget(QWidget):
         grades_layout.addWidget(self.grades_label)
         grades_layout.addStretch(0)
         grid_layout.addWidget(grades_frame, 1, 1)
+
+        # Карточка истории (снимки статистики за семестр)
+        history_frame = QFrame()
+        history_frame.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
+        history_layout = QVBoxLayout(history_frame)
+        history_title = QLabel("<h3>История за семестр</h3>")
+        history_title.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        history_layout.addWidget(history_title)
+        self.history_label = QLabel()
+        self.history_label.setAlignment(Qt.AlignmentFlag.AlignTop)
+        history_layout.addWidget(self.history_label)
+        history_layout.addStretch(0)
+        grid_layout.addWidget(history_frame, 2, 0, 1, 2)
         
         layout.addLayout(grid_layout)
 
         # Кнопка экспорта
         export_layout = QHBoxLayout()
-        self.export_button = QPushButton("Экспортировать в Excel")
-        self.export_button.clicked.connect(self.export_to_excel)
+        self.export_button = QPushButton("Экспортировать")
+        self.export_button.clicked.connect(self.export_stats)
         export_layout.addWidget(self.export_button)
         layout.addLayout(export_layout)
 
-    def export_to_excel(self):
+    def export_stats(self):
         try:
-            # Получаем данные студента
-            user = self.gushub_api.get_user(self.student_id)
+            # Получаем данные студента (запросы выполняются параллельно)
+            profile = self.gushub_api.get_student_profile(self.student_id)
+            user = profile.user
             if not user:
                 raise Exception("Не удалось получить данные пользователя")
 
-            stats = self.gushub_api.get_user_statistics(self.student_id)
+            stats = profile.statistics
             if not stats:
                 raise Exception("Не удалось получить статистику пользователя")
 
-            grades_stats = self.gushub_api.get_user_grades_statistics(self.student_id)
+            grades_stats = profile.grades
             if not grades_stats:
                 raise Exception("Не удалось получить статистику оценок")
 
-            # Создаем новый Excel-файл
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Статистика студента"
-
-            # Определяем стиль обводки
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-            try:
-                # Заголовок
-                ws['A1'] = f"Статистика студента: {self.localize(user.username)}"
-                ws['A1'].font = Font(bold=True, size=14)
-                ws.merge_cells('A1:B1')
-                ws['A1'].border = thin_border
-                ws['B1'].border = thin_border
-
-                # Основная информация
-                ws['A3'] = "Основная информация"
-                ws['A3'].font = Font(bold=True)
-                ws['A3'].border = thin_border
-                ws['B3'].border = thin_border
-                ws['A4'] = "Имя:"
-                ws['B4'] = self.localize(user.firstName)
-                ws['A5'] = "Email:"
-                ws['B5'] = self.localize(user.email)
-                ws['A6'] = "Роль:"
-                ws['B6'] = self.localize(user.role)
-                ws['A7'] = "Дата регистрации:"
-                ws['B7'] = user.createdAt.strftime('%d.%m.%Y %H:%M') if user.createdAt else 'Не задано'
-
-                # Статистика по курсам
-                ws['A9'] = "Статистика по курсам"
-                ws['A9'].font = Font(bold=True)
-                ws['A9'].border = thin_border
-                ws['B9'].border = thin_border
-                ws['A10'] = "Всего курсов:"
-                ws['B10'] = self.localize(stats.totalCourses)
-                ws['A11'] = "Завершено курсов:"
-                ws['B11'] = self.localize(stats.completedCourses)
-                ws['A12'] = "В процессе:"
-                ws['B12'] = self.localize(stats.totalCourses - stats.completedCourses if stats.totalCourses is not None and stats.completedCourses is not None else None)
-                ws['A13'] = "Общее время обучения:"
-                ws['B13'] = f"{self.localize(stats.totalTimeSpent)} минут"
-
-                # Статистика по заданиям
-                ws['A15'] = "Статистика по заданиям"
-                ws['A15'].font = Font(bold=True)
-                ws['A15'].border = thin_border
-                ws['B15'].border = thin_border
-                ws['A16'] = "Всего заданий:"
-                ws['B16'] = self.localize(stats.totalTasks)
-                ws['A17'] = "Выполнено заданий:"
-                ws['B17'] = self.localize(stats.completedTasks)
-                ws['A18'] = "В процессе:"
-                ws['B18'] = self.localize(stats.totalTasks - stats.completedTasks if stats.totalTasks is not None and stats.completedTasks is not None else None)
-                ws['A19'] = "Процент выполнения:"
-                ws['B19'] = f"{(stats.completedTasks / stats.totalTasks * 100) if stats.totalTasks else 0:.1f}%"
-
-                # Статистика по оценкам
-                ws['A21'] = "Статистика по оценкам"
-                ws['A21'].font = Font(bold=True)
-                ws['A21'].border = thin_border
-                ws['B21'].border = thin_border
-                ws['A22'] = "Средний балл:"
-                ws['B22'] = self.localize(f'{grades_stats.averageGrade:.1f}' if grades_stats.averageGrade is not None else None)
-                ws['A23'] = "Всего оценок:"
-                ws['B23'] = self.localize(grades_stats.totalGrades)
-                ws['A24'] = "Распределение оценок:"
-                ws['A24'].font = Font(bold=True)
-                ws['A24'].border = thin_border
-                ws['B24'].border = thin_border
-                ws['A25'] = "2:"
-                ws['B25'] = self.localize(grades_stats.gradesByValue.get('2'))
-                ws['A26'] = "3:"
-                ws['B26'] = self.localize(grades_stats.gradesByValue.get('3'))
-                ws['A27'] = "4:"
-                ws['B27'] = self.localize(grades_stats.gradesByValue.get('4'))
-                ws['A28'] = "5:"
-                ws['B28'] = self.localize(grades_stats.gradesByValue.get('5'))
-
-                # Добавляем обводку для всех ячеек с данными
-                for row in range(4, 29):
-                    if row not in [8, 14, 20]:
-                        for col in ['A', 'B']:
-                            cell = ws[f'{col}{row}']
-                            cell.border = thin_border
-
-                # Выравнивание
-                for row in ws.iter_rows():
-                    for cell in row:
-                        cell.alignment = Alignment(horizontal='left', vertical='center')
-
-                # Автоматическая настройка ширины столбцов
-                for column in ws.columns:
-                    max_length = 0
-                    column_letter = None
-                    for cell in column:
-                        try:
-                            if not isinstance(cell, openpyxl.cell.cell.MergedCell):
-                                if column_letter is None:
-                                    column_letter = cell.column_letter
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                        except:
-                            pass
-                    if column_letter:
-                        adjusted_width = (max_length + 2)
-                        ws.column_dimensions[column_letter].width = adjusted_width
-
-                # Объединяем ячейки для заголовков разделов
-                ws.merge_cells('A1:B1')  # Заголовок
-                ws.merge_cells('A3:B3')  # Основная информация
-                ws.merge_cells('A9:B9')  # Статистика по курсам
-                ws.merge_cells('A15:B15')  # Статистика по заданиям
-                ws.merge_cells('A21:B21')  # Статистика по оценкам
-                ws.merge_cells('A24:B24')  # Распределение оценок
-
-                # Сохраняем файл
-                file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить файл", "", "Excel Files (*.xlsx)")
-                if file_path:
-                    wb.save(file_path)
-                    QMessageBox.information(self, "Успех", "Статистика успешно экспортирована в Excel!")
-
-            except Exception as e:
-                raise
+            # Формируем отчёт: раздел, показатель, значение
+            rows = [
+                ("Основная информация", "Логин", self.localize(user.username)),
+                ("Основная информация", "Имя", self.localize(user.firstName)),
+                ("Основная информация", "Email", self.localize(user.email)),
+                ("Основная информация", "Роль", self.localize(user.role)),
+                ("Основная информация", "Дата регистрации", user.createdAt.strftime('%d.%m.%Y %H:%M') if user.createdAt else 'Не задано'),
+                ("Статистика по курсам", "Всего курсов", self.localize(stats.totalCourses)),
+                ("Статистика по курсам", "Завершено курсов", self.localize(stats.completedCourses)),
+                ("Статистика по курсам", "В процессе", self.localize(stats.totalCourses - stats.completedCourses if stats.totalCourses is not None and stats.completedCourses is not None else None)),
+                ("Статистика по курсам", "Общее время обучения, минут", self.localize(stats.totalTimeSpent)),
+                ("Статистика по заданиям", "Всего заданий", self.localize(stats.totalTasks)),
+                ("Статистика по заданиям", "Выполнено заданий", self.localize(stats.completedTasks)),
+                ("Статистика по заданиям", "В процессе", self.localize(stats.totalTasks - stats.completedTasks if stats.totalTasks is not None and stats.completedTasks is not None else None)),
+                ("Статистика по заданиям", "Процент выполнения", f"{(stats.completedTasks / stats.totalTasks * 100) if stats.totalTasks else 0:.1f}%"),
+                ("Статистика по оценкам", "Средний балл", self.localize(f'{grades_stats.averageGrade:.1f}' if grades_stats.averageGrade is not None else None)),
+                ("Статистика по оценкам", "Всего оценок", self.localize(grades_stats.totalGrades)),
+            ]
+            for value in ('2', '3', '4', '5'):
+                rows.append(("Распределение оценок", value, self.localize(grades_stats.gradesByValue.get(value))))
+            table = Table(STATS_COLUMNS, rows, "Статистика студента")
+
+            # Сохраняем файл в выбранном формате
+            file_path, file_filter = ask_export_path(self)
+            if file_path:
+                write_table(table, file_path, file_filter)
+                QMessageBox.information(self, "Успех", "Статистика успешно экспортирована!")
 
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при экспорте в Excel:\n{str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при экспорте:\n{str(e)}")
 
     def load_data(self, student_id: int):
+        """Показ статистики: сразу из кеша (с фоновой проверкой) или с загрузкой"""
         self.student_id = student_id  # Сохраняем ID студента для экспорта
+        cached = self.cache.get(profile_key(student_id))
+        if cached is not None:
+            self.show_profile(student_id, cached)
+            self.revalidate(student_id)
+            return
+        self.gushub_api.take_stale_since()
+        try:
+            profile = self.gushub_api.get_student_profile(student_id)
+        except Exception as e:
+            self.show_error()
+            return
+        self.store_profile(student_id, profile)
+        self.show_profile(student_id, profile)
+        show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
+
+    def revalidate(self, student_id: int):
+        """Фоновая загрузка свежей статистики вместо показанной из кеша"""
+        self._revalidate_worker = Worker(self.gushub_api.get_student_profile, student_id)
+        self._revalidate_worker.signals.finished.connect(lambda profile: self.on_revalidated(student_id, profile))
+        self._revalidate_worker.start()
+
+    def on_revalidated(self, student_id: int, profile):
+        self.store_profile(student_id, profile)
+        if student_id == self.student_id:
+            self.show_profile(student_id, profile)
+            show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
+
+    def store_profile(self, student_id: int, profile):
+        """Кеширование профиля и снимок в историю (только если показатели изменились)"""
+        self.cache.put(profile_key(student_id), profile)
         try:
-            user = self.gushub_api.get_user(student_id)
-            stats = self.gushub_api.get_user_statistics(student_id)
-            grades_stats = self.gushub_api.get_user_grades_statistics(student_id)
+            record_snapshots([(student_id, profile)], self.db)
+        except Exception as e:
+            print(f"Ошибка при сохранении снимка статистики: {str(e)}")
+
+    def show_error(self):
+        self.info_label.setText("Ошибка при загрузке данных")
+        self.courses_label.setText("")
+        self.tasks_label.setText("")
+        self.grades_label.setText("")
+        self.history_label.setText("")
+
+    def show_profile(self, student_id: int, profile):
+        try:
+            user = profile.user
+            stats = profile.statistics
+            grades_stats = profile.grades
             self.title.setText(f"<h2>Статистика студента: {self.localize(user.username)}</h2>")
 
             # Основная информация
@@ -439,19 +530,53 @@ class StudentStatsWidget(QWidget):
             """
             self.grades_label.setText(grades_text)
 
+            # История
+            self.show_history(student_id)
+
         except Exception as e:
-            self.info_label.setText("Ошибка при загрузке данных")
-            self.courses_label.setText("")
-            self.tasks_label.setText("")
-            self.grades_label.setText("")
+            self.show_error()
+
+    def show_history(self, student_id: int):
+        """Последние снимки статистики студента за семестр"""
+        snapshots = self.db.get_student_snapshots(student_id, since=history_since())
+        if len(snapshots) < 2:
+            self.history_label.setText("Недостаточно данных: история появится после следующих обновлений статистики")
+            return
+
+        rows = []
+        for snapshot in snapshots[-self.HISTORY_ROWS:]:
+            taken_at = datetime.fromtimestamp(snapshot['taken_at']).strftime('%d.%m.%Y %H:%M')
+            total_tasks = snapshot['total_tasks']
+            percent = f"{snapshot['completed_tasks'] / total_tasks * 100:.1f}%" if total_tasks else '—'
+            average = f"{snapshot['average_grade']:.1f}" if snapshot['average_grade'] is not None else '—'
+            rows.append(f"""
+                <tr><td>{taken_at}</td><td>{self.localize(snapshot['completed_tasks'])} из {self.localize(total_tasks)}</td>
+                <td>{percent}</td><td>{average}</td><td>{self.localize(snapshot['total_time_spent'])} мин</td></tr>""")
+
+        first, last = snapshots[0], snapshots[-1]
+        delta = (last['completed_tasks'] or 0) - (first['completed_tasks'] or 0)
+        self.history_label.setText(f"""
+            <table style='margin-top:0;' cellspacing='6'>
+                <tr><th align='left'>Дата</th><th align='left'>Выполнено заданий</th><th align='left'>Процент</th>
+                <th align='left'>Средний балл</th><th align='left'>Время</th></tr>
+                {''.join(rows)}
+            </table>
+            <p>За период: {delta:+d} заданий, снимков: {len(snapshots)}</p>
+            """)
 
 class GroupStatsWidget(QWidget):
     """Виджет для отображения статистики группы"""
     student_selected = pyqtSignal(int)  # Сигнал с ID выбранного студента
+    # Сколько студентов группы риска перечислять в карточке
+    AT_RISK_SHOWN = 10
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.gushub_api = GushubAPI()
+        self.cache = AnalyticsCache.shared()
+        self.group_id = None
+        self._revalidate_worker = None
+        self._cohort_worker = None
         self.setup_ui()
 
     def localize(self, value):
@@ -467,6 +592,8 @@ class GroupStatsWidget(QWidget):
         header_layout.addWidget(self.title)
         header_layout.addWidget(self.back_button)
         layout.addLayout(header_layout)
+        self.offline_label = create_offline_label()
+        layout.addWidget(self.offline_label)
 
         # Сетка для карточек
         grid_layout = QGridLayout()
@@ -494,15 +621,19 @@ class GroupStatsWidget(QWidget):
         members_title = QLabel("<h3>Участники</h3>")
         members_title.setAlignment(Qt.AlignmentFlag.AlignHCenter)
         members_layout.addWidget(members_title)
-        self.members_table = QTableWidget()
-        self.members_table.setColumnCount(2)
-        self.members_table.setHorizontalHeaderLabels(["Имя", "Логин"])
-        self.members_table.verticalHeader().setVisible(False)
-        self.members_table.horizontalHeader().setStretchLastSection(True)
-        self.members_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.members_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.members_table.cellClicked.connect(self.on_member_selected)
+        self.members_model = ObjectTableModel([
+            ("Имя", lambda member: f"{self.localize(member.user.firstName)}".strip()),
+            ("Логин", lambda member: self.localize(member.user.username)),
+        ], self, id_getter=lambda member: member.user.id)
+        self.members_proxy = make_proxy_model(self.members_model, self)
+        self.members_table = create_table_view(self.members_proxy)
+        self.members_table.clicked.connect(self.on_member_selected)
         members_layout.addWidget(self.members_table)
+        self.no_members_label = QLabel("Нет участников")
+        self.no_members_label.setAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
+        self.no_members_label.setStyleSheet("color: #888; font-style: italic;")
+        self.no_members_label.hide()
+        members_layout.addWidget(self.no_members_label)
         members_layout.addStretch(0)
         grid_layout.addWidget(members_frame, 0, 1)
 
@@ -520,159 +651,197 @@ class GroupStatsWidget(QWidget):
         courses_layout.addStretch(0)
         grid_layout.addWidget(courses_frame, 1, 0, 1, 2)
 
+        # Карточка показателей группы (распределения по всем участникам)
+        cohort_frame = QFrame()
+        cohort_frame.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
+        cohort_layout = QVBoxLayout(cohort_frame)
+        cohort_title = QLabel("<h3>Показатели группы</h3>")
+        cohort_title.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        cohort_layout.addWidget(cohort_title)
+        self.cohort_label = QLabel()
+        self.cohort_label.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.cohort_label.setWordWrap(True)
+        cohort_layout.addWidget(self.cohort_label)
+        self.cohort_button = QPushButton("Рассчитать")
+        self.cohort_button.clicked.connect(self.load_cohort)
+        cohort_layout.addWidget(self.cohort_button)
+        grid_layout.addWidget(cohort_frame, 2, 0, 1, 2)
+
         layout.addLayout(grid_layout)
 
         # Кнопка экспорта
         export_layout = QHBoxLayout()
-        self.export_button = QPushButton("Экспортировать в Excel")
-        self.export_button.clicked.connect(self.export_to_excel)
+        self.export_button = QPushButton("Экспортировать")
+        self.export_button.clicked.connect(self.export_stats)
         export_layout.addWidget(self.export_button)
+        self.report_button = QPushButton("Отчёт по всем участникам")
+        self.report_button.clicked.connect(self.export_group_report)
+        export_layout.addWidget(self.report_button)
         layout.addLayout(export_layout)
 
-    def export_to_excel(self):
+        self._report_worker = None
+        self._report_progress = None
+
+    def export_group_report(self):
+        """Отчёт со статистикой всех участников группы (загрузка в фоне)"""
+        file_path, _ = ask_export_path(self, "Сохранить отчёт")
+        if not file_path:
+            return
+
+        self._report_progress = QProgressDialog("Загрузка статистики участников...", "Отмена", 0, 0, self)
+        self._report_progress.setWindowTitle("Отчёт по группе")
+        self._report_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self._report_progress.setMinimumDuration(0)
+        self._report_progress.setAutoClose(False)  # Закрываем сами после сохранения файла
+        self._report_progress.setAutoReset(False)
+
+        self._report_worker = Worker(build_group_report, self.gushub_api, self.group_id, file_path)
+        self._report_worker.signals.item.connect(self.on_report_progress)
+        self._report_worker.signals.finished.connect(self.on_report_finished)
+        self._report_worker.signals.error.connect(self.on_report_error)
+        self._report_progress.canceled.connect(self.cancel_group_report)
+        self.report_button.setEnabled(False)
+        self._report_worker.start()
+
+    def on_report_progress(self, progress: tuple):
+        if self.sender() is not self._report_worker.signals or not self._report_progress:
+            return
+        done, total = progress
+        if done == total:
+            self._report_progress.setLabelText("Сохранение отчёта...")
+        else:
+            self._report_progress.setLabelText(f"Загружено профилей: {done} из {total}")
+        self._report_progress.setMaximum(total)
+        self._report_progress.setValue(done)
+
+    def _close_report_progress(self):
+        self.report_button.setEnabled(True)
+        if self._report_progress:
+            self._report_progress.canceled.disconnect()
+            self._report_progress.close()
+            self._report_progress = None
+
+    def cancel_group_report(self):
+        """Отмена: незапущенные запросы отменяются, файл не сохраняется"""
+        self._report_worker.cancel()
+        self._close_report_progress()
+
+    def on_report_finished(self, _):
+        self._close_report_progress()
+        QMessageBox.information(self, "Успех", "Отчёт по группе успешно сохранён!")
+
+    def on_report_error(self, message: str):
+        self._close_report_progress()
+        QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при формировании отчёта:\n{message}")
+
+    def export_stats(self):
         try:
             # Получаем данные группы
             group = self.gushub_api.get_group(self.group_id)
             if not group:
                 raise Exception("Не удалось получить данные группы")
 
-            # Создаем новый Excel-файл
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Статистика группы"
-
-            # Определяем стиль обводки
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-            try:
-                # Заголовок
-                ws['A1'] = f"Статистика группы: {self.localize(group.name)}"
-                ws['A1'].font = Font(bold=True, size=14)
-                ws.merge_cells('A1:B1')
-                ws['A1'].border = thin_border
-                ws['B1'].border = thin_border
-
-                # Основная информация
-                ws['A3'] = "Основная информация"
-                ws['A3'].font = Font(bold=True)
-                ws['A3'].border = thin_border
-                ws['B3'].border = thin_border
-                ws['A4'] = "Название:"
-                ws['B4'] = self.localize(group.name)
-                ws['A4'].border = thin_border
-                ws['B4'].border = thin_border
-                ws['A5'] = "Описание:"
-                ws['B5'] = self.localize(group.description)
-                ws['A5'].border = thin_border
-                ws['B5'].border = thin_border
-                ws['A6'] = "Код приглашения:"
-                ws['B6'] = self.localize(group.inviteCode)
-                ws['A6'].border = thin_border
-                ws['B6'].border = thin_border
-                ws['A7'] = "Дата создания:"
-                ws['B7'] = group.createdAt.strftime('%d.%m.%Y %H:%M') if group.createdAt else 'Не задано'
-                ws['A7'].border = thin_border
-                ws['B7'].border = thin_border
-                ws['A8'] = "Дата обновления:"
-                ws['B8'] = group.updatedAt.strftime('%d.%m.%Y %H:%M') if group.updatedAt else 'Не задано'
-                ws['A8'].border = thin_border
-                ws['B8'].border = thin_border
-                ws['A9'] = "Количество участников:"
-                ws['B9'] = len(group.members)
-                ws['A9'].border = thin_border
-                ws['B9'].border = thin_border
-                ws['A10'] = "Количество курсов:"
-                ws['B10'] = len(group.courses)
-                ws['A10'].border = thin_border
-                ws['B10'].border = thin_border
-
-                # Участники
-                ws['A12'] = "Участники группы"
-                ws['A12'].font = Font(bold=True)
-                ws['A12'].border = thin_border
-                ws['B12'].border = thin_border
-                ws['A13'] = "Имя"
-                ws['B13'] = "Логин"
-                ws['A13'].font = Font(bold=True)
-                ws['B13'].font = Font(bold=True)
-                ws['A13'].border = thin_border
-                ws['B13'].border = thin_border
-
-                # Заполняем данные участников
-                for i, member in enumerate(group.members, start=14):
-                    user = member.user
-                    ws[f'A{i}'] = self.localize(user.firstName)
-                    ws[f'B{i}'] = self.localize(user.username)
-                    ws[f'A{i}'].border = thin_border
-                    ws[f'B{i}'].border = thin_border
-
-                # Курсы
-                start_row = len(group.members) + 16  # Пропускаем строку после участников
-                ws[f'A{start_row}'] = "Курсы группы"
-                ws[f'A{start_row}'].font = Font(bold=True)
-                ws[f'A{start_row}'].border = thin_border
-                ws[f'B{start_row}'].border = thin_border
-                ws[f'A{start_row+1}'] = "Название курса"
-                ws[f'A{start_row+1}'].font = Font(bold=True)
-                ws[f'A{start_row+1}'].border = thin_border
-                ws[f'B{start_row+1}'].border = thin_border
-
-                # Заполняем данные курсов
-                for i, course in enumerate(group.courses, start=start_row+2):
-                    title = course['title'] if isinstance(course, dict) and 'title' in course else str(course)
-                    ws[f'A{i}'] = self.localize(title)
-                    ws[f'A{i}'].border = thin_border
-                    ws[f'B{i}'].border = thin_border
-
-                # Выравнивание
-                for row in ws.iter_rows():
-                    for cell in row:
-                        cell.alignment = Alignment(horizontal='left', vertical='center')
-
-                # Автоматическая настройка ширины столбцов
-                for column in ws.columns:
-                    max_length = 0
-                    column_letter = None
-                    for cell in column:
-                        try:
-                            if not isinstance(cell, openpyxl.cell.cell.MergedCell):
-                                if column_letter is None:
-                                    column_letter = cell.column_letter
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                        except:
-                            pass
-                    if column_letter:
-                        adjusted_width = (max_length + 2)
-                        ws.column_dimensions[column_letter].width = adjusted_width
-
-                # Объединяем ячейки для заголовков разделов
-                ws.merge_cells('A1:B1')  # Заголовок
-                ws.merge_cells('A3:B3')  # Основная информация
-                ws.merge_cells('A12:B12')  # Участники группы
-                ws.merge_cells(f'A{start_row}:B{start_row}')  # Курсы группы
-
-                # Сохраняем файл
-                file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить файл", "", "Excel Files (*.xlsx)")
-                if file_path:
-                    wb.save(file_path)
-                    QMessageBox.information(self, "Успех", "Статистика успешно экспортирована в Excel!")
-
-            except Exception as e:
-                raise
+            # Формируем отчёт: раздел, показатель, значение
+            rows = [
+                ("Основная информация", "Название", self.localize(group.name)),
+                ("Основная информация", "Описание", self.localize(group.description)),
+                ("Основная информация", "Код приглашения", self.localize(group.inviteCode)),
+                ("Основная информация", "Дата создания", group.createdAt.strftime('%d.%m.%Y %H:%M') if group.createdAt else 'Не задано'),
+                ("Основная информация", "Дата обновления", group.updatedAt.strftime('%d.%m.%Y %H:%M') if group.updatedAt else 'Не задано'),
+                ("Основная информация", "Количество участников", len(group.members)),
+                ("Основная информация", "Количество курсов", len(group.courses)),
+            ]
+            # Участники: имя и логин
+            for member in group.members:
+                rows.append(("Участники группы", self.localize(member.user.firstName), self.localize(member.user.username)))
+            for course in group.courses:
+                title = course['title'] if isinstance(course, dict) and 'title' in course else str(course)
+                rows.append(("Курсы группы", self.localize(title), None))
+            table = Table(STATS_COLUMNS, rows, "Статистика группы")
+
+            # Сохраняем файл в выбранном формате
+            file_path, file_filter = ask_export_path(self)
+            if file_path:
+                write_table(table, file_path, file_filter)
+                QMessageBox.information(self, "Успех", "Статистика успешно экспортирована!")
 
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при экспорте в Excel:\n{str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при экспорте:\n{str(e)}")
 
     def load_data(self, group_id: int):
+        """Показ группы: сразу из кеша (с фоновой проверкой) или с загрузкой"""
+        if group_id != self.group_id:
+            if self._cohort_worker:
+                self._cohort_worker.cancel()
+                self._cohort_worker = None
+            self.cohort_button.setEnabled(True)
+            self.cohort_label.setText("Распределения прогресса, оценки и группа риска по всем участникам")
         self.group_id = group_id  # Сохраняем ID группы для экспорта
+        cached = self.cache.get(group_key(group_id))
+        if cached is not None:
+            self.show_group(cached)
+            self.revalidate(group_id)
+            return
+        self.gushub_api.take_stale_since()
         try:
             group = self.gushub_api.get_group(group_id)
+        except Exception as e:
+            self.show_error()
+            return
+        self.cache.put(group_key(group_id), group)
+        self.show_group(group)
+        show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
+
+    def revalidate(self, group_id: int):
+        """Фоновая загрузка свежих данных группы вместо показанных из кеша"""
+        self._revalidate_worker = Worker(self.gushub_api.get_group, group_id)
+        self._revalidate_worker.signals.finished.connect(lambda group: self.on_revalidated(group_id, group))
+        self._revalidate_worker.start()
+
+    def on_revalidated(self, group_id: int, group):
+        self.cache.put(group_key(group_id), group)
+        if group_id == self.group_id:
+            self.show_group(group)
+            show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
+
+    def show_error(self):
+        self.info_label.setText("Ошибка при загрузке данных")
+        self.members_model.clear()
+        self.courses_label.setText("")
+
+    def load_cohort(self):
+        """Расчёт показателей по всем участникам (профили из кеша или загрузка в фоне)"""
+        if self._cohort_worker:
+            self._cohort_worker.cancel()
+        self.cohort_button.setEnabled(False)
+        self.cohort_label.setText("Загрузка статистики участников...")
+        self._cohort_worker = Worker(load_group_cohort, self.gushub_api, self.group_id)
+        self._cohort_worker.signals.item.connect(self.on_cohort_item)
+        self._cohort_worker.signals.error.connect(self.on_cohort_error)
+        self._cohort_worker.start()
+
+    def on_cohort_item(self, item):
+        if not self._cohort_worker or self.sender() is not self._cohort_worker.signals:
+            return
+        if isinstance(item, CohortStats):
+            self.cohort_button.setEnabled(True)
+            self.show_cohort(item)
+            show_offline_state(self.offline_label, self.gushub_api.take_stale_since())
+        else:
+            done, total = item
+            self.cohort_label.setText(f"Загрузка статистики участников: {done} из {total}")
+
+    def on_cohort_error(self, message: str):
+        if not self._cohort_worker or self.sender() is not self._cohort_worker.signals:
+            return
+        self.cohort_button.setEnabled(True)
+        self.cohort_label.setText(f"Ошибка при расчёте показателей: {message}")
+
+    def show_cohort(self, cohort: CohortStats):
+        self.cohort_label.setText(format_cohort(cohort, self.AT_RISK_SHOWN))
+
+    def show_group(self, group):
+        try:
             self.title.setText(f"<h2>Статистика группы: {self.localize(group.name)}</h2>")
 
             # Основная информация
@@ -690,28 +859,9 @@ class GroupStatsWidget(QWidget):
             self.info_label.setText(info_text)
 
             # Участники (таблица)
-            self._member_ids = []
-            if group.members:
-                self.members_table.setRowCount(len(group.members))
-                for i, m in enumerate(group.members):
-                    user = m.user
-                    full_name = f"{self.localize(user.firstName)}".strip()
-                    self.members_table.setItem(i, 0, QTableWidgetItem(full_name))
-                    self.members_table.setItem(i, 1, QTableWidgetItem(self.localize(user.username)))
-                    self._member_ids.append(user.id)
-                self.members_table.setEnabled(True)
-                self.members_table.setStyleSheet("")
-            else:
-                self.members_table.setRowCount(0)
-                self.members_table.setEnabled(False)
-                self.members_table.setStyleSheet("QTableWidget { color: #888; font-style: italic; }")
-                # Показываем надпись по центру таблицы
-                self.members_table.setRowCount(1)
-                self.members_table.setSpan(0, 0, 1, 2)
-                item = QTableWidgetItem("Нет участников")
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
-                self.members_table.setItem(0, 0, item)
-                self._member_ids = []
+            self.members_model.set_objects(group.members)
+            self.members_table.setVisible(bool(group.members))
+            self.no_members_label.setVisible(not group.members)
 
             # Курсы
             if group.courses:
@@ -728,22 +878,10 @@ class GroupStatsWidget(QWidget):
                 self.courses_label.setAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
 
         except Exception as e:
-            self.info_label.setText("Ошибка при загрузке данных")
-            self.members_table.setRowCount(0)
-            self.courses_label.setText("")
+            self.show_error()
 
-    def on_member_selected(self, row: int, column: int):
-        # Если нет участников, не реагируем
-        if not self.members_table.isEnabled():
-            return
-        try:
-            user_id_item = self.members_table.item(row, 1)
-            # Получаем ID студента из исходных данных (лучше хранить список id)
-            # Для этого сохраним список id в self._member_ids при загрузке
-            student_id = self._member_ids[row]
-            self.student_selected.emit(student_id)
-        except Exception as e:
-            pass
+    def on_member_selected(self, index: QModelIndex):
+        self.student_selected.emit(index.data(ID_ROLE))
 
 class SelectionWidget(QWidget):
     """Виджет для выбора раздела аналитики"""
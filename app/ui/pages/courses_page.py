@@ -4,23 +4,25 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from app.database.database import Database
 from app.ui.forms.courses_add_form import CreateCourseDialog
 from app.ui.forms.modules_add_form import CreateModuleDialog
-from app.api.github_api import GitHubAPI
-from app.api.gushub_api import GushubAPI
 from app.settings import AppSettings
+from app.outbox.jobs import JobDefinition, enqueue
+from app.outbox.content import CREATE_COURSE, DELETE_COURSE, CREATE_MODULE
 
 class CoursesPage(QWidget):
     # Сигнал для обновления дерева
     tree_update_needed = pyqtSignal()
     # Сигнал для перехода к модулю
     module_selected = pyqtSignal(int)
+    # Сигнал о постановке операции в очередь (id задачи)
+    job_enqueued = pyqtSignal(int)
     
     def __init__(self):
         super().__init__()
         self.db = Database()
         self.settings = AppSettings()
-        self.github_api = GitHubAPI(self.settings.get_github_token())
-        self.gushub_api = GushubAPI()
         self.current_course_id = None
+        # Поставленные страницей задачи: id задачи -> параметры операции
+        self._jobs = {}
         
         # Создаем основной layout
         main_layout = QVBoxLayout(self)
@@ -101,38 +103,12 @@ class CoursesPage(QWidget):
                         )
                         return
                     
-                    # Создаем репозиторий на GitHub
-                    repo = self.github_api.create_course(title, description)
-                    
-                    # Загружаем изображение в Gushub
-                    image_response = self.gushub_api.upload_photo(image_path)
-                    
-                    # Создаем курс в Gushub
-                    course_data = {
+                    # Репозиторий, изображение, курс в Gushub и запись в базе создаются в фоне
+                    self.enqueue_job(CREATE_COURSE, {
                         'title': title,
                         'description': description,
-                        'image': image_response['url']  # URL загруженного изображения
-                    }
-                    gushub_response = self.gushub_api.create_course(course_data)
-                    
-                    # Добавляем курс в базу данных
-                    course_id = self.db.add_course(
-                        github_path=repo.html_url,
-                        title=title,
-                        description=description,
-                        site_id=gushub_response['id']
-                    )
-                    
-                    self.set_current_course(course_id)
-                    # Отправляем сигнал для обновления дерева
-                    self.tree_update_needed.emit()
-                    
-                    # Показываем сообщение об успешном создании
-                    QMessageBox.information(
-                        self,
-                        "Успех",
-                        f"Курс '{title}' успешно создан"
-                    )
+                        'image_path': image_path,
+                    })
                     
                 except Exception as e:
                     QMessageBox.critical(
@@ -163,27 +139,13 @@ class CoursesPage(QWidget):
                 # Получаем информацию о курсе
                 course = self.db.get_course(self.current_course_id)
                 if course:
-                    # Удаляем репозиторий на GitHub
-                    if course['github_path']:
-                        repo_name = course['github_path'].split('/')[-1]
-                        self.github_api.delete_course(repo_name)
-                    
-                    # Удаляем курс из Gushub
-                    if course.get('site_id'):
-                        self.gushub_api.delete_course(course['site_id'])
-                
-                # Удаляем курс из базы данных
-                self.db.delete_course(self.current_course_id)
-                self.set_current_course(None)
-                # Отправляем сигнал для обновления дерева
-                self.tree_update_needed.emit()
-                
-                # Показываем сообщение об успешном удалении
-                QMessageBox.information(
-                    self,
-                    "Успех",
-                    f"Курс '{course['title']}' успешно удален"
-                )
+                    # Репозиторий, курс в Gushub и запись в базе удаляются в фоне
+                    self.enqueue_job(DELETE_COURSE, {
+                        'course_id': course['id'],
+                        'title': course['title'],
+                        'repo_name': course['github_path'].split('/')[-1] if course['github_path'] else None,
+                        'site_id': course.get('site_id'),
+                    })
                 
             except Exception as e:
                 QMessageBox.critical(
@@ -215,42 +177,17 @@ class CoursesPage(QWidget):
                             )
                             return
                         
-                        # Получаем репозиторий курса
-                        repo = self.github_api.get_course(course['title'])
-                        # Создаем модуль в репозитории
-                        module_path = self.github_api.create_module(repo, title, description)
-                        
-                        # Создаем модуль в Gushub
-                        if course.get('site_id'):
-                            module_data = {
-                                'title': title,
-                                'description': description
-                            }
-                            gushub_response = self.gushub_api.create_module(course['site_id'], module_data)
-                            
-                            # Добавляем модуль в базу данных
-                            module_id = self.db.add_module(
-                                self.current_course_id,
-                                module_path,
-                                title,
-                                description,
-                                site_id=gushub_response['id']
-                            )
-                            
-                            # Отправляем сигнал для обновления дерева
-                            self.tree_update_needed.emit()
-                            
-                            # Показываем сообщение об успешном создании
-                            QMessageBox.information(
-                                self,
-                                "Успех",
-                                f"Модуль '{title}' успешно создан в курсе '{course['title']}'"
-                            )
-                            
-                            # Переходим к созданному модулю
-                            self.module_selected.emit(module_id)
-                        else:
+                        if not course.get('site_id'):
                             raise Exception("Не найден ID курса в Gushub")
+                        
+                        # Модуль в репозитории, в Gushub и в базе создаётся в фоне
+                        self.enqueue_job(CREATE_MODULE, {
+                            'course_id': course['id'],
+                            'course_title': course['title'],
+                            'course_site_id': course['site_id'],
+                            'title': title,
+                            'description': description,
+                        })
                     
                 except Exception as e:
                     QMessageBox.critical(
@@ -258,3 +195,21 @@ class CoursesPage(QWidget):
                         "Ошибка",
                         f"Не удалось создать модуль: {str(e)}"
                     )
+
+    def enqueue_job(self, definition: JobDefinition, payload: dict):
+        """Постановка операции в очередь фонового выполнения"""
+        job_id = enqueue(self.db, definition, payload)
+        self._jobs[job_id] = payload
+        self.job_enqueued.emit(job_id)
+
+    def on_job_finished(self, job_id: int, kind: str, results: dict):
+        """Переход к результату выполненной операции этой страницы"""
+        payload = self._jobs.pop(job_id, None)
+        if payload is None:
+            return
+        if kind == CREATE_COURSE.kind:
+            self.set_current_course(results['db']['course_id'])
+        elif kind == DELETE_COURSE.kind and self.current_course_id == payload['course_id']:
+            self.set_current_course(None)
+        elif kind == CREATE_MODULE.kind:
+            self.module_selected.emit(results['db']['module_id'])
@@ -4,22 +4,25 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from app.database.database import Database
 from app.ui.forms.tasks_add_form import CreateTaskDialog
 from app.ui.forms.lessons_update_form import UpdateLessonDialog
-from app.api.github_api import GitHubAPI
-from app.api.gushub_api import GushubAPI
+from app.api.github_scheduler import GitHubRateLimitScheduler
 from app.settings import AppSettings
-import urllib.parse
+from app.api.github_api import check_file_size
+from app.outbox.jobs import JobDefinition, enqueue
+from app.outbox.content import UPDATE_LESSON, DELETE_LESSON, CREATE_TASK
 
 class LessonsPage(QWidget):
     # Сигнал для обновления дерева
     tree_update_needed = pyqtSignal()
+    # Сигнал о постановке операции в очередь (id задачи)
+    job_enqueued = pyqtSignal(int)
     
     def __init__(self):
         super().__init__()
         self.db = Database()
         self.settings = AppSettings()
-        self.github_api = GitHubAPI(self.settings.get_github_token())
-        self.gushub_api = GushubAPI()
         self.current_lesson_id = None
+        # Поставленные страницей задачи очереди: id -> параметры операции
+        self._jobs = {}
         
         # Создаем основной layout
         main_layout = QVBoxLayout(self)
@@ -115,28 +118,14 @@ class LessonsPage(QWidget):
                 return
             
             try:
-                # Получаем репозиторий курса
-                repo = self.github_api.get_course(course['title'])
-                if not repo:
-                    raise Exception("Не удалось получить репозиторий курса")
-                
-                # Получаем SHA хеш текущего файла
-                contents = repo.get_contents(lesson['github_path'])
-                
-                # Читаем содержимое нового файла
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Обновляем урок в GitHub
-                self.github_api.update_lesson(
-                    repo=repo,
-                    path=lesson['github_path'],
-                    new_content=content,
-                    commit_message=f"Update lesson {lesson['title']}",
-                    sha=contents.sha
-                )
-                
-                QMessageBox.information(self, "Успех", "Контент урока успешно обновлен")
+                # Файл загружается в GitHub в фоне
+                self.enqueue_job(UPDATE_LESSON, {
+                    'lesson_id': lesson['id'],
+                    'title': lesson['title'],
+                    'course_title': course['title'],
+                    'github_path': lesson['github_path'],
+                    'file_path': file_path,
+                })
                 
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Не удалось обновить контент урока: {str(e)}")
@@ -146,9 +135,16 @@ class LessonsPage(QWidget):
         if self.current_lesson_id is None:
             return
         
+        # Оцениваем время удаления с учётом лимитов GitHub: файлы урока и всех
+        # его задач удаляются одним коммитом (дерево, коммит и ветка)
+        expected_wait = GitHubRateLimitScheduler.shared().estimated_wait(3)
+        
         msg_box = QMessageBox(self)
         msg_box.setWindowTitle("Подтверждение удаления")
-        msg_box.setText("Вы уверены, что хотите удалить этот урок?")
+        text = "Вы уверены, что хотите удалить этот урок?"
+        if expected_wait >= 1:
+            text += f"\nУдаление займёт около {expected_wait:.0f} с"
+        msg_box.setText(text)
         msg_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         msg_box.setDefaultButton(QMessageBox.StandardButton.No)
         
@@ -160,47 +156,22 @@ class LessonsPage(QWidget):
         
         if msg_box.exec() == QMessageBox.StandardButton.Yes:
             try:
-                # Получаем информацию об уроке
+                # Получаем информацию об уроке, модуле и курсе
                 lesson = self.db.get_lesson(self.current_lesson_id)
-                if lesson and lesson['github_path']:
-                    # Получаем информацию о модуле и курсе
-                    module = self.db.get_module(lesson['module_id'])
-                    if module:
-                        course = self.db.get_course(module['course_id'])
-                        if course:
-                            # Получаем репозиторий курса
-                            repo = self.github_api.get_course(course['title'])
-                            
-                            # Получаем все задачи урока
-                            tasks = self.db.get_tasks_by_lesson(self.current_lesson_id)
-                            
-                            # Удаляем все задачи урока из GitHub
-                            for task in tasks:
-                                if task['github_path']:
-                                    contents = repo.get_contents(task['github_path'])
-                                    self.github_api.delete_task(repo, task['github_path'], contents.sha)
-                            
-                            # Получаем SHA хеш файла урока
-                            contents = repo.get_contents(lesson['github_path'])
-                            # Удаляем урок из репозитория
-                            self.github_api.delete_lesson(repo, lesson['github_path'], contents.sha)
-
-                            # Удаляем урок из Gushub
-                            if lesson.get('site_id'):
-                                self.gushub_api.delete_lesson(lesson['site_id'])
-                
-                # Удаляем урок из базы данных (это также удалит все связанные задачи)
-                self.db.delete_lesson(self.current_lesson_id)
-                self.set_current_lesson(None)
-                # Отправляем сигнал для обновления дерева
-                self.tree_update_needed.emit()
-                
-                # Показываем сообщение об успешном удалении
-                QMessageBox.information(
-                    self,
-                    "Успех",
-                    f"Урок '{lesson['title']}' и все его задачи успешно удалены"
-                )
+                if lesson:
+                    module = self.db.get_module(lesson['module_id']) if lesson['github_path'] else None
+                    course = self.db.get_course(module['course_id']) if module else None
+                    tasks = self.db.get_tasks_by_lesson(lesson['id'])
+                    # Файлы задач и урока, урок в Gushub и записи в базе удаляются в фоне
+                    self.enqueue_job(DELETE_LESSON, {
+                        'lesson_id': lesson['id'],
+                        'title': lesson['title'],
+                        'course_title': course['title'] if course else None,
+                        'github_path': lesson['github_path'] if course else None,
+                        'task_paths': [task['github_path'] for task in tasks if task['github_path']],
+                        'task_site_ids': [task['site_id'] for task in tasks if task.get('site_id')],
+                        'site_id': lesson.get('site_id') if course else None,
+                    })
                 
             except Exception as e:
                 QMessageBox.critical(
@@ -257,58 +228,32 @@ class LessonsPage(QWidget):
                 return
             
             try:
-                # Получаем репозиторий курса
-                repo = self.github_api.get_course(course['title'])
-                if not repo:
-                    raise Exception("Не удалось получить репозиторий курса")
-                
-                # Читаем содержимое файла
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Создаем задачу в GitHub
-                task_path = self.github_api.create_task(
-                    repo=repo,
-                    module_path=module['title'],
-                    filename=title,
-                    content=content,
-                    commit_message=f"Add task {title}"
-                )
-                
-                # Формируем raw URL для файла
-                raw_url = f"https://raw.githubusercontent.com/{self.github_api.user.login}/{repo.name}/main/{task_path}"
-                encoded_url = urllib.parse.quote(raw_url, safe=':/?=&')
-                
-                # Создаем задачу в Gushub
-                if lesson.get('site_id'):
-                    step_data = {
-                        'title': title,
-                        'urlMd': encoded_url,
-                        'type': 'ASSIGNMENT'
-                    }
-                    gushub_response = self.gushub_api.create_step(lesson['site_id'], step_data)
-                    
-                    # Сохраняем задачу в базе данных
-                    self.db.add_task(
-                        self.current_lesson_id,
-                        task_path,
-                        title,
-                        raw_url,
-                        site_id=gushub_response['id']
-                    )
-                else:
-                    # Сохраняем задачу в базе данных без site_id
-                    self.db.add_task(
-                        self.current_lesson_id,
-                        task_path,
-                        title,
-                        raw_url
-                    )
-                
-                # Обновляем дерево
-                self.tree_update_needed.emit()
-                
-                QMessageBox.information(self, "Успех", "Задача успешно создана")
+                # Задача в репозитории, в Gushub и в базе создаётся в фоне
+                self.enqueue_job(CREATE_TASK, {
+                    'lesson_id': lesson['id'],
+                    'lesson_site_id': lesson.get('site_id'),
+                    'module_title': module['title'],
+                    'course_title': course['title'],
+                    'title': title,
+                    'file_path': file_path,
+                })
                 
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Не удалось создать задачу: {str(e)}")
+
+    def enqueue_job(self, definition: JobDefinition, payload: dict):
+        """Постановка операции в очередь фонового выполнения"""
+        if payload.get('file_path'):
+            # Файл, который GitHub не примет, отклоняется до постановки в очередь
+            check_file_size(payload['file_path'])
+        job_id = enqueue(self.db, definition, payload)
+        self._jobs[job_id] = payload
+        self.job_enqueued.emit(job_id)
+
+    def on_job_finished(self, job_id: int, kind: str, results: dict):
+        """Обновление страницы после выполненной операции"""
+        payload = self._jobs.pop(job_id, None)
+        if payload is None:
+            return
+        if kind == DELETE_LESSON.kind and self.current_lesson_id == payload['lesson_id']:
+            self.set_current_lesson(None)
@@ -3,22 +3,24 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal
 from app.database.database import Database
 from app.ui.forms.lessons_add_form import CreateLessonDialog
-from app.api.github_api import GitHubAPI
-from app.api.gushub_api import GushubAPI
 from app.settings import AppSettings
-import urllib.parse
+from app.api.github_api import check_file_size
+from app.outbox.jobs import JobDefinition, enqueue
+from app.outbox.content import DELETE_MODULE, CREATE_LESSON
 
 class ModulesPage(QWidget):
     # Сигнал для обновления дерева
     tree_update_needed = pyqtSignal()
+    # Сигнал о постановке операции в очередь (id задачи)
+    job_enqueued = pyqtSignal(int)
     
     def __init__(self):
         super().__init__()
         self.db = Database()
         self.settings = AppSettings()
-        self.github_api = GitHubAPI(self.settings.get_github_token())
-        self.gushub_api = GushubAPI()
         self.current_module_id = None
+        # Поставленные страницей задачи: id задачи -> параметры операции
+        self._jobs = {}
         
         # Создаем основной layout
         main_layout = QVBoxLayout(self)
@@ -102,28 +104,14 @@ class ModulesPage(QWidget):
                 if module:
                     # Получаем информацию о курсе
                     course = self.db.get_course(module['course_id'])
-                    if course:
-                        # Удаляем модуль из GitHub
-                        if module['github_path']:
-                            repo = self.github_api.get_course(course['title'])
-                            self.github_api.delete_module(repo, module['title'])
-                        
-                        # Удаляем модуль из Gushub
-                        if module.get('site_id'):
-                            self.gushub_api.delete_module(module['site_id'])
-                
-                # Удаляем модуль из базы данных
-                self.db.delete_module(self.current_module_id)
-                self.set_current_module(None)
-                # Отправляем сигнал для обновления дерева
-                self.tree_update_needed.emit()
-                
-                # Показываем сообщение об успешном удалении
-                QMessageBox.information(
-                    self,
-                    "Успех",
-                    f"Модуль '{module['title']}' успешно удален"
-                )
+                    # Модуль удаляется из GitHub, Gushub и базы в фоне
+                    self.enqueue_job(DELETE_MODULE, {
+                        'module_id': module['id'],
+                        'title': module['title'],
+                        'course_title': course['title'] if course else None,
+                        'github_path': module['github_path'] if course else None,
+                        'site_id': module.get('site_id') if course else None,
+                    })
                 
             except Exception as e:
                 QMessageBox.critical(
@@ -171,43 +159,18 @@ class ModulesPage(QWidget):
                             return
                     
                     if course and course['github_path']:
-                        # Получаем репозиторий курса
-                        repo = self.github_api.get_course(course['title'])
-                        # Создаем урок в репозитории
-                        lesson_path = self.github_api.create_lesson(repo, module['title'], title, file_path)
-                        # Получаем raw URL для файла и кодируем его
-                        raw_url = f"https://raw.githubusercontent.com/{self.github_api.user.login}/{repo.name}/main/{lesson_path}"
-                        encoded_url = urllib.parse.quote(raw_url, safe=':/?=&')
-                        
-                        # Создаем урок в Gushub
-                        if module.get('site_id'):
-                            # Преобразуем в словарь для отправки
-                            lesson_dict = {
-                                'title': title,
-                                'urlMd': encoded_url
-                            }
-                            gushub_response = self.gushub_api.create_lesson(module['site_id'], lesson_dict)
-                            
-                            # Добавляем урок в базу данных
-                            self.db.add_lesson(
-                                self.current_module_id,
-                                lesson_path,
-                                title,
-                                raw_url,  # Сохраняем оригинальный URL в базу
-                                site_id=gushub_response['id']
-                            )
-                            
-                            # Отправляем сигнал для обновления дерева
-                            self.tree_update_needed.emit()
-                            
-                            # Показываем сообщение об успешном создании
-                            QMessageBox.information(
-                                self,
-                                "Успех",
-                                f"Урок '{title}' успешно создан в модуле '{module['title']}'"
-                            )
-                        else:
+                        if not module.get('site_id'):
                             raise Exception("Не найден ID модуля в Gushub")
+                        
+                        # Урок в репозитории, в Gushub и в базе создаётся в фоне
+                        self.enqueue_job(CREATE_LESSON, {
+                            'module_id': module['id'],
+                            'module_title': module['title'],
+                            'module_site_id': module['site_id'],
+                            'course_title': course['title'],
+                            'title': title,
+                            'file_path': file_path,
+                        })
                     
                 except Exception as e:
                     QMessageBox.critical(
@@ -215,3 +178,20 @@ class ModulesPage(QWidget):
                         "Ошибка",
                         f"Не удалось создать урок: {str(e)}"
                     )
+
+    def enqueue_job(self, definition: JobDefinition, payload: dict):
+        """Постановка операции в очередь фонового выполнения"""
+        if payload.get('file_path'):
+            # Файл, который GitHub не примет, отклоняется до постановки в очередь
+            check_file_size(payload['file_path'])
+        job_id = enqueue(self.db, definition, payload)
+        self._jobs[job_id] = payload
+        self.job_enqueued.emit(job_id)
+
+    def on_job_finished(self, job_id: int, kind: str, results: dict):
+        """Обновление страницы после выполненной операции"""
+        payload = self._jobs.pop(job_id, None)
+        if payload is None:
+            return
+        if kind == DELETE_MODULE.kind and self.current_module_id == payload['module_id']:
+            self.set_current_module(None)
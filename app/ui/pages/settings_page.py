@@ -1,5 +1,6 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QMessageBox, QFrame, QSizePolicy)
+                             QLabel, QMessageBox, QFrame, QSizePolicy, QCheckBox,
+                             QSpinBox, QLineEdit, QFormLayout)
 from PyQt6.QtCore import Qt, pyqtSignal
 
 from app.settings import AppSettings
@@ -8,6 +9,7 @@ from app.api.github_api import GitHubAPI
 
 class SettingsPage(QWidget):
     show_courses_page = pyqtSignal()
+    watch_settings_changed = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -39,6 +41,84 @@ class SettingsPage(QWidget):
         info_layout.addWidget(self.user_info)
         
         main_layout.addWidget(info_frame, 1)  # Растягиваем фрейм с информацией
+
+        # Работа без сети
+        offline_frame = QFrame()
+        offline_layout = QFormLayout(offline_frame)
+        offline_layout.setContentsMargins(20, 0, 20, 0)
+        offline_layout.addRow(QLabel("<h3>Работа без сети</h3>"))
+
+        offline_enabled, max_age_days = self.settings.get_offline_cache_settings()
+        self.offline_enabled = QCheckBox("Показывать сохранённые данные, если gushub.ru недоступен")
+        self.offline_enabled.setChecked(offline_enabled)
+        offline_layout.addRow(self.offline_enabled)
+
+        self.offline_days = QSpinBox()
+        self.offline_days.setRange(1, 365)
+        self.offline_days.setSuffix(" дн.")
+        self.offline_days.setValue(max_age_days)
+        offline_layout.addRow("Хранить данные:", self.offline_days)
+
+        self.offline_save_button = QPushButton("Сохранить")
+        self.offline_save_button.clicked.connect(self.save_offline_settings)
+        offline_layout.addRow(self.offline_save_button)
+
+        main_layout.addWidget(offline_frame)
+
+        # Отслеживание файлов уроков
+        watch_frame = QFrame()
+        watch_layout = QFormLayout(watch_frame)
+        watch_layout.setContentsMargins(20, 0, 20, 0)
+        watch_layout.addRow(QLabel("<h3>Отслеживание файлов</h3>"))
+
+        watch_enabled, watch_interval = self.settings.get_watch_settings()
+        self.watch_enabled = QCheckBox("Выкладывать изменённые файлы уроков и задач автоматически")
+        self.watch_enabled.setChecked(watch_enabled)
+        watch_layout.addRow(self.watch_enabled)
+
+        self.watch_interval = QSpinBox()
+        self.watch_interval.setRange(10, 3600)
+        self.watch_interval.setSuffix(" с")
+        self.watch_interval.setValue(watch_interval)
+        watch_layout.addRow("Выкладывать изменения раз в:", self.watch_interval)
+
+        self.watch_save_button = QPushButton("Сохранить")
+        self.watch_save_button.clicked.connect(self.save_watch_settings)
+        watch_layout.addRow(self.watch_save_button)
+
+        main_layout.addWidget(watch_frame)
+
+        # Фоновая загрузка аналитики
+        prefetch_frame = QFrame()
+        prefetch_layout = QFormLayout(prefetch_frame)
+        prefetch_layout.setContentsMargins(20, 0, 20, 0)
+        prefetch_layout.addRow(QLabel("<h3>Фоновая загрузка аналитики</h3>"))
+
+        enabled, interval, max_workers = self.settings.get_prefetch_settings()
+        self.prefetch_enabled = QCheckBox("Загружать статистику групп, пока приложение простаивает")
+        self.prefetch_enabled.setChecked(enabled)
+        prefetch_layout.addRow(self.prefetch_enabled)
+
+        self.prefetch_interval = QSpinBox()
+        self.prefetch_interval.setRange(1, 24 * 60)
+        self.prefetch_interval.setSuffix(" мин")
+        self.prefetch_interval.setValue(interval)
+        prefetch_layout.addRow("Интервал:", self.prefetch_interval)
+
+        self.prefetch_workers = QSpinBox()
+        self.prefetch_workers.setRange(1, 16)
+        self.prefetch_workers.setValue(max_workers)
+        prefetch_layout.addRow("Параллельных запросов:", self.prefetch_workers)
+
+        self.prefetch_groups = QLineEdit(", ".join(str(group_id) for group_id in self.settings.get_prefetch_groups()))
+        self.prefetch_groups.setPlaceholderText("ID групп через запятую, пусто - все группы")
+        prefetch_layout.addRow("Группы:", self.prefetch_groups)
+
+        self.prefetch_save_button = QPushButton("Сохранить")
+        self.prefetch_save_button.clicked.connect(self.save_prefetch_settings)
+        prefetch_layout.addRow(self.prefetch_save_button)
+
+        main_layout.addWidget(prefetch_frame)
         
         # Кнопки управления
         buttons_layout = QHBoxLayout()
@@ -75,6 +155,30 @@ class SettingsPage(QWidget):
             # Закрываем приложение
             self.window().close() 
         
+    def save_offline_settings(self):
+        """Сохранение настроек работы без сети (применяются после перезапуска приложения)"""
+        self.settings.set_offline_cache_settings(self.offline_enabled.isChecked(), self.offline_days.value())
+        QMessageBox.information(self, "Успех", "Настройки сохранены. Изменения вступят в силу после перезапуска")
+
+    def save_watch_settings(self):
+        """Сохранение настроек отслеживания файлов (применяются сразу)"""
+        self.settings.set_watch_settings(self.watch_enabled.isChecked(), self.watch_interval.value())
+        self.watch_settings_changed.emit()
+        QMessageBox.information(self, "Успех", "Настройки сохранены")
+
+    def save_prefetch_settings(self):
+        """Сохранение настроек фоновой загрузки (применяются со следующего запуска загрузки)"""
+        text = self.prefetch_groups.text().replace(' ', '')
+        group_ids = [part for part in text.split(',') if part]
+        if not all(part.isdigit() for part in group_ids):
+            QMessageBox.warning(self, "Ошибка", "Укажите ID групп числами через запятую")
+            return
+        self.settings.set_prefetch_settings(self.prefetch_enabled.isChecked(),
+                                            self.prefetch_interval.value(),
+                                            self.prefetch_workers.value())
+        self.settings.set_prefetch_groups([int(part) for part in group_ids])
+        QMessageBox.information(self, "Успех", "Настройки сохранены")
+
     def show_courses(self):
         """Переход на страницу курсов"""
         self.show_courses_page.emit() 
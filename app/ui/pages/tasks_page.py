@@ -3,21 +3,24 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal
 from app.database.database import Database
 from app.ui.forms.tasks_update_form import UpdateTaskDialog
-from app.api.github_api import GitHubAPI
-from app.api.gushub_api import GushubAPI
 from app.settings import AppSettings
+from app.api.github_api import check_file_size
+from app.outbox.jobs import JobDefinition, enqueue
+from app.outbox.content import UPDATE_TASK, DELETE_TASK
 
 class TasksPage(QWidget):
     # Сигнал для обновления дерева
     tree_update_needed = pyqtSignal()
+    # Сигнал о постановке операции в очередь (id задачи)
+    job_enqueued = pyqtSignal(int)
     
     def __init__(self):
         super().__init__()
         self.db = Database()
         self.settings = AppSettings()
-        self.github_api = GitHubAPI(self.settings.get_github_token())
-        self.gushub_api = GushubAPI()
         self.current_task_id = None
+        # Поставленные страницей задачи очереди: id -> параметры операции
+        self._jobs = {}
         
         # Создаем основной layout
         main_layout = QVBoxLayout(self)
@@ -111,28 +114,14 @@ class TasksPage(QWidget):
                 return
             
             try:
-                # Получаем репозиторий курса
-                repo = self.github_api.get_course(course['title'])
-                if not repo:
-                    raise Exception("Не удалось получить репозиторий курса")
-                
-                # Получаем SHA хеш текущего файла
-                contents = repo.get_contents(task['github_path'])
-                
-                # Читаем содержимое нового файла
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Обновляем задачу в GitHub
-                self.github_api.update_task(
-                    repo=repo,
-                    path=task['github_path'],
-                    new_content=content,
-                    commit_message=f"Update task {task['title']}",
-                    sha=contents.sha
-                )
-                
-                QMessageBox.information(self, "Успех", "Контент задачи успешно обновлен")
+                # Файл загружается в GitHub в фоне
+                self.enqueue_job(UPDATE_TASK, {
+                    'task_id': task['id'],
+                    'title': task['title'],
+                    'course_title': course['title'],
+                    'github_path': task['github_path'],
+                    'file_path': file_path,
+                })
                 
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Не удалось обновить контент задачи: {str(e)}")
@@ -156,39 +145,20 @@ class TasksPage(QWidget):
         
         if msg_box.exec() == QMessageBox.StandardButton.Yes:
             try:
-                # Получаем информацию о задаче
+                # Получаем информацию о задаче, уроке, модуле и курсе
                 task = self.db.get_task(self.current_task_id)
-                if task and task['github_path']:
-                    # Получаем информацию об уроке, модуле и курсе
+                if task:
                     lesson = self.db.get_lesson(task['lesson_id'])
-                    if lesson:
-                        module = self.db.get_module(lesson['module_id'])
-                        if module:
-                            course = self.db.get_course(module['course_id'])
-                            if course:
-                                # Получаем репозиторий курса
-                                repo = self.github_api.get_course(course['title'])
-                                # Получаем SHA хеш файла
-                                contents = repo.get_contents(task['github_path'])
-                                # Удаляем задачу из репозитория
-                                self.github_api.delete_task(repo, task['github_path'], contents.sha)
-
-                                # Удаляем задачу из Gushub
-                                if task.get('site_id'):
-                                    self.gushub_api.delete_step(task['site_id'])
-                
-                # Удаляем задачу из базы данных
-                self.db.delete_task(self.current_task_id)
-                self.set_current_task(None)
-                # Отправляем сигнал для обновления дерева
-                self.tree_update_needed.emit()
-                
-                # Показываем сообщение об успешном удалении
-                QMessageBox.information(
-                    self,
-                    "Успех",
-                    f"Задача '{task['title']}' успешно удалена"
-                )
+                    module = self.db.get_module(lesson['module_id']) if lesson else None
+                    course = self.db.get_course(module['course_id']) if module else None
+                    # Задача удаляется из GitHub, Gushub и базы в фоне
+                    self.enqueue_job(DELETE_TASK, {
+                        'task_id': task['id'],
+                        'title': task['title'],
+                        'course_title': course['title'] if course else None,
+                        'github_path': task['github_path'] if course else None,
+                        'site_id': task.get('site_id') if course and task['github_path'] else None,
+                    })
                 
             except Exception as e:
                 QMessageBox.critical(
@@ -196,3 +166,20 @@ class TasksPage(QWidget):
                     "Ошибка",
                     f"Не удалось удалить задачу: {str(e)}"
                 )
+
+    def enqueue_job(self, definition: JobDefinition, payload: dict):
+        """Постановка операции в очередь фонового выполнения"""
+        if payload.get('file_path'):
+            # Файл, который GitHub не примет, отклоняется до постановки в очередь
+            check_file_size(payload['file_path'])
+        job_id = enqueue(self.db, definition, payload)
+        self._jobs[job_id] = payload
+        self.job_enqueued.emit(job_id)
+
+    def on_job_finished(self, job_id: int, kind: str, results: dict):
+        """Обновление страницы после выполненной операции"""
+        payload = self._jobs.pop(job_id, None)
+        if payload is None:
+            return
+        if kind == DELETE_TASK.kind and self.current_task_id == payload['task_id']:
+            self.set_current_task(None)
@@ -0,0 +1,141 @@
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from PyQt6.QtCore import QEvent, QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from app.analytics.cache import AnalyticsCache, group_key, profile_key
+from app.analytics.snapshots import record_snapshots
+from app.api.gushub_api import GushubAPI
+from app.settings import AppSettings
+from app.ui.workers import Worker
+
+
+def prefetch_analytics(api: GushubAPI, cache: AnalyticsCache, group_ids: List[int],
+                       max_workers: int, fresh_for: float) -> Iterator[Tuple[int, int]]:
+    """
+    Загрузка групп, их участников и статистики в кеш и запись снимков
+    истории статистики. Профили, загруженные менее fresh_for секунд назад,
+    не перезапрашиваются. Выдаёт прогресс (обработано групп, всего групп).
+    """
+    if not group_ids:
+        group_ids = [group.id for group in api.get_groups()]
+    for done, group_id in enumerate(group_ids, start=1):
+        group = api.get_group(group_id)
+        cache.put(group_key(group_id), group)
+
+        user_ids = []
+        # Снимок истории записывается каждый цикл по всем участникам, в том числе
+        # по свежим профилям из кеша, загруженным без записи снимка (показатели группы)
+        loaded = []
+        for member in group.members:
+            age = cache.age(profile_key(member.user.id))
+            if age is None or age >= fresh_for:
+                user_ids.append(member.user.id)
+            else:
+                loaded.append((member.user.id, cache.get(profile_key(member.user.id))))
+
+        for position, profile in api.iter_student_profiles(user_ids, max_workers):
+            if profile is not None:
+                cache.put(profile_key(user_ids[position]), profile)
+                loaded.append((user_ids[position], profile))
+        try:
+            record_snapshots(loaded)
+        except Exception as e:
+            print(f"Ошибка при сохранении снимков статистики: {str(e)}")
+        yield done, len(group_ids)
+
+
+class PrefetchScheduler(QObject):
+    """
+    Фоновая загрузка аналитики по расписанию.
+
+    Раз в интервал из настроек, если приложение простаивает (пользователь
+    не работал с ним INPUT_IDLE_S секунд, нет модальных окон и загрузок, которых
+    он ждёт), загружает в AnalyticsCache группы из
+    настроек (или все) и статистику их участников с ограниченным числом
+    параллельных запросов. Настройки перечитываются перед каждым запуском.
+    """
+    # Повторная проверка простоя, если приложение занято, мс
+    BUSY_RETRY_MS = 30 * 1000
+    # Первая загрузка после запуска приложения, мс
+    STARTUP_DELAY_MS = 10 * 1000
+    # Сколько пользователь не должен работать с приложением, секунды
+    INPUT_IDLE_S = 30
+    # События ввода, которые означают, что пользователь работает с приложением
+    INPUT_EVENTS = frozenset({
+        QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonDblClick,
+        QEvent.Type.Wheel, QEvent.Type.TouchBegin,
+    })
+
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, api: Optional[GushubAPI] = None, cache: Optional[AnalyticsCache] = None, parent=None):
+        super().__init__(parent)
+        self.api = api
+        self.cache = cache or AnalyticsCache.shared()
+        self.settings = AppSettings()
+        self._worker: Optional[Worker] = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.run_if_idle)
+        self._last_input = time.monotonic()
+
+    def start(self) -> None:
+        QApplication.instance().installEventFilter(self)
+        self._timer.start(self.STARTUP_DELAY_MS)
+
+    def stop(self) -> None:
+        QApplication.instance().removeEventFilter(self)
+        self._timer.stop()
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def _schedule_next(self) -> None:
+        _, interval, _ = self.settings.get_prefetch_settings()
+        self._timer.start(max(interval, 1) * 60 * 1000)
+
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() in self.INPUT_EVENTS:
+            self._last_input = time.monotonic()
+        return False
+
+    def is_idle(self) -> bool:
+        return (time.monotonic() - self._last_input >= self.INPUT_IDLE_S
+                and QApplication.activeModalWidget() is None
+                and not Worker.foreground_active())
+
+    def run_if_idle(self) -> None:
+        enabled, interval, max_workers = self.settings.get_prefetch_settings()
+        if not enabled:
+            self._schedule_next()
+            return
+        if self._worker or not self.is_idle():
+            self._timer.start(self.BUSY_RETRY_MS)
+            return
+
+        if self.api is None:
+            self.api = GushubAPI()
+        self._worker = Worker(prefetch_analytics, self.api, self.cache, self.settings.get_prefetch_groups(),
+                              max(max_workers, 1), interval * 60)
+        self._worker.signals.item.connect(self.on_progress)
+        self._worker.signals.finished.connect(self.on_finished)
+        self._worker.signals.error.connect(self.on_error)
+        self._worker.background = True
+        self._worker.start()
+
+    def on_progress(self, progress: tuple):
+        if self._worker and self.sender() is self._worker.signals:
+            self.progress.emit(*progress)
+
+    def on_finished(self, _):
+        if self._worker and self.sender() is self._worker.signals:
+            self._worker = None
+            self._schedule_next()
+
+    def on_error(self, message: str):
+        if self._worker and self.sender() is self._worker.signals:
+            print(f"Ошибка фоновой загрузки аналитики: {message}")
+            self._worker = None
+            self._schedule_next()
@@ -1,6 +1,10 @@
-from PyQt6.QtWidgets import QMainWindow, QStackedWidget, QWidget, QHBoxLayout, QLabel
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QMainWindow, QStackedWidget, QWidget, QHBoxLayout, QLabel, QMessageBox
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
 from app.settings import AppSettings
+from app.api.github_scheduler import GitHubRateLimitScheduler
+from app.ui.prefetch import PrefetchScheduler
+from app.ui.outbox_runner import OutboxRunner
+from app.ui.file_watcher import FileWatcher
 from app.ui.components.sidebar import Sidebar
 from app.ui.pages.courses_page import CoursesPage
 from app.ui.pages.modules_page import ModulesPage
@@ -8,6 +12,12 @@ from app.ui.pages.lessons_page import LessonsPage
 from app.ui.pages.tasks_page import TasksPage
 from app.ui.pages.settings_page import SettingsPage
 from app.ui.pages.analytics_page import AnalyticsPage
+from datetime import datetime
+
+class RateLimitNotifier(QObject):
+    """Передаёт в GUI-поток ожидаемое время ожидания лимитов GitHub"""
+    wait_changed = pyqtSignal(float)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -75,6 +85,38 @@ class MainWindow(QMainWindow):
         self.lessons_page.tree_update_needed.connect(self.sidebar.refresh)
         self.tasks_page.tree_update_needed.connect(self.sidebar.refresh)
         self.courses_page.module_selected.connect(self.handle_module_selection)
+        
+        # Показываем в строке состояния ожидание из-за лимитов GitHub
+        self.rate_limit_notifier = RateLimitNotifier(self)
+        self.rate_limit_notifier.wait_changed.connect(self.show_github_wait)
+        self._github_wait_listener = self.rate_limit_notifier.wait_changed.emit
+        GitHubRateLimitScheduler.shared().add_listener(self._github_wait_listener)
+
+        # Фоновая загрузка аналитики, пока приложение простаивает
+        self.prefetch_scheduler = PrefetchScheduler(parent=self)
+        self.prefetch_scheduler.start()
+
+        # Очередь операций с курсами: страницы ставят задачи, выполняются они в фоне
+        self.outbox_runner = OutboxRunner(parent=self)
+        self._job_descriptions = {}
+        self.outbox_runner.job_started.connect(self.show_job_started)
+        self.outbox_runner.job_progress.connect(self.show_job_progress)
+        self.outbox_runner.job_finished.connect(self.on_job_finished)
+        self.outbox_runner.job_failed.connect(self.show_job_failed)
+        for page in (self.courses_page, self.modules_page, self.lessons_page, self.tasks_page):
+            page.job_enqueued.connect(lambda _: self.outbox_runner.wake())
+            self.outbox_runner.job_finished.connect(page.on_job_finished)
+        self.outbox_runner.start()
+
+        # Режим отслеживания: изменённые файлы уроков и задач выкладываются через очередь
+        self.file_watcher = FileWatcher(parent=self)
+        self.file_watcher.job_enqueued.connect(lambda _: self.outbox_runner.wake())
+        self.outbox_runner.job_finished.connect(lambda job_id, *_: self.file_watcher.on_job_finished(job_id))
+        self.outbox_runner.job_failed.connect(
+            lambda job_id, _description, _error, retry_at, _compensated:
+                self.file_watcher.on_job_failed(job_id, retry_at))
+        self.settings_page.watch_settings_changed.connect(self.file_watcher.restart)
+        self.file_watcher.start()
     
     def handle_item_selection(self, item_type: str, item_id: int | None):
         """Обработка выбора элемента в боковой панели"""
@@ -107,6 +149,46 @@ class MainWindow(QMainWindow):
             self.lessons_page.set_current_lesson(None)
             self.tasks_page.set_current_task(None)
 
+    def show_github_wait(self, seconds: float):
+        """Отображение ожидания лимитов GitHub в строке состояния"""
+        if seconds > 0:
+            self.statusBar().showMessage(f"Ожидание лимитов GitHub: около {seconds:.0f} с")
+        else:
+            self.statusBar().clearMessage()
+
+    def show_job_started(self, job_id: int, description: str):
+        self._job_descriptions[job_id] = description
+        self.statusBar().showMessage(f"Выполняется: {description}")
+
+    def show_job_progress(self, job_id: int, description: str, done: int, total: int):
+        self.statusBar().showMessage(f"Выполняется: {description} ({done} из {total})")
+
+    def on_job_finished(self, job_id: int, kind: str, results: dict):
+        """Операция из очереди выполнена: обновляем дерево курсов"""
+        description = self._job_descriptions.pop(job_id, "Операция")
+        self.statusBar().showMessage(f"{description}: готово", 5000)
+        self.sidebar.refresh()
+
+    def show_job_failed(self, job_id: int, description: str, error: str, retry_at, compensated: bool):
+        self._job_descriptions.pop(job_id, None)
+        if retry_at is not None:
+            retry_time = datetime.fromtimestamp(retry_at).strftime('%H:%M:%S')
+            self.statusBar().showMessage(f"{description}: сервис недоступен, повтор в {retry_time}")
+            return
+        self.statusBar().clearMessage()
+        if compensated:
+            hint = "Созданные на GitHub и gushub.ru объекты удалены: операцию можно повторить заново"
+        else:
+            hint = "Часть изменений не удалось отменить: при повторе операции уже созданные объекты будут использованы"
+        QMessageBox.critical(self, "Ошибка", f"{description} не выполнено: {error}\n\n{hint}")
+
+    def closeEvent(self, event):
+        GitHubRateLimitScheduler.shared().remove_listener(self._github_wait_listener)
+        self.prefetch_scheduler.stop()
+        self.outbox_runner.stop()
+        self.file_watcher.stop()
+        super().closeEvent(event)
+
     def handle_module_selection(self, module_id: int):
         """Обработка выбора модуля после его создания"""
         self.modules_page.set_current_module(module_id)
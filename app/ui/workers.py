@@ -0,0 +1,82 @@
+import inspect
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Сигналы фоновой задачи"""
+    item = pyqtSignal(object)  # Очередная порция данных (для генераторов)
+    finished = pyqtSignal(object)  # Результат выполнения
+    error = pyqtSignal(str)  # Текст ошибки
+
+
+class Worker(QRunnable):
+    """
+    Фоновая задача для QThreadPool.
+
+    Выполняет fn(*args, **kwargs) вне GUI-потока. Если fn возвращает
+    генератор, каждый его элемент отправляется сигналом item, как только
+    готов. Сигналы доставляются в GUI-поток через очередь событий Qt.
+
+    Задачи, которых ждёт пользователь (загрузка страниц), считаются
+    основными; служебные (очередь операций, фоновая загрузка) помечаются
+    background = True и не мешают считать приложение простаивающим.
+    """
+    _foreground = 0
+    _foreground_lock = threading.Lock()
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.background = False
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def foreground_active(cls) -> bool:
+        """Выполняется или ждёт в пуле хотя бы одна основная задача"""
+        with cls._foreground_lock:
+            return cls._foreground > 0
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Запрос на отмену: генератор прекращает выдачу после текущего элемента"""
+        self._cancelled.set()
+
+    def start(self) -> 'Worker':
+        """Запуск в глобальном пуле потоков"""
+        if not self.background:
+            with Worker._foreground_lock:
+                Worker._foreground += 1
+        QThreadPool.globalInstance().start(self)
+        return self
+
+    def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            if not self.background:
+                with Worker._foreground_lock:
+                    Worker._foreground -= 1
+
+    def _run(self) -> None:
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+            if inspect.isgenerator(result):
+                for item in result:
+                    if self.is_cancelled:
+                        result.close()
+                        break
+                    self.signals.item.emit(item)
+                result = None
+            if not self.is_cancelled:
+                self.signals.finished.emit(result)
+        except Exception as e:
+            if not self.is_cancelled:
+                self.signals.error.emit(str(e))